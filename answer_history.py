@@ -0,0 +1,198 @@
+"""
+Dated history of past Wordle answers.
+
+NYT doesn't reuse answers, so in the Daily Puzzle Assistant any word that was already the answer of an earlier day can be ruled out.
+The history is kept in data/answer_history.json as {date : answer} and indexed both ways in memory, so "what was the answer on this
+day?" and "was this word already an answer (before this day)?" are single dict lookups. Updates are incremental: only the days after
+the last one stored are fetched.
+
+Usage:
+------
+    python answer_history.py                    # fetch the answers of every day missing from the history, up to today
+    python answer_history.py --until 2024-01-31
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+DEFAULT_HISTORY_PATH = "data/answer_history.json"
+FORMAT_VERSION = 1
+FIRST_WORDLE_DATE = date(2021, 6, 19)
+NYT_ANSWER_URL = "https://www.nytimes.com/svc/wordle/v2/{day}.json"
+
+def _as_date(day):
+    return day if isinstance(day, date) else date.fromisoformat(day)
+
+class AnswerHistory:
+    """
+    Past answers indexed by date and by word.
+
+    Parameters:
+    ------
+    `answers`: dict
+        {date ("YYYY-MM-DD" or datetime.date) : answer}
+    """
+
+    def __init__(self, answers: dict = None):
+        self.by_date = {} # {datetime.date : answer}
+        self.by_word = {} # {answer : earliest date it was the answer}
+        self.last_date = None
+        self._used_before = {} # {datetime.date : frozenset of the answers before it}
+
+        for day, word in (answers or {}).items():
+            self.add(day, word)
+
+    def __len__(self):
+        return len(self.by_date)
+
+    def __contains__(self, day):
+        return _as_date(day) in self.by_date
+
+    def add(self, day, word: str):
+        """
+        Records `word` as the answer of `day`. Returns True if the history changed.
+        """
+
+        day = _as_date(day)
+        word = word.strip().lower()
+        if self.by_date.get(day) == word:
+            return False
+
+        self.by_date[day] = word
+        if word not in self.by_word or day < self.by_word[word]:
+            self.by_word[word] = day
+        if self.last_date is None or day > self.last_date:
+            self.last_date = day
+        self._used_before.clear()
+
+        return True
+
+    def answer_on(self, day):
+        """
+        Answer of `day`, or None if the history doesn't have it.
+        """
+
+        return self.by_date.get(_as_date(day))
+
+    def date_of(self, word: str):
+        """
+        First day `word` was the answer, or None if it never was (as far as the history knows).
+        """
+
+        return self.by_word.get(word)
+
+    def was_used(self, word: str, before = None):
+        """
+        True if `word` was the answer of a day before `before` (default: any day in the history).
+        """
+
+        day = self.by_word.get(word)
+
+        return day is not None and (before is None or day < _as_date(before))
+
+    def used_before(self, day = None):
+        """
+        Answers of the days before `day` (default: today), as a frozenset. Computed once per day.
+        """
+
+        day = _as_date(day) if day is not None else date.today()
+        if day not in self._used_before:
+            self._used_before[day] = frozenset(word for word, first_day in self.by_word.items() if first_day < day)
+
+        return self._used_before[day]
+
+    def missing_dates(self, until = None):
+        """
+        Days after the last one in the history (or since the first Wordle), up to `until` (default: today).
+        """
+
+        until = _as_date(until) if until is not None else date.today()
+        day = self.last_date + timedelta(days = 1) if self.last_date is not None else FIRST_WORDLE_DATE
+
+        missing = []
+        while day <= until:
+            missing.append(day)
+            day += timedelta(days = 1)
+
+        return missing
+
+    def to_dict(self):
+        return {"format_version": FORMAT_VERSION, "answers": {day.isoformat() : word for day, word in sorted(self.by_date.items())}}
+
+    def save(self, path: str = DEFAULT_HISTORY_PATH):
+        """
+        Saves the history to `path` as JSON, atomically.
+        """
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+        with open(f"{path}.tmp", "w", encoding = "utf-8") as f:
+            json.dump(self.to_dict(), f, indent = 0)
+        os.replace(f"{path}.tmp", path)
+
+def load_answer_history(path: str = DEFAULT_HISTORY_PATH):
+    """
+    Loads the history at `path`, or returns an empty one if there isn't one.
+    """
+
+    if not os.path.exists(path):
+        return AnswerHistory()
+
+    with open(path, "r", encoding = "utf-8") as f:
+        history = json.load(f)
+    if history["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Answer history at {path} has format version {history['format_version']}, expected {FORMAT_VERSION}.")
+
+    return AnswerHistory(history["answers"])
+
+def fetch_nyt_answer(day):
+    """
+    Fetches the answer of `day` from the NYT Wordle API (the same one the app uses for today's target).
+    """
+
+    import requests
+
+    response = requests.get(NYT_ANSWER_URL.format(day = _as_date(day).isoformat()), timeout = 10)
+    response.raise_for_status()
+
+    return response.json()["solution"].strip().lower()
+
+def update_answer_history(history: AnswerHistory, fetch = fetch_nyt_answer, until = None, path: str = DEFAULT_HISTORY_PATH, progress: bool = True):
+    """
+    Fetches the answers of the days missing from `history` (see `AnswerHistory.missing_dates`) with `fetch(day)` and adds them,
+    saving to `path` every 50 days and at the end, so an interrupted update keeps what it fetched. Returns the number of days added.
+    """
+
+    missing = history.missing_dates(until)
+    added = 0
+    for i, day in enumerate(missing, start = 1):
+        added += history.add(day, fetch(day))
+
+        if path is not None and i % 50 == 0:
+            history.save(path)
+        if progress:
+            print(f"\r{i}/{len(missing)} days fetched", end = "", file = sys.stderr)
+
+    if progress and missing:
+        print(file = sys.stderr)
+    if path is not None and added > 0:
+        history.save(path)
+
+    return added
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Fetch the Wordle answers missing from the answer history.")
+    parser.add_argument("--path", default = DEFAULT_HISTORY_PATH)
+    parser.add_argument("--until", default = None, help = "last day to fetch, YYYY-MM-DD (default: today)")
+    args = parser.parse_args(argv)
+
+    history = load_answer_history(args.path)
+    added = update_answer_history(history, until = args.until, path = args.path)
+    print(f"Added {added} answers; the history has {len(history)} days, up to {history.last_date}.")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,22 +2,89 @@ from datetime import datetime
 import streamlit as st
 from streamlit_extras.stateful_button import button # for button that can maintain its clicked state
 import random # for showing random words
+import os # for checking for precomputed tables
 from wordle_assistant_functions import * # for wordle solving
 import plotly.express as px # for plots
 from plots import * # for plots
+from second_guesses import load_second_guess_table, SecondGuessTable # for precomputed second guesses
+from artifacts import artifact_store, get_decision_tree_settings # for structures derived from the word list, saved on disk
+from lexicon import Lexicon, SessionLexicon # for the shared word list and each session's extra words
+from shared_index import share_word_list # for per-word data shared between app processes
+from answer_history import load_answer_history # for ruling out answers of earlier days
+from policy import load_policy # for the policy solved offline
+from solve_table import load_solve_table # for precomputed Universal Solver solutions
 # from bs4 import BeautifulSoup
 import requests
 
 ### Page header
 st.title("Wordle Wizard 🧙")
 
-### Loading in official word list
-official_words = []
-with open("data/official_words_processed.txt", "r", encoding = "utf-8") as f:
-    for word in f.read().split("\n"):
-        if len(word) == 5:
-            official_words.append(word)
-f.close() # closes connection to file
+### Loading in official word list -- once per process, shared (read-only) by every session
+@st.cache_resource
+def get_official_words():
+    official_words = []
+    with open("data/official_words_processed.txt", "r", encoding = "utf-8") as f:
+        for word in f.read().split("\n"):
+            if len(word) == 5:
+                official_words.append(word)
+    f.close() # closes connection to file
+
+    official_words = Lexicon(official_words)
+    try:
+        share_word_list(official_words) # every app process on this host maps the same per-word arrays, rather than each computing its own
+    except OSError: # read-only data directory -- each process computes its own
+        pass
+
+    return official_words
+
+official_words = get_official_words()
+
+### Words entered in this session that aren't in the official list are added on top of it, for this session only
+if 'session_words' not in st.session_state or st.session_state.session_words.base is not official_words:
+    st.session_state.session_words = SessionLexicon(official_words)
+session_words = st.session_state.session_words
+
+### Policy solved offline with `python policy.py`, if there is one -- the Universal Solver then plays it wherever it reaches
+@st.cache_resource
+def get_policy(word_list_sha: str):
+    try:
+        return load_policy(word_list = official_words)
+    except ValueError: # solved for an older word list
+        return None
+
+policy = get_policy(artifact_store.source_sha()) if os.path.exists("data/policy/manifest.json") else None
+use_policy(policy)
+solver_strategy = "policy" if policy is not None else "rating"
+
+### Precomputed second guesses for popular openers, used by both modes: a table built with `python second_guesses.py` if there is one,
+### else the "decision_trees" artifact, which is built in the background the first time the app runs with a new word list or solver settings
+@st.cache_resource
+def get_second_guess_table(word_list_sha: str, solver_settings: str):
+    table = load_second_guess_table()
+    if table is None:
+        table = SecondGuessTable(artifact_store.get("decision_trees"))
+    return table
+
+if os.path.exists("data/second_guess_table.json") or artifact_store.status("decision_trees") == "fresh":
+    use_second_guess_table(get_second_guess_table(artifact_store.source_sha(), get_decision_tree_settings()))
+else:
+    artifact_store.get("decision_trees", background = True)
+
+### Feedback of every guess against every word, memory-mapped from the "pattern_matrix" and "positional_index" artifacts. Both are built
+### in the background the first time the app runs with a new word list; the solver computes the feedback itself until they're ready
+use_pattern_index(official_words, patterns = artifact_store.get("pattern_matrix", background = True),
+                  positional_index = artifact_store.get("positional_index", background = True))
+
+### Solutions precomputed with `python solve_table.py`, if there are any -- the Universal Solver then looks up the solutions the table
+### covers (same word list and strategy) instead of solving them, and only rebuilds the steps it shows
+@st.cache_resource
+def get_solve_table(word_list_sha: str):
+    try:
+        return load_solve_table()
+    except ValueError: # built by an older version
+        return None
+
+use_solve_table(get_solve_table(artifact_store.source_sha()) if os.path.exists("data/solve_table/manifest.json") else None)
 
 ### Examples of words to use
 sugg_words = []
@@ -80,14 +147,13 @@ if mode == 'Universal Solver':
             if not (starting_word.isalpha() and target_word.isalpha()): # if the passed words don't check every criterion
                 st.write("Please check again that the starting word and target word only contain letter and are both 5 letters in length. Once they are, click the 'Abracadabra' button once more.")
             else: # if all is right in the wordle wizard world
-                # if either of them isn't in the list, temporarily add them to the list. This doesn't impact things much and will save a ton of error headaches
-                if starting_word not in official_words:
-                    official_words.append(starting_word)
-                if target_word not in official_words:
-                    official_words.append(target_word)
+                # if either of them isn't in the list, add them to this session's words. This doesn't impact things much and will save a ton of error headaches
+                session_words.add(starting_word)
+                session_words.add(target_word)
 
                 # puzzle solution
-                wordle_wizard(word_list = official_words, max_guesses = 6, guess = starting_word, target = target_word, random_guess = False, random_target = False, verbose = True, drama = 0, return_stats = False, record = False)
+                wordle_wizard(word_list = session_words, max_guesses = 6, guess = starting_word, target = target_word, random_guess = False, random_target = False, verbose = True, drama = 0, return_stats = False, record = False,
+                              strategy = solver_strategy)
 
                 st.write("Curious about what the number beside each word means? Click the button below to find out!")
                                  
@@ -159,12 +225,22 @@ elif mode == 'Daily Puzzle Assistant':
             st.session_state.num_guesses += 1
             st.rerun()
 
+    # past answers, loaded once per process (build or update them with `python answer_history.py`)
+    @st.cache_resource
+    def get_answer_history():
+        return load_answer_history()
+
+    answer_history = get_answer_history()
+
     with st.form(key='daily_puzzle_assistant_form'):
         guesses = []
         for i in range(st.session_state.num_guesses):
             new_guess = st.text_input(f"Guess #{i + 1}", key=f"guess_{i}")
             guesses.append(new_guess.strip().lower())
 
+        exclude_past_answers = st.checkbox("Rule out words that were already the answer on an earlier day", value = False,
+                                           disabled = len(answer_history) == 0, key = "exclude_past_answers")
+
         daily_sol_button = st.form_submit_button('Abracadabra')
 
     if daily_sol_button:
@@ -180,16 +256,18 @@ elif mode == 'Daily Puzzle Assistant':
         if not valid_guesses:
             st.write("Please check again that each guess only contains letters and is 5 letters in length. Once you have, click 'Abracadabra' to get feedback.")
         else: # if everything is legal, proceed to solving
-            #### ADDING UNSEEN WORDS TO OFFICIAL LIST (THIS SHOULD MINIMIZE OVERALL ERRORS)
-            for word in guesses:
-                if word not in guesses:
-                    official_words.append(word)
-
             #### RUN ALGORITHM
-            wordle_wizard_cheat(guesses = guesses, word_list = official_words, max_guesses = 6, 
+            # guesses don't need to be in the word list (only the remaining possible words are rated), so it's used as is
+            # solver state is kept per session, so only guesses added since the last click are evaluated
+            if 'daily_solver_state' not in st.session_state:
+                st.session_state.daily_solver_state = {}
+
+            wordle_wizard_cheat(guesses = guesses, word_list = official_words, max_guesses = 6,
                             target = target_word,
-                            random_guess = False, random_target = False, 
-                            verbose = True, drama = 0, return_stats = False, record = False)
+                            random_guess = False, random_target = False,
+                            verbose = True, drama = 0, return_stats = False, record = False,
+                            solver_state = st.session_state.daily_solver_state,
+                            exclude_words = answer_history.used_before(today) if exclude_past_answers else None)
             
             st.write("Curious about what the number beside each word means? Click the button below to find out!")
                         
@@ -0,0 +1,320 @@
+"""
+Versioned on-disk store for structures derived from the word list.
+
+Each artifact is saved under `data/artifacts/<name>/`, in a file tagged with the SHA-256 of `data/official_words_processed.txt` and the
+artifact's format version -- and, for artifacts that depend on them, the solver settings (see `get_solver_settings`). Arrays are saved
+as .npy files and loaded memory-mapped; everything else is JSON. Files are written to a
+temporary name and renamed into place, so a reader never sees a partial artifact. When the word list (or a format version) changes,
+the old files no longer match: the artifact is rebuilt the next time it's asked for -- right away, or in a background thread -- and the
+stale files are removed.
+
+Usage:
+------
+    python artifacts.py                   # build every missing or stale artifact
+    python artifacts.py --status          # show which artifacts are fresh, stale or missing
+    python artifacts.py --only plot_data  # build some artifacts only
+"""
+
+import argparse
+import json
+import operator
+import os
+import shutil
+import sys
+import threading
+import hashlib
+
+import numpy as np
+
+from wordle_assistant_functions import *
+from solve_table import load_official_words
+
+WORD_LIST_PATH = "data/official_words_processed.txt"
+DEFAULT_ARTIFACT_DIR = "data/artifacts"
+
+class ArtifactStore:
+    """
+    Builds, saves and loads artifacts derived from a word list file, keeping them in step with the file's contents.
+
+    Parameters:
+    ------
+    `root`: str
+        directory of the store. Each artifact gets a subdirectory
+    `source_path`: str
+        word list file the artifacts are derived from. Its SHA-256 is the version every artifact is tagged with
+    """
+
+    def __init__(self, root: str = DEFAULT_ARTIFACT_DIR, source_path: str = WORD_LIST_PATH):
+        self.root = root
+        self.source_path = source_path
+        self.artifacts = {} # {name : (build function, format version, kind, settings function, streamed)}
+        self._loaded = {} # {name : (file path, value)}
+        self._building = {} # {name : thread}
+        self._source_stat = None
+        self._source_sha = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, build, format_version: int = 1, kind: str = "json", settings = None, streamed: bool = False):
+        """
+        Declares an artifact. `build(word_list)` must return a NumPy array if `kind` is "npy", or a JSON-serializable value if `kind` is "json".
+        Bump `format_version` whenever `build` changes what it produces, so saved copies are rebuilt.
+
+        If `build` also depends on settings other than the word list, `settings()` must return a tag of them (a str usable in file names):
+        copies built under other settings are then stale too.
+
+        If `streamed` == True, the artifact is too big to build in memory: `build(word_list, work_dir)` writes it to disk itself, in
+        `work_dir`, and returns the path of the finished file. `work_dir` is kept until the artifact is done, so an interrupted build resumes.
+        """
+
+        if kind not in ("npy", "json"):
+            raise ValueError(f"Unknown artifact kind '{kind}'.")
+
+        self.artifacts[name] = (build, format_version, kind, settings, streamed)
+
+    def source_sha(self):
+        """
+        SHA-256 (hex) of the word list file, recomputed only when the file's size or modification time changes.
+        """
+
+        stat = os.stat(self.source_path)
+        if (stat.st_mtime_ns, stat.st_size) != self._source_stat:
+            with open(self.source_path, "rb") as f:
+                self._source_sha = hashlib.sha256(f.read()).hexdigest()
+            self._source_stat = (stat.st_mtime_ns, stat.st_size)
+
+        return self._source_sha
+
+    def load_words(self):
+        """
+        Loads the word list file, keeping only 5-letter words (see `solve_table.load_official_words`).
+        """
+
+        return load_official_words(self.source_path)
+
+    def path(self, name: str):
+        """
+        Path of the current (fresh) file of artifact `name`.
+        """
+
+        build, format_version, kind, settings, streamed = self.artifacts[name]
+        version = f"v{format_version}-{self.source_sha()[:16]}" + (f"-{settings()}" if settings is not None else "")
+
+        return os.path.join(self.root, name, f"{version}.{kind}")
+
+    def status(self, name: str):
+        """
+        "fresh" if the current file of artifact `name` exists, "stale" if only files for another word list or format do, else "missing".
+        """
+
+        if os.path.exists(self.path(name)):
+            return "fresh"
+
+        directory = os.path.join(self.root, name)
+        if os.path.isdir(directory) and any(not file.endswith((".tmp", ".partial")) for file in os.listdir(directory)):
+            return "stale"
+
+        return "missing"
+
+    def get(self, name: str, background: bool = False):
+        """
+        Returns artifact `name`, loading it from disk (memory-mapped for arrays) or building it first if it's missing or stale.
+
+        If `background` == True and the artifact needs building, it's built in a background thread and None is returned right away;
+        callers then fall back to computing what they need live until it's ready.
+        """
+
+        path = self.path(name)
+        loaded = self._loaded.get(name)
+        if loaded is not None and loaded[0] == path:
+            return loaded[1]
+
+        if os.path.exists(path):
+            return self._load(name, path)
+
+        if background == False:
+            return self.build(name)
+
+        with self._lock:
+            thread = self._building.get(name)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target = self.build, args = (name,), name = f"artifact-{name}", daemon = True)
+                self._building[name] = thread
+                thread.start()
+
+        return None
+
+    def build(self, name: str):
+        """
+        Builds artifact `name` from the current word list, saves it atomically, removes its stale files and returns it.
+        """
+
+        build, format_version, kind, settings, streamed = self.artifacts[name]
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        if streamed == True:
+            work_dir = f"{path}.partial"
+            os.replace(build(self.load_words(), work_dir), path)
+            shutil.rmtree(work_dir, ignore_errors = True)
+            return self._finish_build(name, path)
+
+        value = build(self.load_words())
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if kind == "npy":
+            with open(temp_path, "wb") as f:
+                np.save(f, value)
+        else:
+            with open(temp_path, "w", encoding = "utf-8") as f:
+                json.dump(value, f)
+        os.replace(temp_path, path) # atomic, so readers never see a partial file
+
+        return self._finish_build(name, path)
+
+    def _finish_build(self, name: str, path: str):
+        # removes the stale files (and unfinished builds of other versions), then loads the new file
+        for file in os.listdir(os.path.dirname(path)):
+            file_path = os.path.join(os.path.dirname(path), file)
+            if file == os.path.basename(path) or file.endswith(".tmp"):
+                continue
+            if os.path.isdir(file_path):
+                shutil.rmtree(file_path, ignore_errors = True)
+            else:
+                os.remove(file_path)
+
+        return self._load(name, path)
+
+    def _load(self, name: str, path: str):
+        build, format_version, kind, settings, streamed = self.artifacts[name]
+        if kind == "npy":
+            value = np.load(path, mmap_mode = "r")
+        else:
+            with open(path, "r", encoding = "utf-8") as f:
+                value = json.load(f)
+
+        self._loaded[name] = (path, value)
+
+        return value
+
+    def build_stale(self, names: list = None, progress: bool = True):
+        """
+        Builds every registered artifact (or those in `names`) that isn't fresh. Returns the names that were built.
+        """
+
+        built = []
+        for name in names or list(self.artifacts):
+            if self.status(name) != "fresh":
+                if progress:
+                    print(f"Building {name}...", file = sys.stderr)
+                self.build(name)
+                built.append(name)
+
+        return built
+
+### Artifacts
+
+def build_letter_counts(word_list: list):
+    """
+    {letter : number of words containing it} over the word list (see `get_letter_counts`).
+    """
+
+    return get_letter_counts(word_list = word_list, letters = english_alphabet, sort = None, unique = True)
+
+def build_positional_index(word_list: list):
+    """
+    (positions x 26, words) boolean array: row `position * 26 + letter` marks the words with that letter at that position
+    (see `get_positional_feedback`).
+    """
+
+    codes = encode_words(word_list)
+    index = np.zeros((codes.shape[1] * 26, len(word_list)), dtype = bool)
+    for position in range(codes.shape[1]):
+        index[position * 26 + codes[:, position], np.arange(len(word_list))] = True
+
+    return index
+
+def build_pattern_matrix(word_list: list, work_dir: str):
+    """
+    (guesses, targets) array of the feedback each word gets against each word, streamed to disk under a memory ceiling
+    (see `pattern_matrix.build_pattern_matrix_file`).
+    """
+
+    from pattern_matrix import build_pattern_matrix_file
+
+    build_pattern_matrix_file(word_list, path = work_dir, progress = False)
+
+    return os.path.join(work_dir, "patterns.npy")
+
+def get_decision_tree_settings():
+    # second guesses are rated live, so they don't depend on the loaded second guess table (see `get_second_guesses`)
+    return get_solver_settings(second_guesses = False)
+
+def build_decision_trees(word_list: list):
+    """
+    Second guesses of the popular openers, in the format saved by `second_guesses.build_second_guess_table`. They depend on the solver
+    settings, so the artifact is tagged with them (see `get_decision_tree_settings`).
+    """
+
+    from second_guesses import POPULAR_OPENERS, get_second_guesses, FORMAT_VERSION
+
+    lexicon_key = get_words_fingerprint(word_list)
+    table = {"format_version": FORMAT_VERSION, "lexicon_version": lexicon_key.hex(), "openers": {}}
+    for opener in dict.fromkeys(POPULAR_OPENERS):
+        if opener in word_list:
+            second_guesses = get_second_guesses(word_list, opener, lexicon_key = lexicon_key)
+            table["openers"][opener] = {str(pattern) : value for pattern, value in second_guesses.items()}
+
+    return table
+
+def build_plot_data(word_list: list):
+    """
+    Data behind the word ratings plot of plots.py: a selection of the best, middle and worst rated words. The letter counts plot reads
+    the "letter_counts" artifact.
+    """
+
+    letter_counts = get_letter_counts(word_list = word_list, letters = english_alphabet, sort = "descending", unique = True)
+    total_letters_sum = sum(count for letter, count in letter_counts)
+
+    word_counts = []
+    for word in word_list:
+        # the sum of the counts of each letter in the word (this intentionally doesn't count duplicate letters)
+        word_sum = 0
+        for letter in set(word):
+            word_sum += dict(letter_counts)[letter]
+        word_counts.append((word, round(word_sum / total_letters_sum * 100, 2)))
+
+    ### Best, middle and worst words
+    descending = sorted(word_counts, key = operator.itemgetter(1), reverse = True)
+    ascending = sorted(word_counts, key = operator.itemgetter(1), reverse = False)
+    selection = descending[:5] + descending[(len(word_counts) // 2) - 10 : (len(word_counts) // 2) - 5] + ascending[:6]
+
+    return {"words": [word for word, rating in selection], "ratings": [rating for word, rating in selection]}
+
+# shared store of the app's artifacts. The pattern matrix and positional index are what `use_pattern_index` reads feedback from;
+# the ratings and letter codes the solver uses are shared through shared_index.py
+artifact_store = ArtifactStore()
+artifact_store.register("letter_counts", build_letter_counts, format_version = 1, kind = "json")
+artifact_store.register("positional_index", build_positional_index, format_version = 1, kind = "npy")
+artifact_store.register("pattern_matrix", build_pattern_matrix, format_version = 1, kind = "npy", streamed = True)
+artifact_store.register("decision_trees", build_decision_trees, format_version = 2, kind = "json", settings = get_decision_tree_settings)
+artifact_store.register("plot_data", build_plot_data, format_version = 2, kind = "json")
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Build the artifacts derived from the word list.")
+    parser.add_argument("--status", action = "store_true", help = "only show whether each artifact is fresh, stale or missing")
+    parser.add_argument("--only", default = None, help = "comma-separated artifact names (default: all)")
+    parser.add_argument("--root", default = DEFAULT_ARTIFACT_DIR)
+    args = parser.parse_args(argv)
+
+    artifact_store.root = args.root
+    names = args.only.split(",") if args.only else list(artifact_store.artifacts)
+
+    if not args.status:
+        artifact_store.build_stale(names)
+
+    for name in names:
+        print(f"{name:<20} {artifact_store.status(name):<8} {artifact_store.path(name)}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
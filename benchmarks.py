@@ -0,0 +1,516 @@
+"""
+Micro- and macro-benchmarks for the Wordle Wizard solver engine.
+
+Times the core functions of `wordle_assistant_functions.py` on the shipped word list and on synthetic lexicons,
+writes machine-readable results (p50/p95/p99 per case) and flags regressions against a stored baseline.
+
+Usage:
+------
+    python benchmarks.py                                  # shipped list + synthetic lexicons up to 100k words
+    python benchmarks.py --sizes official,5000 --quick    # smaller, faster run
+    python benchmarks.py --save-baseline                  # store the results as the new baseline
+    python benchmarks.py --sampling --sizes official,10000 --cases none   # accuracy vs latency of sampled scoring only
+    python benchmarks.py --render --sizes official --cases none           # messages and bytes sent to the browser per solve
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from wordle_assistant_functions import *
+from solve_table import load_official_words
+
+DEFAULT_OUTPUT_PATH = "bench_results.json"
+DEFAULT_BASELINE_PATH = "data/bench_baseline.json"
+DEFAULT_SIZES = "official,1000,10000,100000"
+
+### Lexicons
+
+def make_synthetic_lexicon(size: int, word_list: list, seed: int = 0):
+    """
+    Generates a lexicon of `size` unique words, sampling each position's letter from its frequency in `word_list`.
+
+    Parameters:
+    ------
+    `size`: int
+        number of unique words to generate
+    `word_list`: list
+        list of words (str) of consistent length, used for the positional letter distributions
+    `seed`: int
+        seed for the random generator, so the same lexicon is produced on every run
+
+    Returns:
+    ------
+    `lexicon`: list
+        list of `size` unique words (str)
+    """
+
+    rng = random.Random(seed)
+    wordlen = len(word_list[0])
+
+    # positional letter distributions of the real list, so synthetic words look statistically similar
+    position_letters = []
+    position_weights = []
+    for pos in range(wordlen):
+        counts = get_word_distribution([word[pos] for word in word_list], sort = "descending")
+        position_letters.append([letter for letter, count in counts])
+        position_weights.append([count for letter, count in counts])
+
+    lexicon = []
+    seen = set()
+    while len(lexicon) < size:
+        word = "".join(rng.choices(position_letters[pos], weights = position_weights[pos])[0] for pos in range(wordlen))
+        if word not in seen:
+            seen.add(word)
+            lexicon.append(word)
+
+    return lexicon
+
+### Timing helpers
+
+def time_call(func, repeats: int, warmup: int = 1):
+    """
+    Calls `func()` `warmup` times untimed, then `repeats` times timed. Returns the list of wall times in seconds.
+    """
+
+    for i in range(warmup):
+        func()
+
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+def summarize_times(times: list):
+    """
+    Summarizes a list of wall times (seconds) into count, mean, min, max and p50/p95/p99.
+    """
+
+    times = np.asarray(times, dtype = float)
+
+    return {
+        "n": int(len(times)),
+        "mean": float(np.mean(times)),
+        "min": float(np.min(times)),
+        "max": float(np.max(times)),
+        "p50": float(np.percentile(times, 50)),
+        "p95": float(np.percentile(times, 95)),
+        "p99": float(np.percentile(times, 99)),
+    }
+
+### Benchmark cases
+
+def clear_solver_caches():
+    """
+    Empties every cache the solver shares between calls (in memory -- see `get_cases` for the on-disk tier of `solve_cache`).
+    """
+
+    for cache in (transition_cache, solve_cache, lexicon_cache, endgame_cache, lookahead_cache):
+        cache.clear()
+
+def get_cases(lexicon: list, repeats: int, sweep_limit: int = None, seed: int = 0, cold_cache: bool = False):
+    """
+    Builds the list of benchmark cases for one lexicon.
+
+    Each case is a tuple of (case name, params dict, function returning a list of timings).
+    If `cold_cache` is True, every shared cache is emptied before each solver call (see `clear_solver_caches`), outside the timing, and the
+    on-disk tier of `solve_cache` (`WORDLE_SOLVE_CACHE_DIR`) is skipped, so no work is reused between calls.
+    """
+
+    rng = random.Random(seed)
+    opener = get_word_rating(lexicon, lexicon, normalized = False)[0][0] # best-rated word, like a typical opener
+
+    def solve(guess, target):
+        return wordle_wizard(word_list = lexicon, max_guesses = 6, guess = guess, target = target, return_stats = True)
+
+    def cheat(guesses, target):
+        return wordle_wizard_cheat(guesses = guesses, word_list = lexicon, max_guesses = 6, target = target, return_stats = True)
+
+    def time_solver_call(call):
+        disk_dir = solve_cache.disk_dir
+        if cold_cache:
+            clear_solver_caches()
+            solve_cache.disk_dir = None
+        try:
+            start = time.perf_counter()
+            call()
+            return time.perf_counter() - start
+        finally:
+            solve_cache.disk_dir = disk_dir
+
+    def timed_solves():
+        times = []
+        for i in range(repeats):
+            guess, target = rng.choice(lexicon), rng.choice(lexicon)
+            times.append(time_solver_call(lambda: solve(guess, target)))
+        return times
+
+    def timed_cheats(num_guesses):
+        def run():
+            times = []
+            for i in range(repeats):
+                target = rng.choice(lexicon)
+                guesses = rng.sample(lexicon, num_guesses)
+                times.append(time_solver_call(lambda: cheat(guesses, target)))
+            return times
+        return run
+
+    def timed_sweep():
+        # one solve per target word with a fixed opener -- timings are per solve
+        targets = lexicon if sweep_limit is None else rng.sample(lexicon, min(sweep_limit, len(lexicon)))
+        times = []
+        for target in targets:
+            times.append(time_solver_call(lambda: solve(opener, target)))
+        return times
+
+    cases = [
+        ("get_letter_counts", {}, lambda: time_call(lambda: get_letter_counts(word_list = lexicon), repeats)),
+        ("get_word_rating", {"words_to_rate": len(lexicon)}, lambda: time_call(lambda: get_word_rating(lexicon, lexicon, normalized = False), repeats)),
+        ("best_guess_words", {}, lambda: time_call(lambda: best_guess_words(lexicon), repeats)),
+        ("get_gram_freq", {"letters_length": 1}, lambda: time_call(lambda: get_gram_freq(word_list = lexicon, letters_length = 1, position = "start"), repeats)),
+        # feedback of a block of guesses against every target -- divide by "pairs" for the time per pair
+        ("get_feedback_matrix", {"pairs": min(256, len(lexicon)) * len(lexicon)}, lambda: time_call(lambda: get_feedback_matrix(lexicon[:256], lexicon), repeats)),
+        # entropy search over every word, cut off at the deadline -- timings should stay close to it
+        ("choose_next_guess_anytime", {"deadline_ms": 10}, lambda: time_call(lambda: choose_next_guess_anytime(np.arange(len(lexicon)), lexicon, 10, guess_pool = "all"), repeats)),
+        # the 256 best-rated guesses scored against a sample of every word, with the contenders re-scored exactly
+        ("score_guesses_sampled", {"guesses": min(256, len(lexicon)), "sample_size": 256},
+         lambda: time_call(lambda: score_guesses_sampled(np.arange(min(256, len(lexicon))), np.arange(len(lexicon)), lexicon, sample_size = 256), repeats)),
+        ("wordle_wizard", {"max_guesses": 6}, timed_solves),
+    ]
+
+    for num_guesses in range(1, 6):
+        cases.append(("wordle_wizard_cheat", {"num_guesses": num_guesses}, timed_cheats(num_guesses)))
+
+    cases.append(("all_targets_sweep", {"opener": opener, "targets": len(lexicon) if sweep_limit is None else min(sweep_limit, len(lexicon))}, timed_sweep))
+
+    return cases
+
+def run_benchmarks(sizes: list, repeats: int = 20, sweep_limit: int = 200, seed: int = 0, cases_filter: list = None, cold_cache: bool = False):
+    """
+    Runs every benchmark case on each requested lexicon size.
+
+    Parameters:
+    ------
+    `sizes`: list
+        lexicon sizes to benchmark. "official" is the shipped word list, ints are synthetic lexicons of that size
+    `repeats`: int
+        number of timed runs per case on the shipped list. Scaled down (to a minimum of 3) for larger lexicons
+    `sweep_limit`: int
+        maximum number of targets in the all-targets sweep on synthetic lexicons. The shipped list is always swept completely
+    `seed`: int
+        seed for synthetic lexicons and for random guess/target choices
+    `cases_filter`: list
+        if passed, only cases whose names are in this list are run
+    `cold_cache`: bool
+        if True, solver calls don't reuse any work from earlier calls (see `get_cases`)
+
+    Returns:
+    ------
+    `results`: list
+        list of dicts, one per (lexicon, case), with the timing summary under "stats"
+    """
+
+    official_words = load_official_words()
+    results = []
+
+    for size in sizes:
+        if size == "official":
+            lexicon = official_words
+            lexicon_sweep_limit = None
+        else:
+            lexicon = make_synthetic_lexicon(int(size), official_words, seed = seed)
+            lexicon_sweep_limit = sweep_limit
+
+        lexicon_repeats = max(3, repeats * len(official_words) // len(lexicon))
+
+        transition_cache.clear() # every lexicon starts from an empty cache
+        for name, params, run in get_cases(lexicon, lexicon_repeats, sweep_limit = lexicon_sweep_limit, seed = seed, cold_cache = cold_cache):
+            if cases_filter and name not in cases_filter:
+                continue
+
+            result = {"case": name, "lexicon": str(size), "lexicon_size": len(lexicon), "params": params}
+            print(f"{size:>10} | {name} {params if params else ''}", file = sys.stderr, flush = True)
+
+            try:
+                result["stats"] = summarize_times(run())
+            except Exception as e: # a broken function shouldn't stop the rest of the suite
+                result["error"] = f"{type(e).__name__}: {e}"
+
+            results.append(result)
+
+    return results
+
+### Accuracy vs latency of sampled scoring
+
+def run_sampling_benchmark(sizes: list, sample_sizes: list = (64, 128, 256, 512), num_states: int = 5, num_seeds: int = 5, guess_limit: int = 2000, seed: int = 0):
+    """
+    Compares `score_guesses_sampled` with exact entropy scoring (see `get_partition_entropies`) on the same states.
+
+    The states are every word of the lexicon (the first guess) and `num_states` candidate sets left after a random guess and target, keeping
+    only those with more candidates than the largest sample size. The guesses are the `guess_limit` best-rated words. Each state is
+    scored exactly once and sampled with `num_seeds` seeds per sample size.
+
+    Returns:
+    ------
+    `results`: list
+        list of dicts, one per (lexicon, sample size): p50 wall times of both scorings, the "agreement" (fraction of runs picking the exact
+        best guess), the mean and max "regret" (exact entropy lost, bits), the "coverage" of the confidence intervals, and the mean
+        number of contenders re-scored exactly
+    """
+
+    official_words = load_official_words()
+    rng = random.Random(seed)
+    results = []
+
+    for size in sizes:
+        lexicon = official_words if size == "official" else make_synthetic_lexicon(int(size), official_words, seed = seed)
+        table = get_lexicon_table(lexicon)
+        guess_ids = np.argsort(-table["ratings"], kind = "stable")[:guess_limit]
+
+        states = [np.arange(len(lexicon))]
+        for attempt in range(num_states * 20):
+            if len(states) > num_states:
+                break
+            guess, target = rng.choice(lexicon), rng.choice(lexicon)
+            ids = np.flatnonzero(get_feedback_matrix([guess], lexicon)[0] == get_feedback(guess, target))
+            if len(ids) > max(sample_sizes):
+                states.append(ids)
+
+        print(f"{size:>10} | sampling: {len(states)} states, {len(guess_ids)} guesses", file = sys.stderr, flush = True)
+
+        exact_times, exact_scores = [], []
+        for ids in states:
+            start = time.perf_counter()
+            exact_scores.append(get_partition_entropies(table["codes"][guess_ids], table["codes"][ids]))
+            exact_times.append(time.perf_counter() - start)
+
+        for sample_size in sample_sizes:
+            times, agreement, regret, coverage, contenders = [], [], [], [], []
+            for ids, exact in zip(states, exact_scores):
+                for sample_seed in range(num_seeds):
+                    start = time.perf_counter()
+                    sampled = score_guesses_sampled(guess_ids, ids, lexicon, sample_size = sample_size, seed = sample_seed)
+                    times.append(time.perf_counter() - start)
+
+                    chosen = exact[list(guess_ids).index(table["word_index"][sampled["next_guess"]])]
+                    agreement.append(chosen >= exact.max() - 1e-12)
+                    regret.append(exact.max() - chosen)
+                    coverage.append(np.mean((exact >= sampled["lower"] - 1e-9) & (exact <= sampled["upper"] + 1e-9)))
+                    contenders.append(len(sampled["contenders"]))
+
+            results.append({
+                "lexicon": str(size),
+                "lexicon_size": len(lexicon),
+                "sample_size": sample_size,
+                "runs": len(times),
+                "exact_p50": float(np.percentile(exact_times, 50)),
+                "sampled_p50": float(np.percentile(times, 50)),
+                "agreement": round(float(np.mean(agreement)), 4),
+                "mean_regret": round(float(np.mean(regret)), 6),
+                "max_regret": round(float(np.max(regret)), 6),
+                "coverage": round(float(np.mean(coverage)), 4),
+                "mean_contenders": round(float(np.mean(contenders)), 1),
+            })
+
+    return results
+
+### Rendering
+
+RENDER_SCRIPT = """
+import os, sys
+sys.path.insert(0, {root!r})
+os.chdir({root!r})
+from wordle_assistant_functions import *
+from solve_table import load_official_words
+words = load_official_words()
+for target in words[::max(1, len(words) // {targets})][:{targets}]:
+    wordle_wizard(word_list = words, max_guesses = 6, guess = {opener!r}, target = target, verbose = True, drama = 0)
+"""
+
+def run_render_benchmark(targets: int = 20, opener: str = "slate", repeats: int = 5):
+    """
+    Renders `targets` verbose Universal Solver solutions in a Streamlit test session (see `streamlit.testing.v1.AppTest`) and measures
+    what goes to the browser: the number of delta messages, their total size in bytes, and the time to run the page. Solutions are
+    cached by a first, untimed run, so the timings are of the rendering.
+
+    Returns:
+    ------
+    `result`: dict
+        "messages" and "bytes" per solve, and the timing summary of the page runs under "stats"
+    """
+
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    sent = []
+    forward_msgs = LocalScriptRunner.forward_msgs
+    def recording_forward_msgs(runner):
+        messages = forward_msgs(runner)
+        sent[:] = [message for message in messages if message.HasField("delta")]
+        return messages
+
+    script = RENDER_SCRIPT.format(root = os.path.dirname(os.path.abspath(__file__)), targets = targets, opener = opener)
+    LocalScriptRunner.forward_msgs = recording_forward_msgs
+    try:
+        AppTest.from_string(script, default_timeout = 600).run()
+        times = []
+        for i in range(repeats):
+            app = AppTest.from_string(script, default_timeout = 600)
+            start = time.perf_counter()
+            app.run()
+            times.append(time.perf_counter() - start)
+    finally:
+        LocalScriptRunner.forward_msgs = forward_msgs
+
+    return {
+        "case": "render_solutions",
+        "params": {"targets": targets, "opener": opener},
+        "messages": round(len(sent) / targets, 2),
+        "bytes": round(sum(message.ByteSize() for message in sent) / targets, 1),
+        "stats": summarize_times(times),
+    }
+
+### Baseline comparison
+
+def result_key(result: dict):
+    """
+    Key identifying the same benchmark across runs: case name, lexicon and params.
+    """
+
+    return (result["case"], result["lexicon"], json.dumps(result["params"], sort_keys = True))
+
+def find_regressions(results: list, baseline: list, tolerance: float = 0.25, metrics: tuple = ("p50", "p95")):
+    """
+    Compares results against a baseline run and flags any case that got slower.
+
+    A case is flagged when one of `metrics` is more than `tolerance` (fraction) above the baseline value for the same case.
+
+    Returns:
+    ------
+    `regressions`: list
+        list of dicts, one per (case, metric) that regressed
+    """
+
+    baseline_by_key = {result_key(result): result for result in baseline if "stats" in result}
+
+    regressions = []
+    for result in results:
+        base = baseline_by_key.get(result_key(result))
+        if base is None or "stats" not in result:
+            continue
+
+        for metric in metrics:
+            old = base["stats"][metric]
+            new = result["stats"][metric]
+            if old > 0 and new > old * (1 + tolerance):
+                regressions.append({
+                    "case": result["case"],
+                    "lexicon": result["lexicon"],
+                    "params": result["params"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "ratio": round(new / old, 3),
+                })
+
+    return regressions
+
+def write_json(data, path: str):
+    """
+    Writes `data` to `path` as indented JSON, creating parent directories as needed.
+    """
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+    with open(path, "w", encoding = "utf-8") as f:
+        json.dump(data, f, indent = 2)
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the Wordle Wizard solver engine.")
+    parser.add_argument("--sizes", default = DEFAULT_SIZES, help = "comma-separated lexicon sizes; 'official' is the shipped list")
+    parser.add_argument("--repeats", type = int, default = 20, help = "timed runs per case on the shipped list")
+    parser.add_argument("--sweep-limit", type = int, default = 200, help = "targets in the sweep on synthetic lexicons")
+    parser.add_argument("--cases", default = None, help = "comma-separated case names to run (default: all)")
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--cold-cache", action = "store_true", help = "empty every shared cache (and skip the on-disk solve cache) before every solver call")
+    parser.add_argument("--quick", action = "store_true", help = "5 repeats and a 50-target sweep limit")
+    parser.add_argument("--output", default = DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--baseline", default = DEFAULT_BASELINE_PATH)
+    parser.add_argument("--tolerance", type = float, default = 0.25, help = "allowed slowdown before a case is flagged")
+    parser.add_argument("--save-baseline", action = "store_true", help = "write these results to the baseline path")
+    parser.add_argument("--sampling", action = "store_true", help = "also compare sampled with exact guess scoring (accuracy vs latency)")
+    parser.add_argument("--sample-sizes", default = "64,128,256,512", help = "comma-separated sample sizes for --sampling")
+    parser.add_argument("--render", action = "store_true", help = "also measure the messages and bytes sent to the browser per verbose solve")
+    args = parser.parse_args(argv)
+
+    repeats = 5 if args.quick else args.repeats
+    sweep_limit = 50 if args.quick else args.sweep_limit
+    cases_filter = args.cases.split(",") if args.cases else None
+
+    results = run_benchmarks(args.sizes.split(","), repeats = repeats, sweep_limit = sweep_limit, seed = args.seed, cases_filter = cases_filter, cold_cache = args.cold_cache)
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec = "seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "repeats": repeats,
+            "sweep_limit": sweep_limit,
+            "seed": args.seed,
+            "cold_cache": args.cold_cache,
+            "transition_cache": transition_cache.stats(),
+        },
+        "results": results,
+    }
+    if args.sampling:
+        report["sampling"] = run_sampling_benchmark(args.sizes.split(","), sample_sizes = [int(size) for size in args.sample_sizes.split(",")], seed = args.seed)
+    if args.render:
+        report["render"] = run_render_benchmark(repeats = repeats)
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding = "utf-8") as f:
+            baseline = json.load(f)
+        report["regressions"] = find_regressions(results, baseline["results"], tolerance = args.tolerance)
+    else:
+        report["regressions"] = []
+        print(f"No baseline found at {args.baseline}; skipping regression check.", file = sys.stderr)
+
+    write_json(report, args.output)
+    if args.save_baseline:
+        write_json(report, args.baseline)
+
+    ### Human-readable summary
+    for result in results:
+        if "stats" in result:
+            stats = result["stats"]
+            print(f"{result['lexicon']:>10} | {result['case']:<20} {str(result['params']):<40} p50 {stats['p50'] * 1000:10.3f} ms | p95 {stats['p95'] * 1000:10.3f} ms | p99 {stats['p99'] * 1000:10.3f} ms")
+        else:
+            print(f"{result['lexicon']:>10} | {result['case']:<20} {str(result['params']):<40} ERROR {result['error']}")
+
+    for result in report.get("sampling", []):
+        print(f"{result['lexicon']:>10} | sampled scoring, sample {result['sample_size']:<5} p50 {result['sampled_p50'] * 1000:8.1f} ms vs exact {result['exact_p50'] * 1000:8.1f} ms | "
+              f"best guess agreement {result['agreement']:.0%} | mean regret {result['mean_regret']:.4f} bits | CI coverage {result['coverage']:.0%} | {result['mean_contenders']} contenders")
+
+    if "render" in report:
+        render = report["render"]
+        print(f"    render | {render['params']['targets']} verbose solves: {render['messages']} messages, {render['bytes']:.0f} bytes per solve | "
+              f"page p50 {render['stats']['p50'] * 1000:.1f} ms")
+
+    for regression in report["regressions"]:
+        print(f"REGRESSION: {regression['case']} ({regression['lexicon']}, {regression['params']}) {regression['metric']} {regression['baseline'] * 1000:.3f} ms -> {regression['current'] * 1000:.3f} ms (x{regression['ratio']})")
+
+    return 1 if report["regressions"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Word lists shared between sessions.
+
+`Lexicon` is an immutable word list, loaded once per process and shared by every session. `SessionLexicon` layers a small, per-session
+set of extra words (e.g. a starting word that isn't in the official list) over it, without copying or changing the shared list.
+Both behave like the plain lists the solver functions take (`len`, indexing, iteration), with O(1) `in` checks and an incrementally
+maintained fingerprint, so caches keyed by word list contents stay valid for every session that doesn't add words.
+"""
+
+import hashlib
+from collections import ChainMap
+from collections.abc import Sequence
+
+class Lexicon(Sequence):
+    """
+    Immutable word list with an O(1) word index and a precomputed fingerprint.
+
+    Parameters:
+    ------
+    `words`: iterable
+        words (str) of consistent length, in the order the solver sees them. Repeated words keep their first position in the index
+    """
+
+    def __init__(self, words):
+        self._words = tuple(words)
+        self._index = {}
+        for i, word in enumerate(self._words):
+            self._index.setdefault(word, i)
+
+        self._hasher = hashlib.blake2b(digest_size = 16) # same digest as `get_words_fingerprint` on the plain list
+        self._hasher.update("\n".join(self._words).encode("utf-8"))
+        self._fingerprint = self._hasher.digest()
+
+    def __len__(self):
+        return len(self._words)
+
+    def __getitem__(self, i):
+        return self._words[i]
+
+    def __iter__(self):
+        return iter(self._words)
+
+    def __contains__(self, word):
+        return word in self._index
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} words)"
+
+    def index(self, word, start = 0, stop = None):
+        i = self._index.get(word)
+        if i is None or i < start or (stop is not None and i >= stop):
+            raise ValueError(f"'{word}' is not in the lexicon")
+        return i
+
+    @property
+    def word_index(self):
+        """
+        Read-only mapping of {word : position}.
+        """
+
+        return self._index
+
+    @property
+    def base(self):
+        """
+        The shared lexicon underneath -- itself, for a base lexicon.
+        """
+
+        return self
+
+    def fingerprint(self):
+        """
+        16-byte fingerprint of the words, in order (see `get_words_fingerprint`).
+        """
+
+        return self._fingerprint
+
+class SessionLexicon(Lexicon):
+    """
+    A shared `Lexicon` plus a few extra words, appended after the shared ones. The shared lexicon is never copied or changed.
+
+    With no extra words, it has the same words and fingerprint as the shared lexicon, so every cache keyed by fingerprint is shared too.
+
+    Parameters:
+    ------
+    `base`: Lexicon
+        shared lexicon
+    `extra_words`: iterable
+        words to add right away (see `add`)
+    """
+
+    def __init__(self, base: Lexicon, extra_words = ()):
+        self._base = base
+        self._extra_words = []
+        self._extra_index = {}
+        self._index = ChainMap(self._extra_index, base.word_index)
+        self._hasher = base._hasher.copy()
+        self._fingerprint = base.fingerprint()
+        self.derived = {} # data derived from this session's words, by fingerprint, kept here rather than in shared caches (see `get_lexicon_table`)
+
+        for word in extra_words:
+            self.add(word)
+
+    def __len__(self):
+        return len(self._base) + len(self._extra_words)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self)[i]
+        if i < 0:
+            i += len(self)
+        if 0 <= i < len(self._base):
+            return self._base[i]
+        if len(self._base) <= i < len(self):
+            return self._extra_words[i - len(self._base)]
+        raise IndexError("lexicon index out of range")
+
+    def __iter__(self):
+        yield from self._base
+        yield from self._extra_words
+
+    @property
+    def base(self):
+        return self._base
+
+    @property
+    def extra_words(self):
+        """
+        Words added on top of the shared lexicon, in the order they were added.
+        """
+
+        return tuple(self._extra_words)
+
+    def add(self, word: str):
+        """
+        Appends `word` if it isn't already in the lexicon, extending the index and fingerprint. Returns True if it was added.
+        """
+
+        if word in self._index:
+            return False
+
+        self._extra_index[word] = len(self)
+        self._extra_words.append(word)
+        self._hasher.update((("\n" if len(self) > 1 else "") + word).encode("utf-8"))
+        self._fingerprint = self._hasher.copy().digest()
+
+        return True
@@ -0,0 +1,406 @@
+"""
+Load generator: how many concurrent users one host can serve.
+
+Replays a realistic mix of requests -- Universal Solver solves from popular starting words, and Daily Assistant calls with 1-5 guesses
+against the day's target -- at a fixed concurrency, either straight against the solver entry points (`wordle_wizard` and
+`wordle_wizard_cheat`, in a process pool of `--concurrency` workers) or against a running local service (see service.py), with
+`--concurrency` clients each keeping one request in flight. Throughput, latency percentiles, and the CPU use and resident memory of
+the processes doing the work (sampled over time) are printed and saved to loadtest_results.json. Nothing goes over the network.
+
+`--cache` sets how much work the solver caches can reuse: "warm" replays a fixed mix of `--requests` requests in a loop, so after
+the first pass most solves are cache hits; "fresh" draws a new request every time; "cold" (entry points only) also empties every
+solver cache before each request, outside the timing. The solve and transition cache hit rates of the entry-point workers are
+reported with the results.
+
+Usage:
+------
+    python loadtest.py                                          # entry points, 4 workers, 30 s
+    python loadtest.py --concurrency 8 --duration 60 --daily-share 0.7
+    python loadtest.py --cache cold                             # no work reused between requests
+    python loadtest.py --url http://127.0.0.1:8000 --pid 12345  # a local service, watching its process (and workers) for CPU and RSS
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from itertools import cycle, islice
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError: # not available on Windows
+    resource = None
+
+from wordle_assistant_functions import *
+from benchmarks import clear_solver_caches, summarize_times, write_json
+from second_guesses import POPULAR_OPENERS
+from solve_table import load_official_words
+
+DEFAULT_OUTPUT_PATH = "loadtest_results.json"
+
+### Request mix
+
+def iter_requests(word_list: list, daily_share: float = 0.5, daily_target: str = None, seed: int = 0):
+    """
+    Endless stream of requests like real users send them, in the format of the service's endpoints.
+
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words, for targets and guesses
+    `daily_share`: float
+        fraction of Daily Assistant requests; the rest are Universal Solver solves
+    `daily_target`: str
+        the day's target, shared by every Daily Assistant request. Defaults to a random word
+    `seed`: int
+        seed for the random choices, so the same stream is produced on every run
+
+    ------
+    Yields:
+    ------
+    `request`: tuple
+        (endpoint, body): ("/solve", {"start", "target"}) or ("/suggest", {"guesses", "target"}).
+        Solves start from a popular opener; Daily Assistant calls have 1-5 guesses, the first one usually a popular opener
+    """
+
+    rng = random.Random(seed)
+    openers = [opener for opener in POPULAR_OPENERS if opener in word_list] or list(word_list)
+    daily_target = daily_target or rng.choice(word_list)
+
+    while True:
+        if rng.random() < daily_share:
+            guesses = [rng.choice(openers) if rng.random() < 0.8 else rng.choice(word_list)]
+            guesses += rng.sample(word_list, rng.randint(0, 4))
+            yield "/suggest", {"guesses": guesses, "target": daily_target}
+        else:
+            yield "/solve", {"start": rng.choice(openers), "target": rng.choice(word_list)}
+
+def make_request_mix(word_list: list, num_requests: int, daily_share: float = 0.5, daily_target: str = None, seed: int = 0):
+    """
+    Builds a list of `num_requests` requests: the first ones of `iter_requests` with the same arguments.
+    """
+
+    return list(islice(iter_requests(word_list, daily_share = daily_share, daily_target = daily_target, seed = seed), num_requests))
+
+### Resource sampling
+
+def get_process_tree(pid: int):
+    """
+    `pid` and all of its descendants (Linux /proc only; elsewhere just `pid`).
+    """
+
+    pids = [pid]
+    for parent in pids:
+        try:
+            for task in os.listdir(f"/proc/{parent}/task"):
+                with open(f"/proc/{parent}/task/{task}/children", "r") as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+
+    return pids
+
+def sample_processes(pids: list):
+    """
+    Total (CPU seconds, resident MB) of `pids`, from /proc. Falls back to this process and its finished children
+    (via `resource`) where /proc isn't available. Processes that exited since are skipped.
+    """
+
+    if not os.path.exists("/proc/self/stat"):
+        if resource is None:
+            return 0.0, 0.0
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        rss = usage.ru_maxrss / 1024 ** 2 if sys.platform == "darwin" else usage.ru_maxrss / 1024
+        return usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime, rss
+
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_mb = os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    cpu, rss = 0.0, 0.0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                fields = f.read().rsplit(")", 1)[1].split() # the process name can contain spaces
+            with open(f"/proc/{pid}/statm", "r") as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        cpu += (int(fields[11]) + int(fields[12])) / ticks # utime, stime
+        rss += resident_pages * page_mb
+
+    return cpu, rss
+
+class ResourceMonitor:
+    """
+    Samples the CPU use (% of one core) and resident memory (MB) of a process tree every `interval` seconds, in a background thread.
+    """
+
+    def __init__(self, pid: int = None, interval: float = 1.0):
+        self.pid = pid or os.getpid()
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target = self._run, name = "resource-monitor", daemon = True)
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        self._last = (self._start_time, sample_processes(get_process_tree(self.pid))[0])
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            pids = get_process_tree(self.pid)
+            cpu, rss = sample_processes(pids)
+            self.samples.append({
+                "t": round(now - self._start_time, 2),
+                "cpu_percent": round((cpu - self._last[1]) / (now - self._last[0]) * 100, 1),
+                "rss_mb": round(rss, 1),
+                "processes": len(pids),
+            })
+            self._last = (now, cpu)
+
+### Runners
+
+_worker_words = None
+_worker_cold = False
+
+# caches whose hit rates are reported, by name
+REPORTED_CACHES = {"solve": solve_cache, "transition": transition_cache}
+
+def _init_worker(word_list: list, cold: bool = False):
+    global _worker_words, _worker_cold
+    _worker_words = word_list
+    _worker_cold = cold
+    if cold:
+        solve_cache.disk_dir = None # the on-disk tier would carry solves over between requests
+
+def get_cache_counts():
+    """
+    (hits, misses) of each cache in `REPORTED_CACHES`, in this process. Solves read back from disk count as hits.
+    """
+
+    counts = {}
+    for name, cache in REPORTED_CACHES.items():
+        stats = cache.stats()
+        disk_hits = stats.get("disk_hits", 0)
+        counts[name] = (stats["hits"] + disk_hits, stats["misses"] - disk_hits)
+
+    return counts
+
+def _call_entry_point(request: tuple):
+    # runs one request against the solver entry points, as the app would; returns (endpoint, seconds, error, cache counts)
+    endpoint, body = request
+    if _worker_cold:
+        clear_solver_caches()
+    counts = get_cache_counts()
+
+    start = time.perf_counter()
+    try:
+        if endpoint == "/solve":
+            wordle_wizard(word_list = _worker_words, max_guesses = 6, guess = body["start"], target = body["target"], return_stats = True)
+        else:
+            wordle_wizard_cheat(guesses = body["guesses"], word_list = _worker_words, max_guesses = 6, target = body["target"], return_stats = True)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    seconds = time.perf_counter() - start
+
+    cache_counts = {}
+    for name, (hits, misses) in get_cache_counts().items():
+        cache_counts[name] = (hits - counts[name][0], misses - counts[name][1])
+
+    return endpoint, seconds, error, cache_counts
+
+def run_entry_points(word_list: list, requests, concurrency: int, duration: float, cold: bool = False):
+    """
+    Sends `requests` (an iterable, e.g. `itertools.cycle` of a mix or `iter_requests`) to the solver entry points in a pool of
+    `concurrency` worker processes until `duration` seconds have passed. At most `concurrency` requests are in flight at a time, so
+    the run ends within one request of the deadline. If `cold` is True, every solver cache is emptied before each request.
+    Returns a list of (endpoint, seconds, error, cache counts) per finished request.
+    """
+
+    results = []
+    in_flight = threading.BoundedSemaphore(concurrency)
+    deadline = time.perf_counter() + duration
+
+    def finished(result):
+        results.append(result)
+        in_flight.release()
+
+    def failed(error):
+        results.append(("?", 0.0, f"{type(error).__name__}: {error}", {}))
+        in_flight.release()
+
+    with multiprocessing.Pool(processes = concurrency, initializer = _init_worker, initargs = (list(word_list), cold)) as pool:
+        for request in requests:
+            in_flight.acquire()
+            if time.perf_counter() >= deadline:
+                in_flight.release()
+                break
+            pool.apply_async(_call_entry_point, (request,), callback = finished, error_callback = failed)
+
+        for i in range(concurrency): # wait for the requests still in flight
+            in_flight.acquire()
+
+    return results
+
+async def _http_client(host: str, port: int, requests, deadline: float, results: list):
+    # one simulated user: sends the next request of the shared iterator, one at a time, over a keep-alive connection
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            endpoint, body = next(requests)
+            payload = json.dumps(body).encode("utf-8")
+
+            start = time.perf_counter()
+            writer.write(f"POST {endpoint} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload)
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, separator, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+
+            results.append((endpoint, time.perf_counter() - start, None if status == 200 else f"HTTP {status}", None))
+    finally:
+        writer.close()
+
+def run_service(url: str, requests, concurrency: int, duration: float):
+    """
+    Sends `requests` (an iterable, shared by the clients) to the service at `url` with `concurrency` clients for `duration` seconds.
+    Returns a list of (endpoint, seconds, error, None) per finished request -- the service's cache counters aren't visible from here.
+    """
+
+    parts = urlsplit(url)
+    requests = iter(requests)
+    results = []
+
+    async def run_clients():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[_http_client(parts.hostname, parts.port or 80, requests, deadline, results) for i in range(concurrency)])
+
+    asyncio.run(run_clients())
+
+    return results
+
+### Report
+
+def get_cache_hit_rates(results: list):
+    """
+    Hit rate of each reported cache over the requests of a run, or None if no request carried cache counts (e.g. against a service).
+    """
+
+    totals = {}
+    for endpoint, seconds, error, cache_counts in results:
+        for name, (hits, misses) in (cache_counts or {}).items():
+            total = totals.setdefault(name, [0, 0])
+            total[0] += hits
+            total[1] += misses
+
+    if not totals:
+        return None
+
+    return {name: round(hits / (hits + misses), 4) if hits + misses else None for name, (hits, misses) in totals.items()}
+
+def summarize_load(results: list, duration: float, samples: list, concurrency: int):
+    """
+    Throughput, error count, latency percentiles (overall and per endpoint) and cache hit rates of a run, plus its CPU and RSS samples.
+    """
+
+    ok = [result for result in results if result[2] is None]
+    errors = {}
+    for endpoint, seconds, error, cache_counts in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+
+    summary = {
+        "concurrency": concurrency,
+        "duration_s": round(duration, 2),
+        "requests": len(results),
+        "errors": errors,
+        "throughput_rps": round(len(ok) / duration, 2) if duration > 0 else 0.0,
+        "latency": summarize_times([result[1] for result in ok]) if ok else None,
+        "latency_by_endpoint": {},
+        "cache_hit_rate": get_cache_hit_rates(results),
+        "cpu_percent_mean": round(sum(sample["cpu_percent"] for sample in samples) / len(samples), 1) if samples else None,
+        "rss_mb_peak": max((sample["rss_mb"] for sample in samples), default = None),
+        "samples": samples,
+    }
+    for endpoint in sorted({result[0] for result in ok}):
+        summary["latency_by_endpoint"][endpoint] = summarize_times([result[1] for result in ok if result[0] == endpoint])
+
+    return summary
+
+def print_summary(summary: dict):
+    print(f"{summary['requests']} requests in {summary['duration_s']} s at concurrency {summary['concurrency']}: "
+          f"{summary['throughput_rps']} requests/s, errors {summary['errors'] or 0}")
+    if summary["latency"] is not None:
+        for name, stats in [("all", summary["latency"])] + list(summary["latency_by_endpoint"].items()):
+            print(f"{name:>10} | p50 {stats['p50'] * 1000:8.2f} ms | p95 {stats['p95'] * 1000:8.2f} ms | p99 {stats['p99'] * 1000:8.2f} ms | n {stats['n']}")
+    if summary["cache_hit_rate"] is not None:
+        print("cache hit rate | " + " | ".join(f"{name} {'-' if rate is None else f'{rate:.1%}'}" for name, rate in summary["cache_hit_rate"].items()))
+    print(f"CPU {summary['cpu_percent_mean']}% of one core on average | peak RSS {summary['rss_mb_peak']} MB")
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Replay a realistic request mix against the solver and measure throughput and latency.")
+    parser.add_argument("--concurrency", type = int, default = 4, help = "worker processes (entry points) or clients (--url)")
+    parser.add_argument("--duration", type = float, default = 30.0, help = "seconds to run")
+    parser.add_argument("--requests", type = int, default = 2000, help = "distinct requests in the mix, replayed in a loop (--cache warm)")
+    parser.add_argument("--cache", choices = ["warm", "fresh", "cold"], default = "warm",
+                        help = "warm: replay the mix in a loop; fresh: a new request every time; cold: fresh, and empty the solver caches before each request")
+    parser.add_argument("--daily-share", type = float, default = 0.5, help = "fraction of Daily Assistant requests")
+    parser.add_argument("--daily-target", default = None, help = "target of Daily Assistant requests (default: a random word)")
+    parser.add_argument("--url", default = None, help = "base URL of a running local service (default: call the entry points)")
+    parser.add_argument("--pid", type = int, default = None, help = "process to watch for CPU and RSS with --url, e.g. the service's")
+    parser.add_argument("--interval", type = float, default = 1.0, help = "seconds between CPU and RSS samples")
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--output", default = DEFAULT_OUTPUT_PATH)
+    args = parser.parse_args(argv)
+    if args.cache == "cold" and args.url:
+        parser.error("--cache cold can only empty the caches of the entry-point workers; use --cache fresh with --url")
+
+    word_list = load_official_words()
+    if args.cache == "warm":
+        requests = cycle(make_request_mix(word_list, args.requests, daily_share = args.daily_share, daily_target = args.daily_target, seed = args.seed))
+    else:
+        requests = iter_requests(word_list, daily_share = args.daily_share, daily_target = args.daily_target, seed = args.seed)
+
+    monitor = ResourceMonitor(pid = args.pid if args.url else None, interval = args.interval)
+    monitor.start()
+    start = time.perf_counter()
+    if args.url:
+        results = run_service(args.url, requests, args.concurrency, args.duration)
+    else:
+        results = run_entry_points(word_list, requests, args.concurrency, args.duration, cold = args.cache == "cold")
+    duration = time.perf_counter() - start
+    samples = monitor.stop()
+
+    summary = summarize_load(results, duration, samples, args.concurrency)
+    summary["target"] = args.url or "entry points"
+    summary["cache"] = args.cache
+    print_summary(summary)
+    write_json(summary, args.output)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Exhaustive ranking of every word in the lexicon as a starting word ("opener").
+
+Every word is scored against every possible target, split over a process pool, and the ranking is written to a CSV file.
+Metrics (the first three are always computed, since they come from the same pass over the targets):
+
+    rating       letter frequency rating, as used by the solver (see `best_guess_words`) -- higher is better
+    entropy      expected information (bits) from the opener's feedback over all targets -- higher is better
+    minimax      size of the largest group of targets sharing the same feedback -- lower is better
+    avg_guesses  average number of guesses the solver needs from this opener (fails count as `max_guesses` + 1) -- lower is better.
+                 Simulated for every target, so much slower; rows of an existing solve table (see solve_table.py) are reused
+
+Usage:
+------
+    python opener_search.py                                   # rank by entropy into opener_ranking.csv
+    python opener_search.py --metric minimax --top 10
+    python opener_search.py --metric avg_guesses --openers slate,crane,trace
+    python opener_search.py --compare-strategies --openers slate,crane     # average guesses of each solver strategy
+"""
+
+import argparse
+import csv
+import math
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from wordle_assistant_functions import *
+from solve_table import DEFAULT_TABLE_DIR, get_tree_outcomes, load_official_words, load_solve_table, solve_opener
+from shared_index import get_worker_words, share_word_list
+
+DEFAULT_OUTPUT_PATH = "opener_ranking.csv"
+METRICS = ("rating", "entropy", "minimax", "avg_guesses")
+HIGHER_IS_BETTER = {"rating": True, "entropy": True, "minimax": False, "avg_guesses": False}
+
+### Scoring
+
+def score_opener(opener: str, word_list: list, ratings: dict, max_guesses: int = 6, simulate: bool = False, lexicon_key: bytes = None,
+                 strategy: str = "rating"):
+    """
+    Scores one opener against every target in `word_list`.
+
+    ------
+    Parameters:
+    ------
+    `opener`: str
+        starting word to score, one of `word_list`
+    `word_list`: list
+        list of valid words. Every word is used as a target
+    `ratings`: dict
+        {word : rating} for every word (see `best_guess_words`)
+    `max_guesses`: int
+        the maximum number of attempts allowed to solve the Wordle, for `avg_guesses`
+    `simulate`: bool
+        if True, also solves every puzzle from `opener` for `avg_guesses` and `failures`
+    `lexicon_key`: bytes
+        fingerprint of `word_list`, for the shared transition cache. Computed if not passed
+    `strategy`: str
+        solver strategy simulated for `avg_guesses`, one of `solve_strategies`
+
+    ------
+    Returns:
+    ------
+    `scores`: dict
+        {"word", "rating", "entropy", "minimax"} and, if `simulate` == True, {"avg_guesses", "failures"}
+    """
+
+    #### Letter codes of the word list, encoded once per word list in its lexicon table instead of once per opener
+    table = get_lexicon_table(word_list, lexicon_key)
+    codes = table["codes"] if table["codes"] is not None else encode_words(word_list)
+    patterns = get_feedback_matrix(codes[[table["word_index"][opener]]], codes)[0]
+    bucket_sizes = np.unique(patterns, return_counts = True)[1]
+
+    entropy = 0.0
+    for size in bucket_sizes.tolist():
+        probability = size / len(word_list)
+        entropy -= probability * math.log2(probability)
+
+    scores = {
+        "word": opener,
+        "rating": ratings[opener],
+        "entropy": round(entropy, 6),
+        "minimax": int(bucket_sizes.max()),
+    }
+
+    if simulate == True:
+        tree = solve_opener(word_list, opener, max_guesses = max_guesses, lexicon_key = lexicon_key, strategy = strategy)
+        num_guesses, solved = get_tree_outcomes(tree, len(word_list), max_guesses)
+        scores.update(summarize_guesses(num_guesses, solved, max_guesses))
+
+    return scores
+
+def summarize_guesses(num_guesses: np.ndarray, solved: np.ndarray, max_guesses: int):
+    """
+    Average number of guesses over all targets, counting each failure as `max_guesses` + 1, and the number of failures.
+    """
+
+    penalized = np.where(solved, num_guesses, max_guesses + 1)
+
+    return {"avg_guesses": round(float(penalized.mean()), 6), "failures": int((~solved).sum())}
+
+_worker_words = None
+_worker_ratings = None
+_worker_lexicon_key = None
+
+def _init_worker(word_list, ratings: dict):
+    global _worker_words, _worker_ratings, _worker_lexicon_key
+    _worker_words = get_worker_words(word_list)
+    _worker_ratings = ratings
+    _worker_lexicon_key = get_words_fingerprint(_worker_words)
+
+def _score_chunk(job: tuple):
+    openers, max_guesses, simulate, strategy = job
+    return [score_opener(opener, _worker_words, _worker_ratings, max_guesses = max_guesses, simulate = simulate, lexicon_key = _worker_lexicon_key,
+                         strategy = strategy)
+            for opener in openers]
+
+def score_openers(word_list: list, openers: list = None, metric: str = "entropy", max_guesses: int = 6, processes: int = None,
+                  chunk_size: int = None, solve_table_path: str = DEFAULT_TABLE_DIR, shared_index: str = None, progress: bool = True,
+                  strategy: str = "rating"):
+    """
+    Scores every opener (by default every word in `word_list`) over a process pool.
+
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words. Every word is used as a target
+    `openers`: list
+        starting words to score. Defaults to every word in `word_list`
+    `metric`: str
+        one of `METRICS`. "avg_guesses" turns on the (slow) simulation of every puzzle
+    `max_guesses`: int
+        the maximum number of attempts allowed to solve the Wordle, for "avg_guesses"
+    `processes`: int
+        size of the process pool. Defaults to the number of CPUs
+    `chunk_size`: int
+        openers sent to a worker at a time. Defaults to 1 when simulating, else 64
+    `solve_table_path`: str
+        directory of a solve table whose finished rows are reused for "avg_guesses" instead of simulating again
+    `shared_index`: str
+        directory of a shared index of `word_list` (see shared_index.py), published if needed, that the workers attach to instead of
+        each building their own copy of the word list's data
+    `progress`: bool
+        if True, prints progress and an estimated time remaining to stderr
+    `strategy`: str
+        solver strategy simulated for "avg_guesses", one of `solve_strategies`
+
+    ------
+    Returns:
+    ------
+    `scores`: list
+        list of dicts (see `score_opener`), in `openers` order
+    """
+
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Choose from {METRICS}.")
+
+    openers = list(word_list) if openers is None else list(openers)
+    missing = [opener for opener in openers if opener not in word_list]
+    if missing:
+        raise ValueError(f"Openers not in the word list: {missing}")
+
+    simulate = metric == "avg_guesses"
+    chunk_size = chunk_size or (1 if simulate else 64)
+    ratings = dict(best_guess_words(word_list))
+
+    ### Reuse a matching solve table for any opener it has already solved
+    precomputed = {}
+    table = load_solve_table(solve_table_path) if simulate else None
+    if (table is not None and table.words == list(word_list) and table.max_guesses == max_guesses and table.strategy == strategy
+            and table.settings == get_solver_settings()):
+        for opener in openers:
+            outcomes = table.get_outcomes(opener)
+            if outcomes is not None:
+                precomputed[opener] = summarize_guesses(*outcomes, max_guesses)
+
+    to_score = [opener for opener in openers if opener not in precomputed]
+    jobs = [(to_score[i:i + chunk_size], max_guesses, simulate, strategy) for i in range(0, len(to_score), chunk_size)]
+
+    scores = {}
+    for opener, summary in precomputed.items():
+        scores[opener] = score_opener(opener, word_list, ratings)
+        scores[opener].update(summary)
+
+    if progress:
+        print(f"Scoring {len(to_score)} openers ({len(precomputed)} taken from the solve table).", file = sys.stderr)
+
+    start_time = time.perf_counter()
+    finished = 0
+    if shared_index is not None:
+        share_word_list(word_list, shared_index)
+
+    with multiprocessing.Pool(processes = processes, initializer = _init_worker, initargs = (shared_index or list(word_list), ratings)) as pool:
+        for chunk_scores in pool.imap_unordered(_score_chunk, jobs):
+            for opener_scores in chunk_scores:
+                scores[opener_scores["word"]] = opener_scores
+            finished += len(chunk_scores)
+
+            if progress:
+                elapsed = time.perf_counter() - start_time
+                remaining = elapsed / finished * (len(to_score) - finished)
+                print(f"\r{finished}/{len(to_score)} openers | {elapsed:.0f} s elapsed | ~{remaining:.0f} s remaining", end = "", file = sys.stderr)
+
+    if progress and jobs:
+        print(file = sys.stderr)
+
+    return [scores[opener] for opener in openers]
+
+def compare_strategies(word_list: list, openers: list, strategies: tuple = ("rating", "lookahead"), max_guesses: int = 6, processes: int = None,
+                       solve_table_path: str = DEFAULT_TABLE_DIR, shared_index: str = None, progress: bool = True):
+    """
+    Simulates every puzzle from each of `openers` with each solver strategy (see `solve_strategies`), for their average number of guesses.
+    The "policy" strategy needs its policy loaded in the worker processes too (see `use_policy`), so it isn't compared by default.
+
+    ------
+    Returns:
+    ------
+    `comparison`: list
+        list of dicts, one per opener: {"word"} and, per strategy, its "avg_guesses", "failures" and "seconds" of simulation, under the strategy's name
+    """
+
+    comparison = [{"word": opener} for opener in openers]
+    for strategy in strategies:
+        start_time = time.perf_counter()
+        scores = score_openers(word_list, openers = openers, metric = "avg_guesses", max_guesses = max_guesses, processes = processes,
+                               solve_table_path = solve_table_path, shared_index = shared_index, progress = progress, strategy = strategy)
+        seconds = round(time.perf_counter() - start_time, 2)
+        for row, opener_scores in zip(comparison, scores):
+            row[strategy] = {"avg_guesses": opener_scores["avg_guesses"], "failures": opener_scores["failures"], "seconds": seconds}
+
+    return comparison
+
+def rank_openers(scores: list, metric: str = "entropy"):
+    """
+    Sorts scores best first by `metric`. Ties are broken by rating (higher first), then by the original order.
+    """
+
+    sign = -1 if HIGHER_IS_BETTER[metric] else 1
+    ranked = sorted(scores, key = lambda opener: (sign * opener[metric], -opener["rating"]))
+
+    for rank, opener in enumerate(ranked, start = 1):
+        opener["rank"] = rank
+
+    return ranked
+
+def write_ranking(ranked: list, path: str = DEFAULT_OUTPUT_PATH):
+    """
+    Writes ranked scores (see `rank_openers`) to a CSV file, one row per opener, best first.
+    """
+
+    columns = ["rank", "word", "rating", "entropy", "minimax"]
+    if ranked and "avg_guesses" in ranked[0]:
+        columns += ["avg_guesses", "failures"]
+
+    with open(path, "w", encoding = "utf-8", newline = "") as f:
+        writer = csv.DictWriter(f, fieldnames = columns, extrasaction = "ignore")
+        writer.writeheader()
+        writer.writerows(ranked)
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Rank every word of the word list as a starting word.")
+    parser.add_argument("--metric", default = "entropy", choices = METRICS)
+    parser.add_argument("--openers", default = None, help = "comma-separated starting words (default: every word)")
+    parser.add_argument("--max-guesses", type = int, default = 6)
+    parser.add_argument("--processes", type = int, default = None, help = "worker processes (default: number of CPUs)")
+    parser.add_argument("--shared-index", default = None, help = "directory of a shared index the workers attach to")
+    parser.add_argument("--solve-table", default = DEFAULT_TABLE_DIR, help = "solve table reused for avg_guesses")
+    parser.add_argument("--output", default = DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--top", type = int, default = 20, help = "openers printed")
+    parser.add_argument("--strategy", default = "rating", choices = solve_strategies, help = "solver strategy simulated for avg_guesses")
+    parser.add_argument("--compare-strategies", action = "store_true", help = "compare the average guesses of every strategy from --openers instead")
+    args = parser.parse_args(argv)
+
+    word_list = load_official_words()
+    openers = args.openers.split(",") if args.openers else None
+
+    if args.compare_strategies:
+        comparison = compare_strategies(word_list, openers or ["slate", "crane", "trace"], max_guesses = args.max_guesses, processes = args.processes,
+                                        solve_table_path = args.solve_table, shared_index = args.shared_index)
+        for row in comparison:
+            print(f"{row['word']} | " + " | ".join(f"{strategy} {row[strategy]['avg_guesses']:.4f} avg guesses, {row[strategy]['failures']} failures"
+                                                  for strategy in row if strategy != "word"))
+        return 0
+
+    scores = score_openers(word_list, openers = openers, metric = args.metric, max_guesses = args.max_guesses, processes = args.processes,
+                           solve_table_path = args.solve_table, shared_index = args.shared_index, strategy = args.strategy)
+    ranked = rank_openers(scores, metric = args.metric)
+    write_ranking(ranked, args.output)
+
+    for opener in ranked[:args.top]:
+        print(f"{opener['rank']:>5} | {opener['word']} | {args.metric} {opener[args.metric]}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Streaming builder of the pattern matrix: the feedback (see `get_feedback`) of every word of the word list against every word.
+
+The matrix grows with the square of the word list -- about 225 MB for 15,000 words -- so it isn't computed in one go. Rows are computed
+a block at a time, with the block size chosen to stay under a fixed memory ceiling, and each block is written straight into a .npy file
+that's memory-mapped on load. The working memory of every block is measured (with tracemalloc); blocks that go over the ceiling shrink the
+ones after them, and the build fails if a single row can't fit. Finished rows are recorded next to it, so an interrupted build resumes where
+it stopped. Progress, the peak working memory and the peak resident memory (RSS) of the build are printed to stderr.
+
+Usage:
+------
+    python pattern_matrix.py                       # shipped word list into data/pattern_matrix/
+    python pattern_matrix.py --max-memory 32       # at most ~32 MB of working memory
+    python pattern_matrix.py --synthetic 15000     # a synthetic lexicon of 15,000 words (see benchmarks.py)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import resource
+except ImportError: # not available on Windows
+    resource = None
+
+from wordle_assistant_functions import *
+from solve_table import load_official_words
+
+DEFAULT_MATRIX_DIR = "data/pattern_matrix"
+DEFAULT_MAX_MEMORY = 128 * 1024 ** 2
+FORMAT_VERSION = 1
+
+def get_peak_rss():
+    """
+    Peak resident memory of this process so far, in MB, or None where the platform can't tell.
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KB on Linux
+
+def _open_files(path: str, manifest: dict, mode: str):
+    """
+    Opens the row-done flags (memory-mapped) and returns them with the byte offset of the matrix data in patterns.npy.
+    """
+
+    shape = (len(manifest["words"]), len(manifest["words"]))
+    if mode == "w+":
+        # only the header is written; the data is filled in block by block
+        np.lib.format.open_memmap(os.path.join(path, "patterns.npy"), mode = "w+", dtype = manifest["dtype"], shape = shape).flush()
+    done = np.lib.format.open_memmap(os.path.join(path, "done.npy"), mode = mode, dtype = bool, shape = (shape[0],))
+    offset = np.load(os.path.join(path, "patterns.npy"), mmap_mode = "r").offset
+
+    return done, offset
+
+def build_pattern_matrix_file(word_list: list, path: str = DEFAULT_MATRIX_DIR, max_memory: int = DEFAULT_MAX_MEMORY, duplicates: bool = False,
+                              progress: bool = True):
+    """
+    Computes the pattern matrix of `word_list` in blocks of rows and streams them into `path`/patterns.npy.
+
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words, used as both guesses and targets
+    `path`: str
+        directory of the matrix. A build with the same settings already in it is resumed
+    `max_memory`: int
+        bytes of working memory for the computation: the kernel's intermediates (see `get_feedback_bytes_per_pair`) and the finished
+        block. Blocks of rows are sized to fit it, and shrunk if one goes over; the file itself is never held in memory
+    `duplicates`: bool
+        if True, follows the official Wordle rules for repeated letters (see `get_feedback`)
+    `progress`: bool
+        if True, prints progress, an estimated time remaining and the peak RSS to stderr
+
+    ------
+    Returns:
+    ------
+    `manifest`: dict
+        the matrix's manifest, as saved in `path`/manifest.json
+    """
+
+    codes = encode_words(word_list)
+    dtype = get_feedback_matrix(codes[:1], codes[:1]).dtype
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "lexicon_version": get_words_fingerprint(word_list).hex(),
+        "duplicates": duplicates,
+        "dtype": dtype.str,
+        "words": list(word_list),
+    }
+
+    os.makedirs(path, exist_ok = True)
+    manifest_path = os.path.join(path, "manifest.json")
+    existing = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding = "utf-8") as f:
+            existing = json.load(f)
+
+    if existing == manifest:
+        done, offset = _open_files(path, manifest, "r+")
+    else: # new matrix -- the manifest is written first, so a later run knows the files belong to it
+        with open(f"{manifest_path}.tmp", "w", encoding = "utf-8") as f:
+            json.dump(manifest, f)
+        done, offset = _open_files(path, manifest, "w+")
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    ### Blocks of rows sized to the memory ceiling: the kernel's working memory plus the finished block
+    num_words = len(word_list)
+    bytes_per_row = (get_feedback_bytes_per_pair(codes.shape[1], duplicates) + dtype.itemsize) * max(num_words, 1)
+    if bytes_per_row > max_memory:
+        raise MemoryError(f"A row of the matrix needs {bytes_per_row / 1024 ** 2:.1f} MB of working memory, over the {max_memory / 1024 ** 2:.1f} MB ceiling.")
+    block_size = max_memory // bytes_per_row
+    row_bytes = num_words * dtype.itemsize
+
+    todo = np.flatnonzero(~done)
+    if progress:
+        print(f"{num_words - len(todo)}/{num_words} rows already built; building {len(todo)} in blocks of {block_size} rows.", file = sys.stderr)
+
+    tracing = tracemalloc.is_tracing()
+    if tracing == False:
+        tracemalloc.start()
+    peak_working = 0
+
+    start_time = time.perf_counter()
+    finished = 0
+    try:
+        with open(os.path.join(path, "patterns.npy"), "r+b") as f:
+            # rows left by an interrupted build are contiguous runs; each run is cut into blocks
+            runs = np.split(todo, np.flatnonzero(np.diff(todo) != 1) + 1) if len(todo) > 0 else []
+            for run in runs:
+                start = int(run[0])
+                while start <= int(run[-1]):
+                    stop = min(start + block_size, int(run[-1]) + 1)
+
+                    before = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                    block = get_feedback_matrix(codes[start:stop], codes, duplicates = duplicates,
+                                                memory_budget = max_memory - (stop - start) * row_bytes)
+
+                    f.seek(offset + start * row_bytes)
+                    f.write(block) # straight from the array's buffer, without a copy
+                    f.flush()
+                    os.fsync(f.fileno())
+                    done[start:stop] = True # only marked once the rows themselves are on disk
+                    done.flush()
+
+                    working = tracemalloc.get_traced_memory()[1] - before
+                    del block
+                    peak_working = max(peak_working, working)
+                    if working > max_memory: # the rows are kept, but the next blocks are made smaller
+                        if block_size == 1:
+                            raise MemoryError(f"A single row took {working / 1024 ** 2:.1f} MB of working memory, over the {max_memory / 1024 ** 2:.1f} MB ceiling.")
+                        block_size = max(1, int(block_size * max_memory / working))
+                        if progress:
+                            print(f"\nBlock took {working / 1024 ** 2:.1f} MB, over the ceiling; continuing in blocks of {block_size} rows.", file = sys.stderr)
+
+                    finished += stop - start
+                    start = stop
+                    if progress:
+                        elapsed = time.perf_counter() - start_time
+                        remaining = elapsed / finished * (len(todo) - finished)
+                        print(f"\r{finished}/{len(todo)} rows | {elapsed:.0f} s elapsed | ~{remaining:.0f} s remaining | peak working memory "
+                              f"{peak_working / 1024 ** 2:.0f} MB | peak RSS {get_peak_rss() or 0:.0f} MB", end = "", file = sys.stderr)
+    finally:
+        if tracing == False:
+            tracemalloc.stop()
+
+    if progress:
+        if len(todo) > 0:
+            print(file = sys.stderr)
+        print(f"Peak working memory: {peak_working / 1024 ** 2:.0f} MB (ceiling {max_memory / 1024 ** 2:.0f} MB) | peak RSS of the process: {get_peak_rss() or 0:.0f} MB",
+              file = sys.stderr)
+
+    return manifest
+
+def load_pattern_matrix(path: str = DEFAULT_MATRIX_DIR):
+    """
+    Loads the matrix at `path`, memory-mapped, as (manifest, patterns). Returns None if there isn't one or it isn't finished.
+    """
+
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, "r", encoding = "utf-8") as f:
+        manifest = json.load(f)
+    if manifest["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Pattern matrix at {path} has format version {manifest['format_version']}, expected {FORMAT_VERSION}. Rebuild it.")
+
+    if not np.load(os.path.join(path, "done.npy"), mmap_mode = "r").all():
+        return None
+
+    return manifest, np.load(os.path.join(path, "patterns.npy"), mmap_mode = "r")
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Build the pattern matrix of the word list under a memory ceiling.")
+    parser.add_argument("--output", default = DEFAULT_MATRIX_DIR, help = "directory of the matrix")
+    parser.add_argument("--max-memory", type = int, default = DEFAULT_MAX_MEMORY // 1024 ** 2, help = "MB of working memory")
+    parser.add_argument("--duplicates", action = "store_true", help = "official feedback rules for repeated letters")
+    parser.add_argument("--synthetic", type = int, default = None, help = "build for a synthetic lexicon of this many words instead")
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args(argv)
+
+    word_list = load_official_words()
+    if args.synthetic is not None:
+        from benchmarks import make_synthetic_lexicon
+
+        word_list = make_synthetic_lexicon(args.synthetic, word_list, seed = args.seed)
+
+    build_pattern_matrix_file(word_list, path = args.output, max_memory = args.max_memory * 1024 ** 2, duplicates = args.duplicates)
+    print(f"Pattern matrix of {len(word_list)} words saved to {args.output}.")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
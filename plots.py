@@ -1,4 +1,5 @@
 from wordle_assistant_functions import *
+from artifacts import artifact_store # plot data is saved with the other word list artifacts
 import pandas as pd
 import streamlit as st
 import plotly.express as px
@@ -15,7 +16,7 @@ f.close() # closes connection to file
 english_alphabet = "abcdefghijklmnopqrstuvwxyz"
 
 def count_plot():
-    letter_counts = get_letter_counts(word_list = official_words, letters = english_alphabet, sort = "descending", unique = True)
+    letter_counts = artifact_store.get("letter_counts").items() # {letter : count}, in alphabetical order -- the plot sorts them
     letter_counts_dict = {} # {letter : count}
     letter_counts_dict["Letter"] = []
     letter_counts_dict["Count"] = []
@@ -39,43 +40,12 @@ def count_plot():
     st.plotly_chart(counts_plot, use_container_width = True)
 
 def words_plot():
-    letter_counts = get_letter_counts(word_list = official_words, letters = english_alphabet, sort = "descending", unique = True)
-    total_letters_sum = sum(count for letter, count in letter_counts) 
+    plot_data = artifact_store.get("plot_data")
 
-    word_counts = []
-
-    for word in official_words:
-        
-        # get set of all letters in the word (this intentionally doesn't count duplicate letters)
-        word_letters = set()
-        for letter in word:
-            word_letters.add(letter)
-        
-        # get the sum of all counts of each letter in the word
-        word_sum = 0
-        for letter in word_letters:
-            word_sum += dict(letter_counts)[letter]
-
-        # finally, add the word and its letter count sum to the list    
-        word_counts.append((word, round(word_sum / total_letters_sum * 100, 2)))
-    # word_counts
-    ### Best and worst x words
-    words_counts_top_10 = sorted(word_counts, key = operator.itemgetter(1), reverse = True)[:5] # top 10 words
-    words_counts_middle_10 = sorted(word_counts, key = operator.itemgetter(1), reverse = True)[(len(word_counts) // 2) - 10 : (len(word_counts) // 2) - 5] # top 10 words
-    words_counts_bottom_10 = sorted(word_counts, key = operator.itemgetter(1), reverse = False)[:6] # bottom 10 words
+    ### Best, middle and worst words and their ratings
     words_counts_x_dict = {}
-    words_counts_x_dict["Word"] = []
-    words_counts_x_dict["Rating"] = []
-
-    for word, rating in words_counts_top_10:
-        words_counts_x_dict["Word"].append(word)
-        words_counts_x_dict["Rating"].append(rating)
-    for word, rating in words_counts_middle_10:
-        words_counts_x_dict["Word"].append(word)
-        words_counts_x_dict["Rating"].append(rating)
-    for word, rating in words_counts_bottom_10:
-        words_counts_x_dict["Word"].append(word)
-        words_counts_x_dict["Rating"].append(rating)
+    words_counts_x_dict["Word"] = plot_data["words"]
+    words_counts_x_dict["Rating"] = plot_data["ratings"]
 
     words_counts_x_df = pd.DataFrame(words_counts_x_dict)
     words_counts_x_plot = px.bar(words_counts_x_df, x = "Word", y = "Rating", title = "A Selection of Wordle Words and Their Ratings")
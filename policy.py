@@ -0,0 +1,394 @@
+"""
+Offline solver of the optimal policy: the decision tree of guesses that solves every target of the word list in the fewest guesses
+on average, never needing more than `max_guesses`.
+
+Each opener ("root") is solved by depth-first branch-and-bound over the candidate sets its feedback can leave. At every set, the guesses
+are tried best first by their one-step score (see `get_one_step_costs`). A guess is dropped as soon as its total so far, plus a lower
+bound for the groups of candidates not yet solved, can't beat the best guess found (each group takes at least one guess per candidate
+and one more for all but one of them). Results are memoized by candidate set -- as a bitset, the same set reached by different paths
+is the same key -- and by guesses left. Roots are solved in parallel, sharing the best total found so far as the bound of the others,
+and each finished root is checkpointed, so an interrupted run resumes with the roots it hasn't finished.
+
+With `--branching 0` every word is tried at every set and the result is proven optimal, which takes very long in pure Python.
+By default only the `--branching` best guesses by one-step score are tried at each set: the policy is then the best among those.
+
+Usage:
+------
+    python policy.py                                  # the 10 most promising openers, 20 guesses tried per set, into data/policy/
+    python policy.py --roots slate,crane,trace --branching 30
+    python policy.py --summary                        # openers solved so far, best first
+
+Once solved, `use_policy(load_policy())` lets `wordle_wizard(..., strategy = "policy")` play the policy.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from wordle_assistant_functions import *
+from solve_table import load_official_words, ALL_PERFECT
+from shared_index import get_worker_words, share_word_list
+
+DEFAULT_POLICY_DIR = "data/policy"
+FORMAT_VERSION = 1
+
+def _fewest_guesses(size: int):
+    # lower bound of the total guesses for `size` candidates: one guessed first, every other one second at best
+    return 2 * size - 1
+
+class PolicySearch:
+    """
+    Branch-and-bound search of the optimal policy of one word list, with the memo shared by every root solved in the same process.
+
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words. Every word is a possible target and a possible guess
+    `max_guesses`: int
+        the maximum number of attempts allowed to solve the Wordle
+    `branching`: int
+        number of guesses tried at each candidate set, best one-step score first. None (or 0) tries every guess of the pool
+    `guess_pool`: str
+        "all" to allow every word of `word_list` as a guess, or "candidates" to only guess words that are still possible
+    """
+
+    def __init__(self, word_list: list, max_guesses: int = 6, branching: int = 20, guess_pool: str = "all"):
+        if guess_pool not in ("candidates", "all"):
+            raise ValueError(f"Unknown guess pool '{guess_pool}'. Use 'candidates' or 'all'.")
+
+        self.word_list = word_list
+        self.max_guesses = max_guesses
+        self.branching = branching or None
+        self.guess_pool = guess_pool
+        self.codes = get_lexicon_table(word_list)["codes"]
+        if self.codes is None:
+            raise ValueError("The word list has words the batch feedback kernel can't encode (see `encode_words`).")
+        self.all_ids = np.arange(len(word_list))
+        self.memo = {} # (candidate bitset, guesses left) -> (total guesses, exact, best guess id). Inexact totals are lower bounds
+        self.nodes = 0
+
+    def split(self, guess_id: int, ids: np.ndarray):
+        """
+        Groups of candidates `ids` left by each feedback of `guess_id` (except the guess itself), largest first, as {pattern : ids}.
+        """
+
+        patterns = get_feedback_matrix(self.codes[[guess_id]], self.codes[ids])[0]
+        groups = {int(pattern) : ids[patterns == pattern] for pattern in np.unique(patterns) if pattern != ALL_PERFECT}
+
+        return dict(sorted(groups.items(), key = lambda item: -len(item[1])))
+
+    def guess_total(self, guess_id: int, ids: np.ndarray, guesses_left: int, bound: float):
+        """
+        Total guesses (summed over the candidates `ids`) of playing `guess_id` and then the best policy. Exact if below `bound`,
+        else a lower bound that's at least `bound`.
+        """
+
+        groups = self.split(guess_id, ids)
+        if any(len(group) == len(ids) for group in groups.values()): # the guess tells nothing apart
+            return float("inf")
+
+        total = len(ids) + sum(_fewest_guesses(len(group)) for group in groups.values())
+        for group in groups.values():
+            if total >= bound:
+                return total
+            fewest = _fewest_guesses(len(group))
+            total += self.solve(group, guesses_left - 1, bound - (total - fewest)) - fewest
+
+        return total
+
+    def solve(self, ids: np.ndarray, guesses_left: int, bound: float = float("inf")):
+        """
+        Fewest total guesses (summed over the candidates `ids`) to solve every candidate within `guesses_left` guesses: exact if below
+        `bound`, else a lower bound that's at least `bound`. Infinite if it can't be done.
+        """
+
+        if guesses_left <= 0:
+            return float("inf")
+        if len(ids) == 1:
+            return 1
+        if guesses_left == 1:
+            return float("inf")
+        if len(ids) == 2:
+            return 3
+
+        key = (ids_to_bitset(ids), guesses_left)
+        known = self.memo.get(key)
+        if known is not None and (known[1] or known[0] >= bound):
+            return known[0]
+
+        self.nodes += 1
+        pool_ids = self.all_ids if self.guess_pool == "all" else ids
+        order = pool_ids[np.argsort(get_one_step_costs(pool_ids, ids, self.codes), kind = "stable")][:self.branching]
+
+        best, best_id = bound, None
+        for guess_id in order:
+            total = self.guess_total(int(guess_id), ids, guesses_left, best)
+            if total < best:
+                best, best_id = total, int(guess_id)
+
+        if best_id is not None:
+            self.memo[key] = (best, True, best_id)
+        elif known is None or not known[1]: # never replace an exact total with a bound
+            self.memo[key] = (max(best, known[0] if known else 0), False, None)
+
+        return best
+
+    def tree(self, guess_id: int, ids: np.ndarray = None, guesses_left: int = None):
+        """
+        Policy tree of playing `guess_id` on the candidates `ids` (default: every word): {"guess": word, "next": {pattern : subtree}}.
+        Only valid once `guess_total` returned an exact total for it.
+        """
+
+        ids = self.all_ids if ids is None else ids
+        guesses_left = self.max_guesses if guesses_left is None else guesses_left
+
+        node = {"guess": self.word_list[guess_id], "next": {}}
+        for pattern, group in self.split(guess_id, ids).items():
+            if len(group) <= 2:
+                next_id = int(group[0])
+            else:
+                next_id = self.memo[(ids_to_bitset(group), guesses_left - 1)][2]
+            node["next"][str(pattern)] = self.tree(next_id, group, guesses_left - 1)
+
+        return node
+
+### Solving roots in parallel
+
+_worker_search = None
+_worker_best = None
+
+def _init_worker(word_list, max_guesses: int, branching: int, guess_pool: str, best_total):
+    global _worker_search, _worker_best
+    _worker_search = PolicySearch(get_worker_words(word_list), max_guesses = max_guesses, branching = branching, guess_pool = guess_pool)
+    _worker_best = best_total
+
+def _solve_root(root: str):
+    start_time = time.perf_counter()
+    guess_id = _worker_search.word_list.index(root)
+    bound = _worker_best.value
+
+    total = _worker_search.guess_total(guess_id, _worker_search.all_ids, _worker_search.max_guesses, bound)
+    exact = total < bound
+    tree = None
+    if exact:
+        tree = _worker_search.tree(guess_id)
+        with _worker_best.get_lock():
+            _worker_best.value = min(_worker_best.value, total)
+
+    return root, {"total": total if exact else None, "lower_bound": None if exact else total, "seconds": round(time.perf_counter() - start_time, 2),
+                  "nodes": _worker_search.nodes}, tree
+
+def _write_json(data, path: str):
+    with open(f"{path}.tmp", "w", encoding = "utf-8") as f:
+        json.dump(data, f)
+    os.replace(f"{path}.tmp", path)
+
+def solve_policy(word_list: list, path: str = DEFAULT_POLICY_DIR, roots: list = None, num_roots: int = 10, max_guesses: int = 6, branching: int = 20,
+                 guess_pool: str = "all", processes: int = None, shared_index: str = None, progress: bool = True):
+    """
+    Solves the optimal policy from each root (opener) in parallel and checkpoints every finished root under `path`.
+
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words. Every word is a possible target and a possible guess
+    `path`: str
+        directory of the policy. If it already holds a policy of the same word list and settings, finished roots aren't solved again
+    `roots`: list
+        openers to solve. Defaults to the `num_roots` best by one-step score (see `get_one_step_costs`)
+    `num_roots`: int
+        number of openers solved when `roots` isn't passed
+    `max_guesses`: int
+        the maximum number of attempts allowed to solve the Wordle. The policy never needs more
+    `branching`: int
+        guesses tried at each candidate set (see `PolicySearch`). 0 or None tries them all, for a proven optimal policy
+    `guess_pool`: str
+        "all" or "candidates" (see `PolicySearch`)
+    `processes`: int
+        size of the process pool. Defaults to the number of CPUs
+    `shared_index`: str
+        directory of a shared index of `word_list` (see shared_index.py), published if needed, that the workers attach to instead of
+        each building their own copy of the word list's data
+    `progress`: bool
+        if True, prints progress to stderr
+
+    ------
+    Returns:
+    ------
+    `manifest`: dict
+        the policy's manifest, as saved in `path`/manifest.json, with every root's result under "roots"
+    """
+
+    if roots is None:
+        codes = get_lexicon_table(word_list)["codes"]
+        ids = np.arange(len(word_list))
+        roots = [word_list[i] for i in np.argsort(get_one_step_costs(ids, ids, codes), kind = "stable")[:num_roots]]
+    missing = [root for root in roots if root not in word_list]
+    if missing:
+        raise ValueError(f"Openers not in the word list: {missing}")
+
+    settings = {
+        "format_version": FORMAT_VERSION,
+        "lexicon_version": get_words_fingerprint(word_list).hex(),
+        "max_guesses": max_guesses,
+        "branching": branching or None,
+        "guess_pool": guess_pool,
+    }
+
+    os.makedirs(os.path.join(path, "trees"), exist_ok = True)
+    manifest_path = os.path.join(path, "manifest.json")
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding = "utf-8") as f:
+            manifest = json.load(f)
+    if manifest is None or {key : value for key, value in manifest.items() if key != "roots"} != settings:
+        manifest = dict(settings, roots = {})
+        for name in os.listdir(os.path.join(path, "trees")):
+            os.remove(os.path.join(path, "trees", name))
+        _write_json(manifest, manifest_path)
+
+    # roots cut off by a bound are retried: the bound they lost to may not hold for this run's roots
+    todo = [root for root in roots if manifest["roots"].get(root, {}).get("total") is None]
+    best_total = min([result["total"] for result in manifest["roots"].values() if result["total"] is not None] + [float("inf")])
+    if progress:
+        print(f"{len(roots) - len(todo)}/{len(roots)} openers already solved; solving {len(todo)}.", file = sys.stderr)
+
+    start_time = time.perf_counter()
+    if shared_index is not None:
+        share_word_list(word_list, shared_index)
+
+    best = multiprocessing.Value("d", best_total)
+    with multiprocessing.Pool(processes = processes, initializer = _init_worker,
+                              initargs = (shared_index or list(word_list), max_guesses, branching, guess_pool, best)) as pool:
+        for finished, (root, result, tree) in enumerate(pool.imap_unordered(_solve_root, todo), start = 1):
+            if tree is not None: # the tree is on disk before the manifest says the root is solved
+                _write_json(tree, os.path.join(path, "trees", f"{root}.json"))
+            manifest["roots"][root] = result
+            _write_json(manifest, manifest_path)
+
+            if progress:
+                elapsed = time.perf_counter() - start_time
+                outcome = f"{result['total'] / len(word_list):.4f} avg guesses" if result["total"] is not None else "cut off by the best so far"
+                print(f"{finished}/{len(todo)} openers | {root}: {outcome} ({result['seconds']:.0f} s) | {elapsed:.0f} s elapsed", file = sys.stderr)
+
+    return manifest
+
+### Playing the policy
+
+class Policy:
+    """
+    Policy solved by `solve_policy`, loaded for play: for every candidate set a policy tree reaches, the guess to play.
+
+    Parameters:
+    ------
+    `path`: str
+        directory of the policy
+    `word_list`: list
+        list of valid words the policy was solved for
+    """
+
+    def __init__(self, path: str, word_list: list):
+        with open(os.path.join(path, "manifest.json"), "r", encoding = "utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Policy at {path} has format version {self.manifest['format_version']}, expected {FORMAT_VERSION}. Solve it again.")
+        if get_words_fingerprint(word_list).hex() != self.manifest["lexicon_version"]:
+            raise ValueError(f"Policy at {path} was solved for another word list.")
+
+        self.lexicon_version = self.manifest["lexicon_version"]
+        self.version = hashlib.blake2b(json.dumps(self.manifest, sort_keys = True).encode("utf-8"), digest_size = 8).hexdigest() # of the solved roots
+        self.num_words = len(word_list)
+        self.proven_optimal = self.manifest["branching"] is None
+        self.roots = sorted((root for root, result in self.manifest["roots"].items() if result["total"] is not None),
+                            key = lambda root: self.manifest["roots"][root]["total"])
+        self.best_root = self.roots[0] if self.roots else None
+
+        #### {candidate bitset : guess}, from the trees of the best roots first
+        self.guesses = {}
+        codes = get_lexicon_table(word_list)["codes"]
+        word_index = {word : i for i, word in enumerate(word_list)}
+        for root in self.roots:
+            with open(os.path.join(path, "trees", f"{root}.json"), "r", encoding = "utf-8") as f:
+                tree = json.load(f)
+
+            stack = [(tree, np.arange(len(word_list)))]
+            while stack:
+                node, ids = stack.pop()
+                self.guesses.setdefault(ids_to_bitset(ids), node["guess"])
+                patterns = get_feedback_matrix(codes[[word_index[node["guess"]]]], codes[ids])[0]
+                for pattern, child in node["next"].items():
+                    stack.append((child, ids[patterns == int(pattern)]))
+
+    def average_guesses(self, root: str = None):
+        """
+        Average number of guesses over every target from `root` (default: the best root).
+        """
+
+        root = root or self.best_root
+
+        return self.manifest["roots"][root]["total"] / self.num_words
+
+    def get_guess(self, lexicon_version: str, candidates: int):
+        """
+        Guess the policy plays on the `candidates` bitset, or None if the policy doesn't cover it (another word list, or a set none of
+        its trees reach).
+        """
+
+        if lexicon_version != self.lexicon_version:
+            return None
+
+        return self.guesses.get(candidates)
+
+def load_policy(path: str = DEFAULT_POLICY_DIR, word_list: list = None):
+    """
+    Loads the policy at `path` (see `Policy`) for `word_list` (default: the shipped list), or returns None if no opener is solved there yet.
+    """
+
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        return None
+
+    policy = Policy(path, word_list if word_list is not None else load_official_words())
+
+    return policy if policy.roots else None
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Solve the policy minimizing the average number of guesses, within the guess limit.")
+    parser.add_argument("--output", default = DEFAULT_POLICY_DIR, help = "directory of the policy")
+    parser.add_argument("--roots", default = None, help = "comma-separated openers to solve (default: the --num-roots most promising)")
+    parser.add_argument("--num-roots", type = int, default = 10)
+    parser.add_argument("--max-guesses", type = int, default = 6)
+    parser.add_argument("--branching", type = int, default = 20, help = "guesses tried per candidate set; 0 tries every word (proven optimal, very slow)")
+    parser.add_argument("--guess-pool", default = "all", choices = ("all", "candidates"))
+    parser.add_argument("--processes", type = int, default = None, help = "worker processes (default: number of CPUs)")
+    parser.add_argument("--shared-index", default = None, help = "directory of a shared index the workers attach to")
+    parser.add_argument("--summary", action = "store_true", help = "print the openers solved so far instead of solving")
+    args = parser.parse_args(argv)
+
+    word_list = load_official_words()
+
+    if not args.summary:
+        solve_policy(word_list, path = args.output, roots = args.roots.split(",") if args.roots else None, num_roots = args.num_roots,
+                     max_guesses = args.max_guesses, branching = args.branching, guess_pool = args.guess_pool, processes = args.processes,
+                     shared_index = args.shared_index)
+
+    policy = load_policy(args.output, word_list)
+    if policy is None:
+        print(f"No opener solved at {args.output} yet.")
+        return 0
+
+    for root in policy.roots:
+        print(f"{root} | {policy.average_guesses(root):.4f} avg guesses")
+    print(f"{'Proven optimal' if policy.proven_optimal else 'Best among the ' + str(policy.manifest['branching']) + ' guesses tried per set'}: "
+          f"{policy.best_root}, {policy.average_guesses():.4f} avg guesses.")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
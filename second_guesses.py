@@ -0,0 +1,200 @@
+"""
+Precomputed second guesses for popular starting words ("openers").
+
+The second guess is the most expensive one to choose live: right after the opener, hundreds of words are still possible and all of them
+get rated. For each popular opener, this table stores, for every feedback the opener can get, the solver's second guess, the number of
+words still possible and the ratings shown to the user. Once loaded with `use_second_guess_table`, both solvers use it automatically.
+
+Usage:
+------
+    python second_guesses.py                              # popular openers into data/second_guess_table.json
+    python second_guesses.py --openers slate,crane        # only some openers
+    python second_guesses.py --top-entropy 20             # also the 20 best openers by entropy (see opener_search.py)
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from wordle_assistant_functions import *
+from solve_table import load_official_words
+from shared_index import get_worker_words, share_word_list
+
+DEFAULT_TABLE_PATH = "data/second_guess_table.json"
+FORMAT_VERSION = 2
+
+# openers people play most often, plus the solver's own favourites
+POPULAR_OPENERS = ["slate", "crane", "adieu", "audio", "raise", "arise", "stare", "trace", "crate", "arose", "irate", "later", "alert",
+                   "roate", "soare", "salet", "tares", "react", "least", "train", "house", "about", "heart", "share", "steam", "stone"]
+
+### Building
+
+def get_second_guesses(word_list: list, opener: str, lexicon_key: bytes = None):
+    """
+    Returns {pattern : [second guess, number of words still possible, shown word ratings]} for every feedback `opener` can get
+    against the words of `word_list` (except the all-correct one, which needs no second guess). Second guesses are always rated live,
+    as `get_next_step` picks them with no second guess table loaded, so they only depend on `get_solver_settings(second_guesses = False)`.
+    """
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    candidates = all_words_bitset(word_list)
+    transition, words_scanned = get_transition(candidates, opener, word_list, lexicon_key)
+
+    second_guesses = {}
+    for pattern in sorted(transition["buckets"]):
+        if pattern == 3 ** len(opener) - 1:
+            continue
+
+        next_candidates, remaining = transition["buckets"][pattern]
+        next_guess, word_ratings = choose_next_guess(bitset_to_ids(next_candidates), word_list, lexicon_key = lexicon_key)
+        second_guesses[pattern] = [next_guess, remaining, word_ratings]
+
+    return second_guesses
+
+_worker_words = None
+_worker_lexicon_key = None
+
+def _init_worker(word_list):
+    global _worker_words, _worker_lexicon_key
+    _worker_words = get_worker_words(word_list)
+    _worker_lexicon_key = get_words_fingerprint(_worker_words)
+
+def _second_guesses_job(opener: str):
+    return opener, get_second_guesses(_worker_words, opener, lexicon_key = _worker_lexicon_key)
+
+def build_second_guess_table(word_list: list, openers: list = None, path: str = DEFAULT_TABLE_PATH, processes: int = None,
+                             shared_index: str = None, progress: bool = True):
+    """
+    Computes the second guesses of every opener (see `get_second_guesses`) over a process pool and saves them to `path` as JSON.
+
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words
+    `openers`: list
+        starting words to precompute. Defaults to the words of `POPULAR_OPENERS` that are in `word_list`
+    `path`: str
+        path of the table file, written atomically
+    `processes`: int
+        size of the process pool. Defaults to the number of CPUs
+    `shared_index`: str
+        directory of a shared index of `word_list` (see shared_index.py), published if needed, that the workers attach to instead of
+        each building their own copy of the word list's data
+    `progress`: bool
+        if True, prints progress to stderr
+
+    ------
+    Returns:
+    ------
+    `table`: dict
+        the saved table: {"format_version", "lexicon_version", "openers": {opener : {pattern : [second guess, remaining, word ratings]}}}
+    """
+
+    if openers is None:
+        openers = [opener for opener in POPULAR_OPENERS if opener in word_list]
+    openers = list(dict.fromkeys(openers)) # drops repeats, keeps order
+
+    missing = [opener for opener in openers if opener not in word_list]
+    if missing:
+        raise ValueError(f"Openers not in the word list: {missing}")
+
+    table = {"format_version": FORMAT_VERSION, "lexicon_version": get_words_fingerprint(word_list).hex(), "openers": {}}
+
+    start_time = time.perf_counter()
+    if shared_index is not None:
+        share_word_list(word_list, shared_index)
+
+    with multiprocessing.Pool(processes = processes, initializer = _init_worker, initargs = (shared_index or list(word_list),)) as pool:
+        for finished, (opener, second_guesses) in enumerate(pool.imap_unordered(_second_guesses_job, openers), start = 1):
+            table["openers"][opener] = {str(pattern) : value for pattern, value in second_guesses.items()} # JSON keys are strings
+
+            if progress:
+                print(f"\r{finished}/{len(openers)} openers | {time.perf_counter() - start_time:.0f} s elapsed", end = "", file = sys.stderr)
+
+    if progress and openers:
+        print(file = sys.stderr)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+    with open(f"{path}.tmp", "w", encoding = "utf-8") as f:
+        json.dump(table, f)
+    os.replace(f"{path}.tmp", path)
+
+    return table
+
+### Lookups
+
+class SecondGuessTable:
+    """
+    Second guesses loaded from a table built by `build_second_guess_table`.
+
+    Parameters:
+    ------
+    `table`: dict
+        the table, as saved by `build_second_guess_table`
+    """
+
+    def __init__(self, table: dict):
+        if table["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Second guess table has format version {table['format_version']}, expected {FORMAT_VERSION}. Rebuild it.")
+
+        self.lexicon_version = table["lexicon_version"]
+        self.version = hashlib.blake2b(json.dumps(table, sort_keys = True).encode("utf-8"), digest_size = 8).hexdigest() # of the contents
+        self.openers = {}
+        for opener, second_guesses in table["openers"].items():
+            self.openers[opener] = {int(pattern) : (next_guess, remaining, [tuple(rating) for rating in word_ratings])
+                                    for pattern, (next_guess, remaining, word_ratings) in second_guesses.items()}
+
+    def get_second_guess(self, lexicon_version: str, opener: str, pattern: int):
+        """
+        Returns (second guess, number of words still possible, shown word ratings) after `opener` got feedback `pattern`
+        (see `get_feedback`), or None if the table doesn't cover it.
+        """
+
+        if lexicon_version != self.lexicon_version or opener not in self.openers:
+            return None
+
+        return self.openers[opener].get(pattern)
+
+def load_second_guess_table(path: str = DEFAULT_TABLE_PATH):
+    """
+    Loads the table at `path` (see `SecondGuessTable`), or returns None if there isn't one.
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r", encoding = "utf-8") as f:
+        return SecondGuessTable(json.load(f))
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Precompute the second guesses of popular starting words.")
+    parser.add_argument("--openers", default = None, help = "comma-separated starting words (default: popular openers)")
+    parser.add_argument("--top-entropy", type = int, default = 0, help = "also include this many of the best openers by entropy")
+    parser.add_argument("--processes", type = int, default = None, help = "worker processes (default: number of CPUs)")
+    parser.add_argument("--shared-index", default = None, help = "directory of a shared index the workers attach to")
+    parser.add_argument("--output", default = DEFAULT_TABLE_PATH)
+    args = parser.parse_args(argv)
+
+    word_list = load_official_words()
+    openers = args.openers.split(",") if args.openers else [opener for opener in POPULAR_OPENERS if opener in word_list]
+
+    if args.top_entropy > 0:
+        from opener_search import rank_openers, score_openers
+
+        ranked = rank_openers(score_openers(word_list, metric = "entropy", processes = args.processes, shared_index = args.shared_index), metric = "entropy")
+        openers += [opener["word"] for opener in ranked[:args.top_entropy]]
+
+    table = build_second_guess_table(word_list, openers = openers, path = args.output, processes = args.processes, shared_index = args.shared_index)
+    print(f"Saved second guesses for {len(table['openers'])} openers to {args.output}.")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
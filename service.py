@@ -0,0 +1,419 @@
+"""
+Small HTTP/JSON service around the solver, for programmatic callers.
+
+Endpoints:
+
+    GET  /health    status, word list version and current load
+    POST /suggest   {"guesses": [...], and "target": word, or "feedback": [...] (one per guess, e.g. "gybbb" or "21000"),
+                     or "daily": true for today's target; optional "k", the number of ranked suggestions, and "strategy"
+                     ("rating" or "entropy") with "deadline_ms", the time budget of the next guess search}
+                    -> the words still possible, the ranked next guesses and whether the search finished in time
+    POST /solve     {"start": word, "target": word, optional "max_guesses"} -> the solver's full path from start to target
+
+The server runs on asyncio and sends the solver work to a process pool. Once `max_pending` requests are being solved or queued, new
+ones get 503 (with Retry-After) instead of piling up. Nothing is fetched from the network: the word list is read from disk, and the
+daily target is whatever the service is given (`--daily-target`, or any function of the date when embedding the service).
+
+Usage:
+------
+    python service.py                                   # http://127.0.0.1:8000, one worker per CPU
+    python service.py --port 8080 --processes 4 --max-pending 32
+    python service.py --daily-target crane              # fixed daily target, for tests
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import sys
+import time
+from datetime import date
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from wordle_assistant_functions import *
+from lexicon import Lexicon, SessionLexicon
+from second_guesses import load_second_guess_table
+from shared_index import get_worker_words, share_word_list
+from solve_table import load_official_words
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+MAX_BODY_BYTES = 64 * 1024
+FEEDBACK_CODES = {"g": 2, "y": 1, "b": 0, "2": 2, "1": 1, "0": 0}
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+                500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+### Solver work, run in the worker processes
+
+def parse_feedback(feedback: str, word_length: int = 5):
+    """
+    Converts feedback written as letters ("g" correct position, "y" incorrect position, "b" not in target) or digits (2, 1, 0)
+    into the pattern encoding of `get_feedback`. Eg: "bbygb" and "00120" -> 15. Raises ValueError unless it has `word_length` codes.
+    """
+
+    if len(feedback) != word_length:
+        raise ValueError(f"Invalid feedback '{feedback}': expected {word_length} codes, one per letter.")
+
+    pattern = 0
+    for code in feedback.lower():
+        if code not in FEEDBACK_CODES:
+            raise ValueError(f"Invalid feedback '{feedback}': use g/y/b or 2/1/0 for each letter.")
+        pattern = pattern * 3 + FEEDBACK_CODES[code]
+
+    return pattern
+
+def suggest(word_list: list, guesses: list, patterns: list, k: int = 10, strategy: str = "rating", deadline_ms: float = None,
+            lexicon_key: bytes = None):
+    """
+    Replays `guesses` with the feedback each got (`patterns`, see `get_feedback`) and returns the words still possible and the
+    solver's ranked next guesses. With another `strategy` than "rating", the next guess is then searched for within `deadline_ms`
+    milliseconds (see `choose_next_guess_anytime`); the best one found in time is returned.
+
+    The feedback is the game's own, so it follows the official rules for repeated letters (`get_feedback(..., duplicates = True)`):
+    eg 'speed' against 'weary' is bbybb, which the presence feedback `get_next_step` filters with can't express.
+    """
+
+    start = time.perf_counter()
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    codes = get_lexicon_table(word_list, lexicon_key)["codes"]
+    if codes is None:
+        codes = encode_words(word_list)
+    candidate_ids = np.arange(len(word_list))
+    solved = False
+
+    for guess, pattern in zip(guesses, patterns):
+        if pattern == 3 ** len(guess) - 1:
+            candidate_ids, solved = candidate_ids[:0], True
+            break
+        candidate_ids = candidate_ids[get_feedback_matrix(encode_words([guess]), codes[candidate_ids], duplicates = True)[0] == pattern]
+
+    remaining = len(candidate_ids)
+    next_guess, word_ratings = choose_next_guess(candidate_ids, word_list, lexicon_key = lexicon_key)
+
+    search = {"strategy": "rating", "finished": True}
+    if strategy != "rating" and not solved and remaining > 0:
+        time_left = (deadline_ms if deadline_ms is not None else 1000.0) - (time.perf_counter() - start) * 1000
+        search = choose_next_guess_anytime(candidate_ids, word_list, max(0.0, time_left), strategy = strategy,
+                                           guess_pool = "all", lexicon_key = lexicon_key)
+        next_guess = search["next_guess"]
+
+    return {
+        "solved": solved,
+        "remaining": remaining,
+        "possible_words": [word_list[i] for i in candidate_ids[:k]],
+        "next_guess": next_guess,
+        "strategy": search["strategy"],
+        "finished": search["finished"],
+        "suggestions": [{"word": word, "rating": rating} for word, rating in word_ratings[:k]],
+    }
+
+_worker_words = None
+_worker_lexicon_key = None
+
+def _init_worker(word_list):
+    global _worker_words, _worker_lexicon_key
+    _worker_words = get_worker_words(word_list)
+    _worker_lexicon_key = get_words_fingerprint(_worker_words)
+
+    second_guess_table = load_second_guess_table()
+    if second_guess_table is not None:
+        use_second_guess_table(second_guess_table)
+
+def _suggest_job(guesses: list, target: str, patterns: list, k: int, strategy: str, deadline_at: float):
+    if target is not None:
+        patterns = [get_feedback(guess, target, duplicates = True) for guess in guesses]
+
+    # the deadline is a wall clock time set when the request arrived, so time spent queueing counts against it
+    deadline_ms = (deadline_at - time.time()) * 1000 if deadline_at is not None else None
+
+    return suggest(_worker_words, guesses, patterns, k = k, strategy = strategy, deadline_ms = deadline_ms, lexicon_key = _worker_lexicon_key)
+
+def _solve_job(start: str, target: str, max_guesses: int):
+    # words outside the list are added on top of it for this request only, like the app does per session
+    word_list = SessionLexicon(_worker_words, [start, target]) if isinstance(_worker_words, Lexicon) else list(dict.fromkeys(list(_worker_words) + [start, target]))
+    solution = wordle_wizard(word_list = word_list, max_guesses = max_guesses, guess = start, target = target, return_stats = True)
+
+    return {
+        "start": start,
+        "target": target,
+        "guessed_words": solution["guessed_words"],
+        "num_guesses": solution["num_guesses"],
+        "solved": solution["target_guessed"],
+        "remaining_per_guess": solution["remaining_per_guess"],
+    }
+
+### HTTP service
+
+class SolverService:
+    """
+    asyncio HTTP server answering solver requests from a process pool.
+
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words
+    `processes`: int
+        size of the process pool. Defaults to the number of CPUs
+    `max_pending`: int
+        requests being solved or waiting for a worker before new ones are turned away with 503. Defaults to 4 per worker
+    `daily_target`: str or callable
+        today's target for `"daily": true` requests: a word, or a function of the date (datetime.date) returning one. If None,
+        daily requests are refused
+    `job_timeout`: float
+        seconds a request may wait for its result before getting 504
+    `shared_index`: str
+        directory of a shared index of `word_list` (see shared_index.py) for the workers to attach to
+    """
+
+    def __init__(self, word_list: list, processes: int = None, max_pending: int = None, daily_target = None, job_timeout: float = 30.0,
+                 shared_index: str = None):
+        self.word_list = word_list
+        self.word_length = len(word_list[0])
+        self.lexicon_version = get_words_fingerprint(word_list).hex()
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.processes
+        self.daily_target = daily_target
+        self.job_timeout = job_timeout
+        self.pending = 0
+        self.served = 0
+        self.rejected = 0
+
+        if shared_index is not None:
+            share_word_list(word_list, shared_index)
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers = self.processes, initializer = _init_worker,
+                                                               initargs = (shared_index or list(word_list),))
+        self.server = None
+        self.connections = {} # {writer : task serving it}
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        Starts listening. Returns the (host, port) actually bound -- pass port 0 for any free port.
+        """
+
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.connections): # idle keep-alive connections
+                writer.close()
+            await asyncio.gather(*self.connections.values(), return_exceptions = True)
+            await self.server.wait_closed()
+        self.executor.shutdown(wait = True, cancel_futures = True)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves the requests of one connection (HTTP/1.1 keep-alive) until the client closes it or asks to.
+        """
+
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), timeout = 60)
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line."}, keep_alive = False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), timeout = 60)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, separator, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length header."}, keep_alive = False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": f"Request body over {MAX_BODY_BYTES} bytes."}, keep_alive = False)
+                    break
+                body = await reader.readexactly(length) if length > 0 else b""
+
+                status, payload, extra_headers = await self.dispatch(method, urlsplit(target).path, body)
+                await self._respond(writer, status, payload, keep_alive = keep_alive, extra_headers = extra_headers)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool = True, extra_headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body)), "Connection": "keep-alive" if keep_alive else "close"}
+        headers.update(extra_headers or {})
+
+        head = f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n" + "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def dispatch(self, method: str, path: str, body: bytes):
+        """
+        Routes one request. Returns (status, JSON payload, extra headers).
+        """
+
+        routes = {"/health": ("GET", None), "/suggest": ("POST", self._suggest_args), "/solve": ("POST", self._solve_args)}
+        if path not in routes:
+            return 404, {"error": f"Unknown path '{path}'."}, None
+        if method != routes[path][0]:
+            return 405, {"error": f"Use {routes[path][0]} for {path}."}, {"Allow": routes[path][0]}
+
+        if path == "/health":
+            return 200, self.health(), None
+
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("The request body must be a JSON object.")
+            job, args = routes[path][1](request)
+        except ValueError as e: # includes JSON decoding errors
+            return 400, {"error": str(e)}, None
+        except LookupError as e:
+            return 503, {"error": str(e)}, None
+
+        ### Backpressure: turn requests away rather than queueing without bound
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            return 503, {"error": "Too many requests in progress, try again shortly."}, {"Retry-After": "1"}
+
+        # a job keeps its worker busy until it finishes, even once its request has timed out, so it counts as pending until then
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self.executor, job, *args)
+        future.add_done_callback(self._job_done)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout = self.job_timeout)
+        except asyncio.TimeoutError:
+            return 504, {"error": f"No result within {self.job_timeout} s."}, None
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}, None
+
+        self.served += 1
+
+        return 200, result, None
+
+    def _job_done(self, future):
+        self.pending -= 1
+
+    def health(self):
+        return {
+            "status": "ok",
+            "words": len(self.word_list),
+            "lexicon_version": self.lexicon_version,
+            "workers": self.processes,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "served": self.served,
+            "rejected": self.rejected,
+        }
+
+    def _check_word(self, word, name: str):
+        if not isinstance(word, str) or len(word.strip()) != self.word_length or not (word.strip().isascii() and word.strip().isalpha()):
+            raise ValueError(f"'{name}' must be a {self.word_length}-letter word of the letters a-z.")
+
+        return word.strip().lower()
+
+    def get_daily_target(self, day: date = None):
+        """
+        Today's target (or that of `day`), from the injected `daily_target`. Raises LookupError if there is none.
+        """
+
+        target = self.daily_target(day or date.today()) if callable(self.daily_target) else self.daily_target
+        if target is None:
+            raise LookupError("No daily target is configured for this service.")
+
+        return target.strip().lower()
+
+    def _suggest_args(self, request: dict):
+        guesses = request.get("guesses", [])
+        if not isinstance(guesses, list) or len(guesses) > 20:
+            raise ValueError("'guesses' must be a list of at most 20 words.")
+        guesses = [self._check_word(guess, "guesses") for guess in guesses]
+
+        k = request.get("k", 10)
+        if not isinstance(k, int) or not 1 <= k <= shown_ratings:
+            raise ValueError(f"'k' must be an integer from 1 to {shown_ratings}.")
+
+        target, feedback, patterns = request.get("target"), request.get("feedback"), []
+        if request.get("daily") == True:
+            day = request.get("date")
+            if day is not None and not isinstance(day, str):
+                raise ValueError("'date' must be an ISO date string, eg \"2024-01-31\".")
+            target = self.get_daily_target(date.fromisoformat(day) if day is not None else None)
+        elif target is not None:
+            target = self._check_word(target, "target")
+        elif feedback is not None:
+            if not isinstance(feedback, list) or len(feedback) != len(guesses) or any(not isinstance(code, str) for code in feedback):
+                raise ValueError(f"'feedback' must have one {self.word_length}-letter feedback string per guess.")
+            patterns = [parse_feedback(code, self.word_length) for code in feedback]
+        elif len(guesses) > 0:
+            raise ValueError("Pass a 'target', the 'feedback' of each guess, or 'daily': true.")
+
+        strategy = request.get("strategy", "rating")
+        if strategy not in anytime_strategies:
+            raise ValueError(f"'strategy' must be one of {anytime_strategies}.")
+        deadline_ms = request.get("deadline_ms")
+        if deadline_ms is not None and (not isinstance(deadline_ms, (int, float)) or not 0 <= deadline_ms <= self.job_timeout * 1000):
+            raise ValueError(f"'deadline_ms' must be a number from 0 to {self.job_timeout * 1000:.0f}.")
+        deadline_at = time.time() + deadline_ms / 1000 if deadline_ms is not None else None
+
+        return _suggest_job, (guesses, target, patterns, k, strategy, deadline_at)
+
+    def _solve_args(self, request: dict):
+        start = self._check_word(request.get("start"), "start")
+        target = self._check_word(request.get("target"), "target")
+
+        max_guesses = request.get("max_guesses", 6)
+        if not isinstance(max_guesses, int) or not 1 <= max_guesses <= 20:
+            raise ValueError("'max_guesses' must be an integer from 1 to 20.")
+
+        return _solve_job, (start, target, max_guesses)
+
+async def serve(service: SolverService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    host, port = await service.start(host, port)
+    print(f"Serving {len(service.word_list)} words on http://{host}:{port} with {service.processes} workers.", file = sys.stderr)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Serve the solver over HTTP.")
+    parser.add_argument("--host", default = DEFAULT_HOST)
+    parser.add_argument("--port", type = int, default = DEFAULT_PORT)
+    parser.add_argument("--processes", type = int, default = None, help = "worker processes (default: number of CPUs)")
+    parser.add_argument("--max-pending", type = int, default = None, help = "requests in progress before answering 503 (default: 4 per worker)")
+    parser.add_argument("--daily-target", default = None, help = "target word of daily requests (default: daily requests are refused)")
+    parser.add_argument("--shared-index", default = None, help = "directory of a shared index the workers attach to")
+    args = parser.parse_args(argv)
+
+    service = SolverService(Lexicon(load_official_words()), processes = args.processes, max_pending = args.max_pending,
+                            daily_target = args.daily_target, shared_index = args.shared_index)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Read-only word list structures shared between processes.
+
+Every app process and every worker of a process pool used to build its own copy of the per-word data the solver needs (ratings,
+tie-break ranks, letter codes). `publish_shared_index` writes them once, as .npy files in one directory, and every process that
+attaches maps those files read-only (`np.load(..., mmap_mode = "r")`): the pages live once in the OS page cache and are
+shared by all of them, so attaching costs almost no memory per process. A pattern matrix built by pattern_matrix.py can be shared
+the same way. Only the words themselves (and their index) are Python objects, rebuilt by each process.
+
+Usage:
+------
+    python shared_index.py                                          # publish the shipped word list's index into data/shared_index/
+    python shared_index.py --pattern-matrix data/pattern_matrix     # also share a finished pattern matrix
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+from wordle_assistant_functions import *
+from lexicon import Lexicon
+
+DEFAULT_INDEX_DIR = "data/shared_index"
+FORMAT_VERSION = 2
+
+def get_array_checksum(array: np.ndarray):
+    """
+    Hex digest of an array's contents, to check mapped arrays against the manifest that lists them.
+    """
+
+    return hashlib.blake2b(np.ascontiguousarray(array).data, digest_size = 16).hexdigest()
+
+def publish_shared_index(word_list: list, path: str = DEFAULT_INDEX_DIR, pattern_matrix: str = None):
+    """
+    Writes the read-only structures of `word_list` to `path`, unless an index of the same word list is already there.
+
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words
+    `path`: str
+        directory of the index. The arrays of each word list go to their own subdirectory, each file written to a temporary name unique
+        to the publisher and renamed into place, and the manifest pointing at them is replaced last. Processes attaching while it's being
+        published (or republished by another process) see either the old index or the new one, never a mix
+    `pattern_matrix`: str
+        directory of a finished pattern matrix of `word_list` (see `pattern_matrix.build_pattern_matrix_file`) to share too. It isn't copied
+
+    ------
+    Returns:
+    ------
+    `manifest`: dict
+        the index's manifest, as saved in `path`/manifest.json
+    """
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "lexicon_version": get_words_fingerprint(word_list).hex(),
+        "pattern_matrix": None,
+    }
+
+    if pattern_matrix is not None:
+        from pattern_matrix import load_pattern_matrix
+
+        loaded = load_pattern_matrix(pattern_matrix)
+        if loaded is None or loaded[0]["lexicon_version"] != manifest["lexicon_version"]:
+            raise ValueError(f"No finished pattern matrix of this word list at {pattern_matrix}.")
+        manifest["pattern_matrix"] = os.path.abspath(os.path.join(pattern_matrix, "patterns.npy"))
+
+    manifest_path = os.path.join(path, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding = "utf-8") as f:
+            existing = json.load(f)
+        if {key : value for key, value in existing.items() if key in manifest} == manifest:
+            return existing
+
+    table = get_lexicon_table(word_list)
+    arrays = {
+        "words": np.array(list(word_list)),
+        "ratings": table["ratings"],
+        "start_rank": table["start_rank"],
+        "end_rank": table["end_rank"],
+        "codes": table["codes"],
+    }
+    arrays = {name : array for name, array in arrays.items() if array is not None}
+
+    # publishers of the same word list write the same files, and those of other word lists write elsewhere
+    manifest["directory"] = f"v{FORMAT_VERSION}-{manifest['lexicon_version']}"
+    os.makedirs(os.path.join(path, manifest["directory"]), exist_ok = True)
+    suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+
+    for name, array in arrays.items():
+        array_path = os.path.join(path, manifest["directory"], f"{name}.npy")
+        with open(f"{array_path}.{suffix}", "wb") as f:
+            np.save(f, array)
+        os.replace(f"{array_path}.{suffix}", array_path)
+
+    manifest["arrays"] = {name : get_array_checksum(array) for name, array in arrays.items()}
+    with open(f"{manifest_path}.{suffix}", "w", encoding = "utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(f"{manifest_path}.{suffix}", manifest_path)
+
+    return manifest
+
+class SharedIndex:
+    """
+    A published index (see `publish_shared_index`), attached read-only. Arrays are memory-mapped, never copied.
+
+    Parameters:
+    ------
+    `path`: str
+        directory of the index
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_DIR):
+        with open(os.path.join(path, "manifest.json"), "r", encoding = "utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Shared index at {path} has format version {self.manifest['format_version']}, expected {FORMAT_VERSION}. Republish it.")
+
+        self.path = path
+        self.lexicon_version = self.manifest["lexicon_version"]
+        self.arrays = {name : np.load(os.path.join(path, self.manifest["directory"], f"{name}.npy"), mmap_mode = "r") for name in self.manifest["arrays"]}
+        self.pattern_matrix = np.load(self.manifest["pattern_matrix"], mmap_mode = "r") if self.manifest["pattern_matrix"] else None
+        self._lexicon = None
+        self._verified = False
+
+    @property
+    def lexicon(self):
+        """
+        The indexed words, as a `Lexicon`.
+        """
+
+        if self._lexicon is None:
+            self._lexicon = Lexicon(self.arrays["words"].tolist())
+            if self._lexicon.fingerprint().hex() != self.lexicon_version:
+                raise ValueError(f"Shared index at {self.path} is corrupt: its words don't match its manifest. Republish it.")
+
+        return self._lexicon
+
+    def verify(self):
+        """
+        Checks that the mapped arrays are the ones the manifest lists, and of its word list. Raises ValueError if not.
+        """
+
+        if self._verified == False:
+            self.lexicon # checks the words against the manifest's fingerprint
+            for name, checksum in self.manifest["arrays"].items():
+                if get_array_checksum(self.arrays[name]) != checksum:
+                    raise ValueError(f"Shared index at {self.path} is corrupt: '{name}' doesn't match its manifest. Republish it.")
+            self._verified = True
+
+    def install(self, word_list: list = None):
+        """
+        Makes the solver use the shared arrays (instead of computing its own) for `word_list`, by default the indexed words, and returns
+        the word list. Returns None if `word_list` isn't the indexed word list. The arrays are verified first (see `verify`).
+        """
+
+        self.verify()
+        if word_list is None:
+            word_list = self.lexicon
+        elif get_words_fingerprint(word_list).hex() != self.lexicon_version:
+            return None
+
+        table = {
+            "word_index": word_list.word_index if isinstance(word_list, Lexicon) else {word : i for i, word in enumerate(word_list)},
+            "ratings": self.arrays["ratings"],
+            "start_rank": self.arrays["start_rank"],
+            "end_rank": self.arrays["end_rank"],
+            "codes": self.arrays.get("codes"),
+        }
+        lexicon_cache.put(bytes.fromhex(self.lexicon_version), table, size = sys.getsizeof(table["word_index"]))
+
+        return word_list
+
+def attach_shared_index(path: str = DEFAULT_INDEX_DIR):
+    """
+    Attaches the index at `path` (see `SharedIndex`), or returns None if there isn't one.
+    """
+
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        return None
+
+    return SharedIndex(path)
+
+def share_word_list(word_list: list, path: str = DEFAULT_INDEX_DIR):
+    """
+    Attaches the index at `path` and installs it for `word_list` (see `SharedIndex.install`), publishing it first if there's no index
+    of `word_list` there yet. Returns the attached index.
+    """
+
+    try:
+        shared_index = attach_shared_index(path)
+    except ValueError: # an index of an older format, replaced below
+        shared_index = None
+    if shared_index is None or shared_index.lexicon_version != get_words_fingerprint(word_list).hex():
+        publish_shared_index(word_list, path)
+        shared_index = SharedIndex(path)
+    shared_index.install(word_list)
+
+    return shared_index
+
+def get_worker_words(source):
+    """
+    Word list of a pool worker: `source` is either the word list itself, or the directory of a shared index to attach (zero-copy).
+    """
+
+    if isinstance(source, str):
+        return SharedIndex(source).install()
+
+    return source
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Publish the word list's read-only structures for sharing between processes.")
+    parser.add_argument("--output", default = DEFAULT_INDEX_DIR, help = "directory of the index")
+    parser.add_argument("--pattern-matrix", default = None, help = "directory of a finished pattern matrix to share too")
+    args = parser.parse_args(argv)
+
+    from solve_table import load_official_words
+
+    manifest = publish_shared_index(load_official_words(), path = args.output, pattern_matrix = args.pattern_matrix)
+    print(f"Shared index at {args.output} ({', '.join(manifest['arrays'])}) is up to date.")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+"""
+Precomputed table of Universal Solver solutions for every (starting word, target word) pair.
+
+Each starting word ("opener") is solved against every target at once by walking the solver's decision tree: targets that get the same
+feedback share every guess up to that point, so each branch is evaluated only once. That tree is also what's stored: rather than every
+target's guesses, one node per guess played, as column files (guess, feedback leading to it, depth, ...) that are appended to as openers
+finish and memory-mapped on load. A lookup follows the target's feedback from the root, touching a few bytes per guess. The tree takes
+less than half the space of the guesses spelled out per target: 5 bytes per node, with about one node per target.
+Openers are spread over a process pool, and interrupted builds resume from the last finished opener.
+
+Usage:
+------
+    python solve_table.py                                 # every opener, all CPUs, into data/solve_table/
+    python solve_table.py --openers slate,crane,trace     # only some openers
+    python solve_table.py --summary                       # average guesses per opener of an existing table
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from wordle_assistant_functions import *
+from shared_index import get_worker_words, share_word_list
+
+WORD_LIST_PATH = "data/official_words_processed.txt"
+DEFAULT_TABLE_DIR = "data/solve_table"
+FORMAT_VERSION = 3
+ALL_PERFECT = 3 ** 5 - 1 # feedback of a guess against itself (see `get_feedback`)
+
+# columns of the decision trees, one row per node. Each opener's nodes are stored in breadth-first order, so a node's children
+# (sorted by feedback) come right after those of the nodes before it (see `get_first_children`)
+NODE_COLUMNS = {
+    "guess": np.uint16, # word index of the guess played at the node
+    "pattern": np.uint8, # feedback of the parent's guess that leads to the node
+    "depth": np.uint8, # number of guesses before this one, plus `SOLVES` if the guess is one of the node's targets, guessed in time
+    "num_children": np.uint8,
+}
+SOLVES = 0x80
+
+### Solving
+
+def load_official_words(path: str = WORD_LIST_PATH):
+    """
+    Loads the shipped word list, keeping only 5-letter words (same rules as `app.py`).
+    """
+
+    official_words = []
+    with open(path, "r", encoding = "utf-8") as f:
+        for word in f.read().split("\n"):
+            if len(word) == 5:
+                official_words.append(word)
+
+    return official_words
+
+def solve_opener(word_list: list, opener: str, max_guesses: int = 6, lexicon_key: bytes = None, strategy: str = "rating"):
+    """
+    Solves the puzzle for every target in `word_list` from the same starting word, as `solve_puzzle` would one at a time.
+
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words. Every word is used as a target
+    `opener`: str
+        starting word
+    `max_guesses`: int
+        the maximum number of attempts allowed to solve the Wordle
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+    `strategy`: str
+        how next guesses are chosen, one of `solve_strategies` (see `get_strategy_guess`)
+
+    ------
+    Returns:
+    ------
+    `tree`: dict
+        {column : array} of the solver's decision tree, in the format of `NODE_COLUMNS`. As in `solve_puzzle`, targets not solved in time
+        end with a node (at depth `max_guesses`) for the next guess there was no attempt left for. See `get_tree_outcomes`
+    """
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    word_index = {word : i for i, word in enumerate(word_list)}
+
+    def walk(node, candidates, guess):
+        guess_num = node["depth"] + 1
+        transition, words_scanned = get_transition(candidates, guess, word_list, lexicon_key)
+
+        for pattern, (bucket, remaining) in sorted(transition["buckets"].items()):
+            if pattern == ALL_PERFECT: # only the guess itself gets this feedback
+                node["solves"] = True
+                continue
+
+            next_candidates, remaining, next_guess, word_ratings = get_next_step(candidates, guess, pattern, word_list, lexicon_key)
+            if strategy != "rating":
+                next_guess = get_strategy_guess(next_candidates, next_guess, word_list, strategy, lexicon_key = lexicon_key)
+
+            child = {"guess": word_index[next_guess], "pattern": pattern, "depth": guess_num, "solves": False, "children": []}
+            node["children"].append(child)
+            if guess_num < max_guesses: # else out of attempts for every target left in this bucket
+                walk(child, next_candidates, next_guess)
+
+    root = {"guess": word_index[opener], "pattern": 0, "depth": 0, "solves": False, "children": []}
+    walk(root, all_words_bitset(word_list), opener)
+
+    ### Breadth-first, so each node's children are contiguous
+    nodes = [root]
+    rows = {name : [] for name in NODE_COLUMNS}
+    for node in nodes: # grows while it's walked
+        rows["guess"].append(node["guess"])
+        rows["pattern"].append(node["pattern"])
+        rows["depth"].append(node["depth"] | (SOLVES if node["solves"] else 0))
+        rows["num_children"].append(len(node["children"]))
+        nodes.extend(node["children"])
+
+    return {name : np.array(rows[name], dtype = dtype) for name, dtype in NODE_COLUMNS.items()}
+
+def get_tree_outcomes(tree: dict, num_targets: int, max_guesses: int):
+    """
+    Number of guesses played and whether each target was solved in time, as (targets,) arrays, from a tree of `solve_opener`.
+    """
+
+    num_guesses = np.full(num_targets, max_guesses, dtype = np.uint8)
+    solved = np.zeros(num_targets, dtype = bool)
+    depth = np.asarray(tree["depth"])
+    solving = (depth & SOLVES) != 0
+    targets = np.asarray(tree["guess"])[solving]
+    num_guesses[targets] = (depth[solving] & (SOLVES - 1)) + 1
+    solved[targets] = True
+
+    return num_guesses, solved
+
+def get_first_children(num_children: np.ndarray):
+    """
+    Position of each node's first child in a breadth-first tree of `solve_opener`, from the number of children of each node.
+    """
+
+    return 1 + np.concatenate(([0], np.cumsum(num_children, dtype = np.int64)[:-1]))
+
+_worker_words = None
+_worker_lexicon_key = None
+
+def _init_worker(word_list):
+    global _worker_words, _worker_lexicon_key
+    _worker_words = get_worker_words(word_list)
+    _worker_lexicon_key = get_words_fingerprint(_worker_words)
+
+def _solve_row(job: tuple):
+    row, opener, max_guesses = job
+    return row, get_solver_settings(), solve_opener(_worker_words, opener, max_guesses = max_guesses, lexicon_key = _worker_lexicon_key)
+
+### Building
+
+def _open_columns(path: str, manifest: dict, mode: str):
+    """
+    Opens the table's files: "roots", the (openers, 2) first node and number of nodes of each finished opener's tree (-1 if not finished),
+    memory-mapped, and the node columns -- memory-mapped for reading, or opened for appending (cut back to the finished trees) otherwise.
+    """
+
+    roots_path = os.path.join(path, "roots.npy")
+    if mode == "w+":
+        roots = np.lib.format.open_memmap(roots_path, mode = "w+", dtype = np.int64, shape = (len(manifest["openers"]), 2))
+        roots[:] = -1
+        roots.flush()
+    else:
+        roots = np.load(roots_path, mmap_mode = mode)
+
+    finished = roots[:, 0] >= 0
+    num_nodes = int((roots[finished, 0] + roots[finished, 1]).max()) if finished.any() else 0
+
+    columns = {"roots": roots}
+    for name, dtype in NODE_COLUMNS.items():
+        file_path = os.path.join(path, f"{name}.bin")
+        if mode == "r":
+            # an empty file can't be mapped
+            columns[name] = np.memmap(file_path, dtype = dtype, mode = "r", shape = (num_nodes,)) if num_nodes > 0 else np.zeros(0, dtype = dtype)
+        else:
+            f = open(file_path, "w+b" if mode == "w+" else "r+b")
+            f.truncate(num_nodes * np.dtype(dtype).itemsize) # drops nodes of an opener that was being written when a build stopped
+            f.seek(0, os.SEEK_END)
+            columns[name] = f
+
+    return columns, num_nodes
+
+def build_solve_table(word_list: list, path: str = DEFAULT_TABLE_DIR, openers: list = None, max_guesses: int = 6,
+                      processes: int = None, shared_index: str = None, progress: bool = True):
+    """
+    Solves every (opener, target) pair and stores the results as memory-mapped columns under `path`.
+
+    If `path` already holds a table for the same word list, openers and settings, only the openers not yet finished are solved,
+    so an interrupted build can simply be rerun. Anything else at `path` is overwritten.
+
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of valid words. Every word is used as a target
+    `path`: str
+        directory of the table
+    `openers`: list
+        starting words to solve for. Defaults to every word in `word_list`
+    `max_guesses`: int
+        the maximum number of attempts allowed to solve the Wordle
+    `processes`: int
+        size of the process pool. Defaults to the number of CPUs
+    `shared_index`: str
+        directory of a shared index of `word_list` (see shared_index.py), published if needed, that the workers attach to instead of
+        each building their own copy of the word list's data
+    `progress`: bool
+        if True, prints progress and an estimated time remaining to stderr
+
+    ------
+    Returns:
+    ------
+    `manifest`: dict
+        the table's manifest, as saved in `path`/manifest.json
+    """
+
+    if len(word_list) > np.iinfo(np.uint16).max:
+        raise ValueError(f"Solve tables support at most {np.iinfo(np.uint16).max} words.")
+    if any(len(word) != 5 for word in word_list):
+        raise ValueError("Solve tables only support 5-letter words.")
+
+    openers = list(word_list) if openers is None else list(openers)
+    missing = [opener for opener in openers if opener not in word_list]
+    if missing:
+        raise ValueError(f"Openers not in the word list: {missing}")
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "lexicon_version": get_words_fingerprint(word_list).hex(),
+        "strategy": "rating",
+        "max_guesses": max_guesses,
+        "settings": get_solver_settings(),
+        "words": list(word_list),
+        "openers": openers,
+    }
+
+    os.makedirs(path, exist_ok = True)
+    manifest_path = os.path.join(path, "manifest.json")
+    existing = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding = "utf-8") as f:
+            existing = json.load(f)
+
+    if existing == manifest:
+        columns, num_nodes = _open_columns(path, manifest, "r+")
+    else: # new table -- the manifest is written first, so a later run knows the files belong to it
+        with open(f"{manifest_path}.tmp", "w", encoding = "utf-8") as f:
+            json.dump(manifest, f)
+        columns, num_nodes = _open_columns(path, manifest, "w+")
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+    roots = columns["roots"]
+
+    jobs = [(row, opener, max_guesses) for row, opener in enumerate(openers) if roots[row, 0] < 0]
+    if progress:
+        print(f"{len(openers) - len(jobs)}/{len(openers)} openers already solved; solving {len(jobs)}.", file = sys.stderr)
+
+    start_time = time.perf_counter()
+    if shared_index is not None:
+        share_word_list(word_list, shared_index)
+
+    try:
+        with multiprocessing.Pool(processes = processes, initializer = _init_worker, initargs = (shared_index or list(word_list),)) as pool:
+            for finished, (row, settings, tree) in enumerate(pool.imap_unordered(_solve_row, jobs), start = 1):
+                if settings != manifest["settings"]:
+                    raise RuntimeError(f"Workers solved under settings {settings}, not this process's {manifest['settings']}.")
+
+                for name in NODE_COLUMNS:
+                    columns[name].write(tree[name])
+                    columns[name].flush()
+                    os.fsync(columns[name].fileno())
+                roots[row] = (num_nodes, len(tree["guess"])) # only marked once the nodes themselves are on disk
+                roots.flush()
+                num_nodes += len(tree["guess"])
+
+                if progress:
+                    elapsed = time.perf_counter() - start_time
+                    remaining = elapsed / finished * (len(jobs) - finished)
+                    print(f"\r{finished}/{len(jobs)} openers | {elapsed:.0f} s elapsed | ~{remaining:.0f} s remaining", end = "", file = sys.stderr)
+    finally:
+        for name in NODE_COLUMNS:
+            columns[name].close()
+
+    if progress and jobs:
+        print(file = sys.stderr)
+
+    return manifest
+
+### Lookups and analytics
+
+class SolveTable:
+    """
+    Read-only view of a table built by `build_solve_table`. Columns stay memory-mapped, so loading is instant and the OS
+    shares the pages between every process reading the same table.
+
+    Parameters:
+    ------
+    `path`: str
+        directory of the table
+    """
+
+    def __init__(self, path: str = DEFAULT_TABLE_DIR):
+        with open(os.path.join(path, "manifest.json"), "r", encoding = "utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Solve table at {path} has format version {self.manifest['format_version']}, expected {FORMAT_VERSION}. Rebuild it.")
+
+        self.path = path
+        self.words = self.manifest["words"]
+        self.openers = self.manifest["openers"]
+        self.lexicon_version = self.manifest["lexicon_version"]
+        self.strategy = self.manifest["strategy"]
+        self.max_guesses = self.manifest["max_guesses"]
+        self.settings = self.manifest["settings"]
+        self.word_index = {word : i for i, word in enumerate(self.words)}
+        self.opener_index = {opener : i for i, opener in enumerate(self.openers)}
+        self.columns, self.num_nodes = _open_columns(path, self.manifest, "r")
+        self._first_children = {} # {opener : first child of each node}, computed on first lookup
+
+    def get_root(self, opener: str):
+        """
+        First node and number of nodes of the tree of `opener`, or None if it isn't solved (or was solved after the table was loaded).
+        """
+
+        row = self.opener_index.get(opener)
+        if row is None:
+            return None
+
+        first, count = (int(value) for value in self.columns["roots"][row])
+        if first < 0 or first + count > self.num_nodes:
+            return None
+
+        return first, count
+
+    def get_outcomes(self, opener: str):
+        """
+        Number of guesses played and whether each target was solved in time, as (targets,) arrays, or None if `opener` isn't solved.
+        """
+
+        root = self.get_root(opener)
+        if root is None:
+            return None
+
+        first, count = root
+        tree = {name : self.columns[name][first:first + count] for name in ("guess", "depth")}
+
+        return get_tree_outcomes(tree, len(self.words), self.max_guesses)
+
+    def get_solution(self, start: str, target: str, lexicon_version: str, strategy: str = "rating", max_guesses: int = 6, settings: str = None):
+        """
+        Returns the solution of a puzzle in the format of `solve_puzzle` (without step records, `"steps"` is None), or None if the
+        table doesn't cover it -- another word list, strategy, guess limit or solver settings (by default the current ones, see
+        `get_solver_settings`), or an opener not solved yet.
+        """
+
+        if settings is None:
+            settings = get_solver_settings()
+        if (lexicon_version != self.lexicon_version or strategy != self.strategy or max_guesses != self.max_guesses
+                or settings != self.settings or target not in self.word_index):
+            return None
+
+        root = self.get_root(start)
+        if root is None:
+            return None
+
+        ### Follow the feedback the target gets from the root down
+        first, count = root
+        first_children = self._first_children.get(start)
+        if first_children is None:
+            first_children = self._first_children[start] = get_first_children(self.columns["num_children"][first:first + count])
+
+        node = 0 # counted from the root
+        guessed_words = [start]
+        while True:
+            depth = int(self.columns["depth"][first + node]) & (SOLVES - 1)
+            pattern = get_feedback(self.words[self.columns["guess"][first + node]], target)
+            if pattern == ALL_PERFECT:
+                num_guesses, target_guessed = depth + 1, True
+                break
+
+            children = int(first_children[node])
+            num_children = int(self.columns["num_children"][first + node])
+            node = children + int(np.searchsorted(self.columns["pattern"][first + children:first + children + num_children], pattern))
+            guessed_words.append(self.words[self.columns["guess"][first + node]])
+            if depth + 1 == max_guesses: # out of attempts -- the last word is the guess there was no attempt left for
+                num_guesses, target_guessed = max_guesses, False
+                break
+
+        return {
+            "first_guess": start,
+            "target": target,
+            "max_guesses": max_guesses,
+            "strategy": strategy,
+            "guessed_words": guessed_words,
+            "steps": None,
+            "num_guesses": num_guesses,
+            "target_guessed": target_guessed,
+        }
+
+    def opener_summary(self):
+        """
+        Returns one dict per finished opener -- average and worst number of guesses over the solved targets, and how many targets
+        weren't solved in time -- sorted from best to worst opener (fewest failures, then lowest average).
+        """
+
+        summary = []
+        for opener in self.openers:
+            outcomes = self.get_outcomes(opener)
+            if outcomes is None:
+                continue
+
+            num_guesses, solved = outcomes
+            summary.append({
+                "opener": opener,
+                "avg_guesses": round(float(num_guesses[solved].mean()), 4) if solved.any() else None,
+                "max_guesses": int(num_guesses[solved].max()) if solved.any() else None,
+                "failures": int((~solved).sum()),
+            })
+
+        return sorted(summary, key = lambda opener: (opener["failures"], opener["avg_guesses"] if opener["avg_guesses"] is not None else float("inf")))
+
+def load_solve_table(path: str = DEFAULT_TABLE_DIR):
+    """
+    Loads the table at `path` (see `SolveTable`), or returns None if there isn't one.
+    """
+
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        return None
+
+    return SolveTable(path)
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = "Precompute Universal Solver solutions for every (starting word, target word) pair.")
+    parser.add_argument("--output", default = DEFAULT_TABLE_DIR, help = "directory of the table")
+    parser.add_argument("--openers", default = None, help = "comma-separated starting words (default: every word)")
+    parser.add_argument("--max-guesses", type = int, default = 6)
+    parser.add_argument("--processes", type = int, default = None, help = "worker processes (default: number of CPUs)")
+    parser.add_argument("--shared-index", default = None, help = "directory of a shared index the workers attach to")
+    parser.add_argument("--summary", action = "store_true", help = "print the best openers of an existing table instead of building")
+    parser.add_argument("--top", type = int, default = 20, help = "openers shown by --summary")
+    args = parser.parse_args(argv)
+
+    if not args.summary:
+        word_list = load_official_words()
+        openers = args.openers.split(",") if args.openers else None
+        build_solve_table(word_list, path = args.output, openers = openers, max_guesses = args.max_guesses, processes = args.processes,
+                          shared_index = args.shared_index)
+
+    table = load_solve_table(args.output)
+    if table is None:
+        print(f"No solve table found at {args.output}.", file = sys.stderr)
+        return 1
+
+    for opener in table.opener_summary()[:args.top]:
+        print(f"{opener['opener']} | avg {opener['avg_guesses']} guesses | worst {opener['max_guesses']} | {opener['failures']} failures")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Bounded, thread-safe caches shared by every session running in the same process.
+
+Streamlit serves each session from a thread of one long-running process, so a module-level cache here is shared across all users.
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded both by a number of entries and by an approximate memory cap.
+
+    Sizes are estimated by the caller and passed to `put`, since only the caller knows which parts of a value are shared
+    with other structures (e.g. words that already live in the word list).
+
+    Parameters:
+    ------
+    `max_entries`: int
+        maximum number of entries kept before the least recently used ones are evicted
+    `max_bytes`: int
+        approximate memory cap (sum of the sizes passed to `put`) before the least recently used entries are evicted
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # {key : (value, size)}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default = None):
+        """
+        Returns the value stored for `key` (marking it most recently used), else `default`. Counts a hit or a miss.
+        """
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+            self.misses += 1
+            return default
+
+    def put(self, key, value, size: int = 0):
+        """
+        Stores `value` under `key` with an estimated `size` in bytes, replacing any previous value, then evicts down to the caps.
+        """
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries[key][1]
+            self._entries[key] = (value, size)
+            self._entries.move_to_end(key)
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        # always keeps the newest entry, even if it alone is over the memory cap
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, (value, size) = self._entries.popitem(last = False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def resize(self, max_entries: int = None, max_bytes: int = None):
+        """
+        Changes the entry and/or memory caps, evicting immediately if the cache is now over them.
+        """
+
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dictionary of the cache's counters and current usage, for tuning its caps.
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+class SolveCache(LRUCache):
+    """
+    LRU cache of solved puzzles, in memory with an optional on-disk tier.
+
+    Keys are tuples of (start word, target word, lexicon version, strategy, max guesses, solver settings). Values must be JSON-serializable,
+    since they are also written to disk (one file per key, under a directory per lexicon version) when `disk_dir` is set.
+    Entries for other lexicon versions are dropped as soon as a new version is seen (see `set_lexicon_version`).
+
+    Parameters:
+    ------
+    `max_entries`: int
+        maximum number of entries kept in memory
+    `max_bytes`: int
+        approximate memory cap, estimated from the size of each value's JSON text
+    `disk_dir`: str
+        if passed, directory of the on-disk tier. Entries missing from memory are looked up (and promoted) from there
+    `decode`: callable
+        if passed, applied to values loaded from disk, e.g. to turn JSON lists back into tuples
+    """
+
+    def __init__(self, max_entries: int = 5_000, max_bytes: int = 32 * 1024 ** 2, disk_dir: str = None, decode = None):
+        super().__init__(max_entries = max_entries, max_bytes = max_bytes)
+        self.disk_dir = disk_dir
+        self.decode = decode
+        self.lexicon_version = None
+        self.disk_hits = 0
+
+    def _disk_path(self, key):
+        start, target, version, strategy, max_guesses, settings = key
+        return os.path.join(self.disk_dir, version, f"{strategy}_{max_guesses}_{settings}", f"{start}_{target}.json")
+
+    def get(self, key, default = None):
+        """
+        Returns the value stored for `key` from memory, else from disk (promoting it to memory), else `default`.
+        """
+
+        value = super().get(key)
+        if value is not None or self.disk_dir is None:
+            return value if value is not None else default
+
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return default
+
+        try:
+            with open(path, "r", encoding = "utf-8") as f:
+                text = f.read()
+            value = json.loads(text)
+        except (OSError, ValueError): # unreadable or partially written by an older version -- treat as a miss
+            return default
+
+        if self.decode is not None:
+            value = self.decode(value)
+        self.disk_hits += 1
+        super().put(key, value, size = 2 * len(text))
+
+        return value
+
+    def put(self, key, value, size: int = None):
+        """
+        Stores `value` under `key` in memory and, if enabled, on disk. `size` defaults to an estimate from the value's JSON text.
+        """
+
+        text = json.dumps(value)
+        super().put(key, value, size = 2 * len(text) if size is None else size)
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding = "utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, path) # atomic, so readers never see a partial file
+
+    def set_lexicon_version(self, version: str):
+        """
+        Declares the current lexicon version. If it changed, every entry (in memory and on disk) for any other version is dropped.
+        """
+
+        if version == self.lexicon_version:
+            return
+
+        with self._lock:
+            for key in [key for key in self._entries if key[2] != version]:
+                value, size = self._entries.pop(key)
+                self._bytes -= size
+
+        if self.disk_dir is not None and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name != version:
+                    shutil.rmtree(os.path.join(self.disk_dir, name), ignore_errors = True)
+
+        self.lexicon_version = version
+
+    def stats(self):
+        stats = super().stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_dir"] = self.disk_dir
+        stats["lexicon_version"] = self.lexicon_version
+        return stats
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from solve_table import load_official_words
+
+@pytest.fixture(scope = "session")
+def official_words():
+    return load_official_words(os.path.join(ROOT, "data/official_words_processed.txt"))
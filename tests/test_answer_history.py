@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from answer_history import FIRST_WORDLE_DATE, AnswerHistory, load_answer_history, update_answer_history
+
+def test_add_keeps_earliest_date_per_word():
+    history = AnswerHistory({"2022-01-02": "crane"})
+
+    assert history.add("2022-01-01", "Crane ") == True
+    assert history.add(date(2022, 1, 1), "crane") == False
+    assert history.add("2022-01-05", "crane") == True
+
+    assert len(history) == 3
+    assert history.date_of("crane") == date(2022, 1, 1)
+    assert history.last_date == date(2022, 1, 5)
+    assert history.was_used("crane", before = "2022-01-02") and not history.was_used("crane", before = "2022-01-01")
+
+def test_used_before_sees_later_additions():
+    history = AnswerHistory({"2022-01-01": "crane"})
+    assert history.used_before("2022-01-10") == {"crane"}
+
+    history.add("2022-01-03", "abode")
+    assert history.used_before("2022-01-10") == {"crane", "abode"}
+    assert history.used_before("2022-01-03") == {"crane"}
+
+def test_missing_dates():
+    assert AnswerHistory().missing_dates(FIRST_WORDLE_DATE + timedelta(days = 2)) == [FIRST_WORDLE_DATE + timedelta(days = i) for i in range(3)]
+
+    history = AnswerHistory({"2022-01-01": "crane"})
+    assert history.missing_dates("2022-01-03") == [date(2022, 1, 2), date(2022, 1, 3)]
+    assert history.missing_dates("2022-01-01") == []
+
+def test_update_only_fetches_missing_days(tmp_path):
+    answers = {FIRST_WORDLE_DATE + timedelta(days = i) : f"w{i:04d}" for i in range(120)}
+    fetched = []
+    def fetch(day):
+        fetched.append(day)
+        return answers[day]
+
+    path = str(tmp_path / "history.json")
+    history = AnswerHistory({day : word for day, word in answers.items() if day < FIRST_WORDLE_DATE + timedelta(days = 60)})
+    until = FIRST_WORDLE_DATE + timedelta(days = 119)
+
+    assert update_answer_history(history, fetch = fetch, until = until, path = path, progress = False) == 60
+    assert fetched == list(answers)[60:]
+    assert load_answer_history(path).by_date == answers
+
+    fetched.clear()
+    assert update_answer_history(history, fetch = fetch, until = until, path = path, progress = False) == 0
+    assert fetched == []
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from wordle_assistant_functions import choose_next_guess, choose_next_guess_anytime, get_lexicon_table, get_partition_entropies
+
+@pytest.fixture
+def candidate_ids(official_words):
+    return np.arange(0, len(official_words), 7) # a few hundred candidates
+
+def test_zero_deadline_falls_back_to_the_rating_pick(official_words, candidate_ids):
+    result = choose_next_guess_anytime(candidate_ids, official_words, 0)
+
+    assert result["finished"] == False and result["strategy"] == "rating" and result["evaluated"] == 0
+    assert (result["next_guess"], result["word_ratings"]) == choose_next_guess(candidate_ids, official_words)
+
+def test_finished_search_picks_the_best_entropy(official_words, candidate_ids):
+    codes = get_lexicon_table(official_words)["codes"]
+
+    for guess_pool in ["candidates", "all"]:
+        result = choose_next_guess_anytime(candidate_ids, official_words, 60_000, guess_pool = guess_pool)
+
+        pool = candidate_ids if guess_pool == "candidates" else np.arange(len(official_words))
+        scores = get_partition_entropies(codes[pool], codes[candidate_ids])
+        assert result["finished"] == True and result["evaluated"] == result["pool_size"] == len(pool)
+        assert result["strategy"] == "entropy" and result["score"] == pytest.approx(scores.max(), abs = 1e-6)
+        assert result["next_guess"] in {official_words[i] for i in pool[np.isclose(scores, scores.max())]}
+
+def test_two_candidates_need_no_search(official_words):
+    result = choose_next_guess_anytime(np.array([3, 9]), official_words, 0)
+    assert result["finished"] == True and result["next_guess"] in (official_words[3], official_words[9])
+
+def test_unknown_strategy_is_rejected(official_words, candidate_ids):
+    with pytest.raises(ValueError):
+        choose_next_guess_anytime(candidate_ids, official_words, 10, strategy = "minimax")
@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pytest
+
+import wordle_assistant_functions
+from artifacts import ArtifactStore, artifact_store
+from wordle_assistant_functions import get_transition, ids_to_bitset, transition_cache, use_pattern_index
+
+@pytest.fixture
+def store(official_words, tmp_path):
+    source_path = tmp_path / "words.txt"
+    source_path.write_text("\n".join(random.Random(0).sample(official_words, 300)), encoding = "utf-8")
+    store = ArtifactStore(root = str(tmp_path / "artifacts"), source_path = str(source_path))
+    store.artifacts = dict(artifact_store.artifacts)
+    return store
+
+@pytest.fixture
+def no_pattern_index():
+    use_pattern_index([])
+    transition_cache.clear()
+    yield
+    use_pattern_index([])
+    transition_cache.clear()
+
+def test_arrays_are_memory_mapped(store):
+    for name in ("pattern_matrix", "positional_index"):
+        assert store.status(name) == "missing"
+        assert isinstance(store.get(name), np.memmap)
+        assert store.status(name) == "fresh"
+
+    assert store.get("pattern_matrix").shape == (300, 300)
+    assert store.get("positional_index").shape == (5 * 26, 300)
+    assert sum(store.get("letter_counts").values()) == sum(len(set(word)) for word in store.load_words())
+
+def test_transitions_from_artifacts_match_computed(store, no_pattern_index):
+    words = store.load_words()
+    rng = random.Random(1)
+    candidates = ids_to_bitset(np.array(sorted(rng.sample(range(len(words)), 120))))
+    guesses = rng.sample(words, 10) + ["eerie", "zzzzz"] # the last two aren't in the word list
+
+    expected = {}
+    for guess in guesses:
+        expected[guess] = get_transition(candidates, guess, words)[0]["buckets"]
+
+    for patterns in (store.get("pattern_matrix"), None):
+        use_pattern_index(words, patterns = patterns, positional_index = store.get("positional_index"))
+        transition_cache.clear()
+        for guess in guesses:
+            assert get_transition(candidates, guess, words)[0]["buckets"] == expected[guess], guess
+
+def test_decision_trees_follow_solver_settings(store, monkeypatch):
+    monkeypatch.setattr(wordle_assistant_functions, "endgame_threshold", 0)
+    store.artifacts["decision_trees"] = (lambda word_list: {"openers": {}},) + store.artifacts["decision_trees"][1:]
+    store.get("decision_trees")
+    assert store.status("decision_trees") == "fresh"
+
+    monkeypatch.setattr(wordle_assistant_functions, "endgame_threshold", 5)
+    assert store.status("decision_trees") == "stale"
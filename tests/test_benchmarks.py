@@ -0,0 +1,38 @@
+from wordle_assistant_functions import endgame_cache, lexicon_cache, lookahead_cache, solve_cache, transition_cache, wordle_wizard
+from benchmarks import clear_solver_caches, find_regressions, get_cases, make_synthetic_lexicon, summarize_times
+
+def test_synthetic_lexicon_is_reproducible(official_words):
+    lexicon = make_synthetic_lexicon(500, official_words, seed = 4)
+
+    assert len(set(lexicon)) == 500 and all(len(word) == 5 for word in lexicon)
+    assert lexicon == make_synthetic_lexicon(500, official_words, seed = 4)
+
+def test_clear_solver_caches_empties_every_cache(official_words):
+    wordle_wizard(word_list = official_words, max_guesses = 6, guess = "slate", target = "crane", return_stats = True)
+    assert transition_cache.stats()["entries"] > 0
+
+    clear_solver_caches()
+
+    for cache in (transition_cache, solve_cache, lexicon_cache, endgame_cache, lookahead_cache):
+        assert cache.stats()["entries"] == 0
+
+def test_cold_cases_start_from_empty_caches(official_words, tmp_path):
+    disk_dir = solve_cache.disk_dir
+    solve_cache.disk_dir = str(tmp_path)
+    try:
+        cases = {name: run for name, params, run in get_cases(official_words[:300], 3, sweep_limit = 5, cold_cache = True)}
+        assert len(cases["wordle_wizard"]()) == 3
+
+        assert solve_cache.stats()["hits"] == 0 and solve_cache.stats()["disk_hits"] == 0
+        assert solve_cache.disk_dir == str(tmp_path) # restored after each call
+    finally:
+        solve_cache.disk_dir = disk_dir
+        clear_solver_caches()
+
+def test_regressions_are_flagged_past_the_tolerance():
+    baseline = [{"case": "a", "lexicon": "official", "params": {}, "stats": summarize_times([1.0, 1.0, 1.0])}]
+    slower = [{"case": "a", "lexicon": "official", "params": {}, "stats": summarize_times([1.2, 1.2, 1.2])}]
+    much_slower = [{"case": "a", "lexicon": "official", "params": {}, "stats": summarize_times([2.0, 2.0, 2.0])}]
+
+    assert find_regressions(slower, baseline, tolerance = 0.25) == []
+    assert [regression["metric"] for regression in find_regressions(much_slower, baseline, tolerance = 0.25)] == ["p50", "p95"]
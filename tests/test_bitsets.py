@@ -0,0 +1,36 @@
+import random
+
+import numpy as np
+
+from wordle_assistant_functions import all_words_bitset, bitset_to_ids, get_feedback, get_transition, ids_to_bitset, transition_cache
+
+def test_ids_round_trip():
+    rng = random.Random(0)
+    for size in [0, 1, 7, 8, 9, 64, 500, 2309]:
+        ids = sorted(rng.sample(range(3000), size))
+        bits = ids_to_bitset(ids)
+
+        assert bits == sum(1 << i for i in ids)
+        assert bitset_to_ids(bits).tolist() == ids
+        assert ids_to_bitset(np.array(ids, dtype = np.int64)) == bits
+
+def test_edge_cases():
+    assert ids_to_bitset([]) == 0 and bitset_to_ids(0).tolist() == []
+    assert ids_to_bitset([5, 0, 5, 3]) == 0b101001 # order and repeats don't matter
+    assert bitset_to_ids(1 << 10_000).tolist() == [10_000]
+    assert bitset_to_ids(all_words_bitset(list("abcdefghij"))).tolist() == list(range(10))
+
+def test_transition_buckets_partition_the_candidates(official_words):
+    transition_cache.clear()
+    candidates = ids_to_bitset(random.Random(1).sample(range(len(official_words)), 300))
+
+    transition, words_scanned = get_transition(candidates, "crane", official_words)
+
+    assert words_scanned == 300
+    union = 0
+    for pattern, (bits, size) in transition["buckets"].items():
+        ids = bitset_to_ids(bits)
+        assert len(ids) == size and bits & union == 0
+        assert all(get_feedback("crane", official_words[i]) == pattern for i in ids)
+        union |= bits
+    assert union == candidates
@@ -0,0 +1,80 @@
+from solver_cache import LRUCache, SolveCache
+
+def test_entry_cap_evicts_least_recently_used():
+    cache = LRUCache(max_entries = 2, max_bytes = 1000)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1 # "a" is now the most recently used
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_byte_cap_evicts_until_under_cap():
+    cache = LRUCache(max_entries = 100, max_bytes = 100)
+    for key in "abcd":
+        cache.put(key, key, size = 30)
+
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["bytes"] == 90
+    assert "a" not in cache
+
+    cache.put("e", "e", size = 70)
+    assert list(key for key in "abcde" if key in cache) == ["d", "e"]
+    assert cache.stats()["bytes"] == 100
+
+def test_oversized_entry_is_kept_alone():
+    cache = LRUCache(max_entries = 10, max_bytes = 100)
+    cache.put("a", 1, size = 10)
+    cache.put("big", 2, size = 500)
+
+    assert "a" not in cache
+    assert cache.get("big") == 2
+    assert cache.stats()["bytes"] == 500
+
+def test_replacing_an_entry_updates_its_size():
+    cache = LRUCache(max_entries = 10, max_bytes = 100)
+    cache.put("a", 1, size = 60)
+    cache.put("a", 2, size = 20)
+    cache.put("b", 3, size = 60)
+
+    assert cache.get("a") == 2 and cache.get("b") == 3
+    assert cache.stats()["bytes"] == 80
+
+def test_resize_and_stats():
+    cache = LRUCache(max_entries = 10, max_bytes = 1000)
+    for i in range(5):
+        cache.put(i, i, size = 10)
+    cache.get(4)
+    cache.get("missing")
+    cache.resize(max_entries = 2)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 3
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+    assert 3 in cache and 4 in cache
+
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
+
+def test_solve_cache_disk_tier(tmp_path):
+    key = ("crane", "abode", "v1", "rating", 6, "e0-sNone-pNone")
+    SolveCache(disk_dir = str(tmp_path)).put(key, [["crane", 11], ["abode", 242]])
+
+    cache = SolveCache(disk_dir = str(tmp_path), decode = lambda steps: [tuple(step) for step in steps])
+    assert cache.get(key) == [("crane", 11), ("abode", 242)]
+    assert cache.disk_hits == 1
+    assert cache.get(key[:4] + (5,) + key[5:]) is None # other settings never share an entry
+
+def test_solve_cache_drops_other_lexicon_versions(tmp_path):
+    cache = SolveCache(disk_dir = str(tmp_path))
+    cache.set_lexicon_version("v1")
+    old_key = ("crane", "abode", "v1", "rating", 6, "settings")
+    cache.put(old_key, ["crane", "abode"])
+
+    cache.set_lexicon_version("v2")
+
+    assert old_key not in cache
+    assert not (tmp_path / "v1").exists()
+    assert cache.get(old_key) is None
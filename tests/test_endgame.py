@@ -0,0 +1,69 @@
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from wordle_assistant_functions import choose_endgame_guess, encode_words, endgame_cache, get_feedback, get_words_fingerprint, solve_endgame
+
+@pytest.fixture
+def words(official_words):
+    # endings shared by many words, where guessing candidates one by one loses guesses
+    endings = ("ight", "atch", "ound", "ower", "ill")
+    words = [word for word in official_words if word.endswith(endings)][:40]
+    return words + [word for word in official_words if word not in words][:10]
+
+def brute_force_total(words, ids):
+    # fewest total guesses over every guessing strategy, trying every word at every step
+    @lru_cache(maxsize = None)
+    def total(candidates):
+        if len(candidates) == 1:
+            return 1
+        best = float("inf")
+        for guess in range(len(words)):
+            groups = {}
+            for i in candidates:
+                groups.setdefault(get_feedback(words[guess], words[i]), []).append(i)
+            if len(groups) == 1 and guess not in candidates: # tells nothing apart
+                continue
+            cost = len(candidates) + sum(total(tuple(group)) for group in groups.values() if group != [guess])
+            best = min(best, cost)
+        return best
+
+    return total(tuple(ids))
+
+def guess_total(words, ids, guess):
+    groups = {}
+    for i in ids:
+        groups.setdefault(get_feedback(words[guess], words[i]), []).append(i)
+    return len(ids) + sum(brute_force_total(words, group) for group in groups.values() if group != [guess])
+
+def test_endgame_matches_brute_force(words):
+    endgame_cache.clear()
+    codes = encode_words(words)
+    lexicon_key = get_words_fingerprint(words)
+    rng = np.random.default_rng(0)
+
+    for size in [2, 3, 4, 5, 6, 8]:
+        for repeat in range(4):
+            ids = np.sort(rng.choice(40, size = size, replace = False)) # from the shared endings
+            expected = brute_force_total(words, tuple(ids.tolist()))
+
+            total, guess_id = solve_endgame(ids, codes, lexicon_key)
+            assert total == expected
+            assert guess_total(words, ids.tolist(), guess_id) == expected
+            assert solve_endgame(ids, codes, lexicon_key) == (total, guess_id) # from the cache
+
+            # with a bound at the optimum, no guess is returned
+            assert solve_endgame(ids, codes, lexicon_key, bound = expected)[1] is None
+
+def test_endgame_guess_keeps_an_equally_good_rating_guess(words):
+    endgame_cache.clear()
+    ids = np.arange(6)
+    expected = brute_force_total(words, tuple(ids.tolist()))
+
+    guess = choose_endgame_guess(ids, words)
+    assert guess_total(words, ids.tolist(), words.index(guess)) == expected
+
+    for rating_guess in words[:6]:
+        chosen = choose_endgame_guess(ids, words, rating_guess = rating_guess)
+        assert (chosen == rating_guess) == (guess_total(words, ids.tolist(), words.index(rating_guess)) == expected)
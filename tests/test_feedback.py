@@ -0,0 +1,48 @@
+import random
+
+import numpy as np
+import pytest
+
+from wordle_assistant_functions import encode_words, get_feedback, get_feedback_matrix
+
+# repeated letters in the guess, the target or both, where the presence and official rules differ
+DUPLICATE_PAIRS = [("eerie", "crane"), ("speed", "weary"), ("llama", "hello"), ("geese", "eerie"), ("abbey", "babes"), ("sassy", "assay"),
+                   ("crane", "eerie"), ("mamma", "maxim"), ("error", "rover"), ("kayak", "kayak")]
+
+def _reference(guesses, targets, duplicates):
+    return np.array([[get_feedback(guess, target, duplicates = duplicates) for target in targets] for guess in guesses], dtype = np.uint32)
+
+def test_docstring_examples():
+    assert get_feedback("crane", "abode") == 11
+    assert get_feedback("eerie", "crane", duplicates = True) == int("00102", 3)
+    assert get_feedback("eerie", "crane") == int("11102", 3)
+    assert get_feedback("crane", "crane", duplicates = True) == 3 ** 5 - 1
+
+@pytest.mark.parametrize("duplicates", [False, True])
+def test_matrix_matches_get_feedback(official_words, duplicates):
+    rng = random.Random(0)
+    guesses = rng.sample(official_words, 40) + [guess for guess, _ in DUPLICATE_PAIRS]
+    targets = rng.sample(official_words, 60) + [target for _, target in DUPLICATE_PAIRS]
+
+    matrix = get_feedback_matrix(encode_words(guesses), encode_words(targets), duplicates = duplicates)
+
+    assert np.array_equal(matrix, _reference(guesses, targets, duplicates))
+
+@pytest.mark.parametrize("duplicates", [False, True])
+def test_matrix_matches_get_feedback_in_blocks(official_words, duplicates):
+    # a budget this small forces one guess row per block
+    guesses = official_words[:30]
+    targets = official_words[:500]
+
+    matrix = get_feedback_matrix(encode_words(guesses), encode_words(targets), duplicates = duplicates, memory_budget = 1)
+
+    assert np.array_equal(matrix, _reference(guesses, targets, duplicates))
+
+@pytest.mark.parametrize("duplicates", [False, True])
+def test_matrix_other_word_length(duplicates):
+    words = ["banana", "cannon", "bandit", "anoint", "nation", "tannin", "sienna", "button"]
+
+    matrix = get_feedback_matrix(encode_words(words), encode_words(words), duplicates = duplicates)
+
+    assert np.array_equal(matrix, _reference(words, words, duplicates))
+    assert np.all(np.diag(matrix) == 3 ** 6 - 1)
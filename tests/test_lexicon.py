@@ -0,0 +1,54 @@
+import random
+
+import numpy as np
+import pytest
+
+from lexicon import Lexicon, SessionLexicon
+from wordle_assistant_functions import get_lexicon_table, get_words_fingerprint, lexicon_cache
+
+EXTRA_WORDS = ["zzzzz", "qajaq", "crane", "xylyl", "fjord", "jazzy"]
+
+def test_fingerprint_matches_plain_list(official_words):
+    lexicon = Lexicon(official_words)
+
+    assert lexicon.fingerprint() == get_words_fingerprint(list(official_words))
+    assert get_words_fingerprint(lexicon) == lexicon.fingerprint()
+    assert Lexicon(official_words[:-1]).fingerprint() != lexicon.fingerprint()
+
+def test_session_fingerprint_follows_extra_words(official_words):
+    base = Lexicon(official_words)
+    session = SessionLexicon(base)
+    assert session.fingerprint() == base.fingerprint()
+
+    for word in EXTRA_WORDS:
+        session.add(word)
+        assert session.fingerprint() == get_words_fingerprint(list(session))
+
+    assert session.extra_words == tuple(word for word in EXTRA_WORDS if word not in official_words)
+    assert session.index(session.extra_words[0]) == len(official_words)
+    assert base.fingerprint() == get_words_fingerprint(official_words) # the shared lexicon is untouched
+
+@pytest.mark.parametrize("seed", range(3))
+def test_overlay_table_matches_full_rebuild(official_words, seed):
+    rng = random.Random(seed)
+    base = Lexicon(rng.sample(official_words, 800))
+    session = SessionLexicon(base, rng.sample(official_words, 5) + EXTRA_WORDS)
+
+    table = get_lexicon_table(session)
+    rebuilt = get_lexicon_table(list(session))
+
+    assert table is not rebuilt
+    assert table["word_index"] == rebuilt["word_index"]
+    for name in ("ratings", "start_rank", "end_rank", "codes"):
+        assert np.array_equal(table[name], rebuilt[name]), name
+
+def test_session_tables_stay_out_of_shared_cache(official_words):
+    base = Lexicon(official_words[:500])
+    get_lexicon_table(base)
+    entries = len(lexicon_cache)
+
+    for word in EXTRA_WORDS:
+        get_lexicon_table(SessionLexicon(base, [word]))
+
+    assert len(lexicon_cache) == entries
+    assert base.fingerprint() in lexicon_cache
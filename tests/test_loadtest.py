@@ -0,0 +1,29 @@
+import time
+from itertools import cycle, islice
+
+from loadtest import iter_requests, make_request_mix, run_entry_points, summarize_load
+
+def test_request_mix_is_the_start_of_the_stream(official_words):
+    mix = make_request_mix(official_words, 50, daily_target = "crane", seed = 3)
+    assert mix == list(islice(iter_requests(official_words, daily_target = "crane", seed = 3), 50))
+
+def test_run_stops_at_the_deadline_and_reports_cache_hits(official_words):
+    words = official_words[:500]
+    requests = cycle(make_request_mix(words, 5, daily_share = 0.0, seed = 1))
+
+    start = time.perf_counter()
+    results = run_entry_points(words, requests, concurrency = 2, duration = 1.0)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 5.0 # pool startup plus at most one request per worker past the deadline
+    summary = summarize_load(results, elapsed, [], 2)
+    assert summary["errors"] == {} and summary["requests"] > 10
+    assert summary["cache_hit_rate"]["solve"] > 0.5 # five solves replayed in a loop
+
+def test_cold_run_reuses_nothing(official_words):
+    words = official_words[:500]
+    requests = cycle(make_request_mix(words, 5, daily_share = 0.0, seed = 1))
+
+    results = run_entry_points(words, requests, concurrency = 1, duration = 1.0, cold = True)
+
+    assert summarize_load(results, 1.0, [], 1)["cache_hit_rate"]["solve"] == 0.0
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from wordle_assistant_functions import (choose_next_guess_lookahead, get_feedback_matrix, get_lexicon_table, get_one_step_costs,
+                                        lookahead_cache)
+
+def two_step_scores(pool_ids, ids, codes):
+    # every guess of the pool scored two steps ahead, without a shortlist or pruning
+    scores = []
+    for guess_id in pool_ids:
+        patterns = get_feedback_matrix(codes[[guess_id]], codes[ids])[0]
+        score = 1.0
+        for pattern in np.unique(patterns):
+            group = ids[patterns == pattern]
+            if len(group) == 1 and group[0] == guess_id:
+                continue
+            if len(group) <= 2:
+                guesses_left = (2 * len(group) - 1) / len(group)
+            else:
+                guesses_left = get_one_step_costs(group, group, codes).min()
+            score += len(group) / len(ids) * guesses_left
+        scores.append(score)
+
+    return np.array(scores)
+
+@pytest.mark.parametrize("start", [0, 5, 11])
+def test_pruned_search_finds_the_best_two_step_score(official_words, start):
+    lookahead_cache.clear()
+    codes = get_lexicon_table(official_words)["codes"]
+    ids = np.arange(start, len(official_words), 61)
+
+    result = choose_next_guess_lookahead(ids, official_words, top_n = len(ids), guess_pool = "candidates")
+
+    scores = two_step_scores(ids, ids, codes)
+    assert result["evaluated"] + result["pruned"] == len(ids)
+    assert result["expected_guesses"] == pytest.approx(scores.min(), abs = 1e-6)
+    assert scores[list(ids).index(official_words.index(result["next_guess"]))] == pytest.approx(scores.min(), abs = 1e-6)
+
+def test_shortlist_comes_from_the_whole_word_list(official_words):
+    lookahead_cache.clear()
+    ids = np.arange(3, len(official_words), 97)
+
+    result = choose_next_guess_lookahead(ids, official_words, top_n = 5)
+
+    assert result["next_guess"] in official_words and result["evaluated"] + result["pruned"] == 5
+    assert choose_next_guess_lookahead(ids, official_words, top_n = 5) == result # from the cache
+    assert choose_next_guess_lookahead(ids[:2], official_words)["next_guess"] in {official_words[i] for i in ids[:2]}
@@ -0,0 +1,26 @@
+import math
+
+import numpy as np
+
+from wordle_assistant_functions import best_guess_words, get_feedback_matrix, get_letter_counts, get_word_rating
+from opener_search import score_opener
+
+def test_best_guess_words_rates_every_word(official_words):
+    words = official_words[:300]
+    word_ratings, sorted_counts = best_guess_words(words, show_letters = True)
+
+    assert sorted(word for word, rating in word_ratings) == sorted(words)
+    assert word_ratings == get_word_rating(words, words, normalized = False)
+    assert [rating for word, rating in word_ratings] == sorted((rating for word, rating in word_ratings), reverse = True)
+    assert sorted_counts == get_letter_counts(word_list = words, sort = "descending", unique = True)
+
+def test_score_opener_matches_feedback_of_the_words(official_words):
+    words = official_words[:300] + ["crane"]
+    ratings = dict(best_guess_words(words))
+
+    for opener in ["crane", words[17]]:
+        scores = score_opener(opener, words, ratings)
+        sizes = np.unique(get_feedback_matrix([opener], words)[0], return_counts = True)[1]
+
+        assert scores["minimax"] == sizes.max()
+        assert math.isclose(scores["entropy"], -sum(size / len(words) * math.log2(size / len(words)) for size in sizes), abs_tol = 1e-6)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from wordle_assistant_functions import get_feedback_matrix
+from pattern_matrix import build_pattern_matrix_file, load_pattern_matrix
+
+def test_build_matches_the_kernel_in_small_blocks(official_words, tmp_path):
+    words = official_words[:300]
+    build_pattern_matrix_file(words, str(tmp_path), max_memory = 64 * 1024, progress = False) # a few rows per block
+
+    manifest, patterns = load_pattern_matrix(str(tmp_path))
+    assert isinstance(patterns, np.memmap) and manifest["words"] == words
+    assert np.array_equal(patterns, get_feedback_matrix(words, words))
+
+def test_resume_only_builds_unfinished_rows(official_words, tmp_path):
+    words = official_words[:300]
+    build_pattern_matrix_file(words, str(tmp_path), progress = False)
+    expected = get_feedback_matrix(words, words)
+
+    #### An interrupted build: two runs of rows never written, and a finished row that must not be computed again
+    patterns = np.load(tmp_path / "patterns.npy", mmap_mode = "r+")
+    done = np.load(tmp_path / "done.npy", mmap_mode = "r+")
+    for rows in (slice(10, 40), slice(250, 300)):
+        patterns[rows] = 255
+        done[rows] = False
+    patterns[100] = 254
+    patterns.flush()
+    done.flush()
+    del patterns, done
+    assert load_pattern_matrix(str(tmp_path)) is None
+
+    build_pattern_matrix_file(words, str(tmp_path), max_memory = 64 * 1024, progress = False)
+
+    manifest, patterns = load_pattern_matrix(str(tmp_path))
+    assert (patterns[100] == 254).all()
+    patterns = np.array(patterns)
+    patterns[100] = expected[100]
+    assert np.array_equal(patterns, expected)
+
+def test_new_word_list_starts_over(official_words, tmp_path):
+    build_pattern_matrix_file(official_words[:200], str(tmp_path), progress = False)
+    build_pattern_matrix_file(official_words[100:300], str(tmp_path), progress = False)
+
+    manifest, patterns = load_pattern_matrix(str(tmp_path))
+    assert np.array_equal(patterns, get_feedback_matrix(official_words[100:300], official_words[100:300]))
+
+def test_row_over_the_ceiling_fails(official_words, tmp_path):
+    with pytest.raises(MemoryError):
+        build_pattern_matrix_file(official_words[:300], str(tmp_path), max_memory = 1024, progress = False)
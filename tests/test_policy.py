@@ -0,0 +1,62 @@
+import random
+from functools import lru_cache
+
+import pytest
+
+from policy import PolicySearch
+from wordle_assistant_functions import get_feedback
+
+def _brute_force_total(words, max_guesses):
+    # fewest total guesses over every target, trying every guess at every candidate set
+    @lru_cache(maxsize = None)
+    def best(ids, guesses_left):
+        if len(ids) == 1:
+            return 1
+        if guesses_left <= 1:
+            return float("inf")
+        totals = []
+        for guess_id in range(len(words)):
+            groups = {}
+            for i in ids:
+                groups.setdefault(get_feedback(words[guess_id], words[i]), []).append(i)
+            if any(len(group) == len(ids) for group in groups.values()):
+                continue
+            total = len(ids)
+            for group in groups.values():
+                if guess_id not in group:
+                    total += best(tuple(group), guesses_left - 1)
+            totals.append(total)
+        return min(totals, default = float("inf"))
+
+    return best(tuple(range(len(words))), max_guesses)
+
+@pytest.mark.parametrize("seed, max_guesses", [(0, 6), (1, 6), (2, 3)])
+def test_exhaustive_search_is_optimal(official_words, seed, max_guesses):
+    words = random.Random(seed).sample(official_words, 25)
+    search = PolicySearch(words, max_guesses = max_guesses, branching = None)
+
+    assert search.solve(search.all_ids, max_guesses) == _brute_force_total(words, max_guesses)
+
+def test_bound_is_a_lower_bound(official_words):
+    words = random.Random(3).sample(official_words, 25)
+    exact = PolicySearch(words, branching = None).solve(PolicySearch(words).all_ids, 6)
+
+    for bound in (exact - 5, exact, exact + 5):
+        search = PolicySearch(words, branching = None)
+        total = search.solve(search.all_ids, 6, bound = bound)
+        if bound > exact:
+            assert total == exact
+        else:
+            assert total >= bound and total <= exact
+
+def test_guess_total_of_each_opener(official_words):
+    words = random.Random(4).sample(official_words, 20)
+    search = PolicySearch(words, branching = None)
+    best = search.solve(search.all_ids, 6)
+
+    totals = [search.guess_total(guess_id, search.all_ids, 6, float("inf")) for guess_id in range(len(words))]
+    assert min(totals) == best
+    for guess_id, total in zip(range(len(words)), totals):
+        if total < float("inf"):
+            tree = search.tree(guess_id)
+            assert tree["guess"] == words[guess_id]
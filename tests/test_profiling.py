@@ -0,0 +1,23 @@
+from wordle_assistant_functions import wordle_wizard, wordle_wizard_cheat
+
+PHASES = {"constraints", "filtering", "rating", "endgame"}
+
+def check_phase_timings(phase_timings, num_guesses):
+    assert phase_timings and {record["phase"] for record in phase_timings} <= PHASES
+    assert {record["guess_num"] for record in phase_timings} <= set(range(1, num_guesses + 1))
+    for record in phase_timings:
+        assert record["seconds"] >= 0 and record["words_scanned"] >= 0 and record["candidates"] >= 1
+
+def test_solve_records_phases(official_words):
+    stats = wordle_wizard(word_list = official_words, max_guesses = 6, guess = "slate", target = "crane", profile = True)
+    plain = wordle_wizard(word_list = official_words, max_guesses = 6, guess = "slate", target = "crane", return_stats = True)
+
+    check_phase_timings(stats["phase_timings"], stats["num_guesses"])
+    assert "phase_timings" not in plain
+    assert {key: value for key, value in stats.items() if key != "phase_timings"} == plain # profiling doesn't change the solve
+
+def test_cheat_records_phases(official_words):
+    stats = wordle_wizard_cheat(["slate", "pious"], official_words, max_guesses = 6, target = "crane", profile = True)
+
+    check_phase_timings(stats["phase_timings"], 2)
+    assert {"constraints", "filtering", "rating"} <= {record["phase"] for record in stats["phase_timings"]}
@@ -0,0 +1,41 @@
+import random
+
+import numpy as np
+
+from wordle_assistant_functions import get_tie_break_ranks, get_top_word_ratings, get_word_rating
+
+def test_top_k_matches_the_full_sort(official_words):
+    rng = random.Random(0)
+    for size, k in [(2000, 10), (300, 50), (40, 40), (7, 10), (1, 5)]:
+        ids = np.array(sorted(rng.sample(range(len(official_words)), size)))
+        full = get_word_rating([official_words[i] for i in ids], official_words, normalized = False)
+
+        next_guess, word_ratings = get_top_word_ratings(ids, official_words, k = k)
+
+        assert [word for word, rating in word_ratings] == [word for word, rating in full[:k]]
+        assert np.allclose([rating for word, rating in word_ratings], [rating for word, rating in full[:k]])
+
+def test_best_guess_follows_the_tie_break(official_words):
+    start_ranks, end_ranks = get_tie_break_ranks(official_words)
+
+    def tie_break_key(i):
+        word = official_words[i]
+        if word[0] in start_ranks and word[-1] in end_ranks:
+            return start_ranks[word[0]], end_ranks[word[-1]], i
+        return 10, 10, i
+
+    rng = random.Random(1)
+    ratings = dict(get_word_rating(official_words, official_words, normalized = False))
+    for size in [2, 5, 30, 500, len(official_words)]:
+        ids = np.array(sorted(rng.sample(range(len(official_words)), size)))
+        best_rating = max(ratings[official_words[i]] for i in ids)
+        best = min((i for i in ids if ratings[official_words[i]] == best_rating), key = tie_break_key)
+
+        assert get_top_word_ratings(ids, official_words)[0] == official_words[best]
+
+    #### Anagrams always tie, so only the tie-break tells them apart
+    anagrams = {}
+    for i, word in enumerate(official_words):
+        anagrams.setdefault("".join(sorted(word)), []).append(i)
+    for group in [group for group in anagrams.values() if len(group) > 2][:20]:
+        assert get_top_word_ratings(np.array(group), official_words)[0] == official_words[min(group, key = tie_break_key)]
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from wordle_assistant_functions import get_lexicon_table, get_partition_entropies, sample_candidates, score_guesses_sampled
+
+def test_full_sample_is_exact(official_words):
+    codes = get_lexicon_table(official_words)["codes"]
+    guess_ids = np.arange(0, len(official_words), 5)
+    candidate_ids = np.arange(1, len(official_words), 11)
+    exact = get_partition_entropies(codes[guess_ids], codes[candidate_ids])
+
+    for sample_size in [len(candidate_ids), len(candidate_ids) + 100]:
+        result = score_guesses_sampled(guess_ids, candidate_ids, official_words, sample_size = sample_size)
+
+        assert result["exact"] == True and result["sampled"] == len(candidate_ids)
+        assert np.allclose(result["estimate"], exact) and np.allclose(result["lower"], result["upper"])
+        assert result["next_guess"] == official_words[guess_ids[np.argmax(exact)]]
+        assert result["score"] == pytest.approx(exact.max())
+
+def test_sample_of_every_candidate_weighs_each_once(official_words):
+    candidate_ids = np.arange(2, len(official_words), 9)
+    sample, weights, strata = sample_candidates(candidate_ids, official_words, sample_size = len(candidate_ids))
+
+    assert sorted(sample.tolist()) == candidate_ids.tolist()
+    assert np.all(weights == 1.0)
+
+def test_sampled_pick_is_rescored_exactly(official_words):
+    codes = get_lexicon_table(official_words)["codes"]
+    guess_ids = np.arange(0, len(official_words), 3)
+    candidate_ids = np.arange(len(official_words))
+    exact = get_partition_entropies(codes[guess_ids], codes[candidate_ids])
+
+    result = score_guesses_sampled(guess_ids, candidate_ids, official_words, sample_size = 256)
+
+    assert result["exact"] == False and result["sampled"] < len(candidate_ids)
+    assert result["next_guess"] == official_words[guess_ids[np.argmax(exact)]]
+    assert result["score"] == pytest.approx(exact.max())
+    assert np.all(result["lower"] <= result["upper"])
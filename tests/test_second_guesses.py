@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from second_guesses import FORMAT_VERSION, SecondGuessTable, build_second_guess_table, get_second_guesses, load_second_guess_table
+from wordle_assistant_functions import (all_words_bitset, get_feedback, get_next_step, get_words_fingerprint, transition_cache,
+                                        use_second_guess_table)
+
+OPENERS = ["crane", "slate"]
+
+@pytest.fixture
+def word_list(official_words):
+    words = random.Random(0).sample(official_words, 400)
+    return words + [opener for opener in OPENERS if opener not in words]
+
+@pytest.fixture
+def live_solver():
+    use_second_guess_table(None)
+    transition_cache.clear()
+    yield
+    use_second_guess_table(None)
+    transition_cache.clear()
+
+def _live_next_step(word_list, opener, pattern):
+    _, remaining, next_guess, word_ratings = get_next_step(all_words_bitset(word_list), opener, pattern, word_list)
+    return next_guess, remaining, word_ratings
+
+def test_table_matches_live_next_steps(word_list, tmp_path, live_solver):
+    path = str(tmp_path / "second_guess_table.json")
+    build_second_guess_table(word_list, openers = OPENERS, path = path, processes = 1, progress = False)
+    table = load_second_guess_table(path)
+    lexicon_version = get_words_fingerprint(word_list).hex()
+
+    for opener in OPENERS:
+        patterns = {get_feedback(opener, target) for target in word_list} - {3 ** 5 - 1}
+        assert set(table.openers[opener]) == patterns
+        for pattern in patterns:
+            next_guess, remaining, word_ratings = table.get_second_guess(lexicon_version, opener, pattern)
+            assert (next_guess, remaining, word_ratings) == _live_next_step(word_list, opener, pattern)
+
+def test_loaded_table_serves_get_next_step(word_list, live_solver):
+    second_guesses = get_second_guesses(word_list, "crane")
+    pattern, (next_guess, remaining, word_ratings) = next(iter(second_guesses.items()))
+    # a doctored entry, to tell the table's answer apart from a live one
+    second_guesses[pattern] = ["zzzzz", remaining, word_ratings]
+    table = SecondGuessTable({"format_version": FORMAT_VERSION, "lexicon_version": get_words_fingerprint(word_list).hex(),
+                              "openers": {"crane": {str(p) : value for p, value in second_guesses.items()}}})
+
+    use_second_guess_table(table)
+    assert _live_next_step(word_list, "crane", pattern)[0] == "zzzzz"
+    assert table.get_second_guess("other lexicon", "crane", pattern) is None
+    assert table.get_second_guess(get_words_fingerprint(word_list).hex(), "slate", pattern) is None
+
+    use_second_guess_table(None) # the settings change, so the cached pick isn't served
+    assert _live_next_step(word_list, "crane", pattern)[0] == next_guess
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+
+from service import SolverService, parse_feedback, suggest
+from wordle_assistant_functions import get_feedback
+
+@pytest.mark.parametrize("feedback, pattern", [("bbygb", 15), ("00120", 15), ("GGGGG", 242), ("bbbbb", 0), ("21021", int("21021", 3))])
+def test_parse_feedback(feedback, pattern):
+    assert parse_feedback(feedback) == pattern
+
+@pytest.mark.parametrize("feedback", ["bbyxb", "0012a", "bbyg", "bbygbb", "", "00 12"])
+def test_parse_feedback_rejects_invalid(feedback):
+    with pytest.raises(ValueError):
+        parse_feedback(feedback)
+
+def test_parse_feedback_other_word_length():
+    assert parse_feedback("gggggg", word_length = 6) == 3 ** 6 - 1
+    with pytest.raises(ValueError):
+        parse_feedback("ggggg", word_length = 6)
+
+def test_suggest_filters_with_official_feedback(official_words):
+    guesses = ["speed", "trial"]
+    patterns = [get_feedback(guess, "weary", duplicates = True) for guess in guesses]
+    assert patterns[0] == parse_feedback("bbybb")
+
+    result = suggest(official_words, guesses, patterns, k = len(official_words))
+
+    expected = [word for word in official_words
+                if all(get_feedback(guess, word, duplicates = True) == pattern for guess, pattern in zip(guesses, patterns))]
+    assert result["remaining"] == len(expected)
+    assert result["possible_words"] == expected
+    assert "weary" in expected and result["solved"] == False
+
+def test_suggest_solved():
+    result = suggest(["crane", "abode"], ["crane"], [parse_feedback("ggggg")])
+
+    assert result["solved"] == True and result["remaining"] == 0
+
+@pytest.fixture
+def service(official_words):
+    service = SolverService(official_words[:500], processes = 1, daily_target = "crane")
+    yield service
+    service.executor.shutdown(wait = True)
+
+@pytest.mark.parametrize("request_body", [
+    {"guesses": ["ébcde"], "feedback": ["bbbbb"]},
+    {"guesses": ["crane"], "daily": True, "date": 20220101},
+    {"guesses": ["crane"], "feedback": ["gg"]},
+    {"start": "crane", "target": "ßlate"},
+])
+def test_invalid_requests_get_400(service, request_body):
+    path = "/solve" if "start" in request_body else "/suggest"
+    status, payload, headers = asyncio.run(service.dispatch("POST", path, json.dumps(request_body).encode("utf-8")))
+
+    assert status == 400 and "error" in payload
+    assert service.pending == 0
+
+@pytest.mark.parametrize("content_length", ["abc", "-5"])
+def test_invalid_content_length_gets_400(service, content_length):
+    async def request():
+        host, port = await service.start(port = 0)
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f"POST /suggest HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), timeout = 5) # the server closes the connection after answering
+            writer.close()
+            return response
+        finally:
+            await service.close()
+
+    response = asyncio.run(request())
+
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Connection: close" in response
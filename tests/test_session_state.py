@@ -0,0 +1,45 @@
+import copy
+
+import pytest
+
+import wordle_assistant_functions
+from wordle_assistant_functions import wordle_wizard_cheat
+
+@pytest.fixture
+def shown(monkeypatch):
+    # what the app would show, instead of sending it to streamlit
+    lines = []
+    monkeypatch.setattr(wordle_assistant_functions.st, "markdown", lines.append)
+    return lines
+
+@pytest.mark.parametrize("target, guesses", [
+    ("crane", ["slate", "pious", "trace", "brake"]),
+    ("mummy", ["adieu", "tummy", "yummy", "dummy", "gummy"]),
+    ("knoll", ["crane", "pilot", "knoll"]),
+])
+def test_incremental_state_matches_a_fresh_call(official_words, shown, target, guesses):
+    solver_state = {}
+    for i in range(1, len(guesses) + 1):
+        stats = wordle_wizard_cheat(guesses[:i], official_words, max_guesses = 6, target = target, return_stats = True, solver_state = solver_state)
+        fresh_state = {}
+        assert stats == wordle_wizard_cheat(guesses[:i], official_words, max_guesses = 6, target = target, return_stats = True, solver_state = fresh_state)
+        assert solver_state == fresh_state
+
+        #### The verbose output, with every suggestion, is the same too
+        shown.clear()
+        wordle_wizard_cheat(guesses[:i], official_words, max_guesses = 6, target = target, verbose = True, solver_state = solver_state)
+        resumed = list(shown)
+        shown.clear()
+        wordle_wizard_cheat(guesses[:i], official_words, max_guesses = 6, target = target, verbose = True)
+        assert resumed and resumed == shown
+
+def test_state_resets_when_an_earlier_guess_changes(official_words, shown):
+    solver_state = {}
+    wordle_wizard_cheat(["slate", "pious"], official_words, max_guesses = 6, target = "crane", return_stats = True, solver_state = solver_state)
+    before = copy.deepcopy(solver_state)
+
+    stats = wordle_wizard_cheat(["trace", "pious"], official_words, max_guesses = 6, target = "crane", return_stats = True, solver_state = solver_state)
+
+    fresh_state = {}
+    assert stats == wordle_wizard_cheat(["trace", "pious"], official_words, max_guesses = 6, target = "crane", return_stats = True, solver_state = fresh_state)
+    assert solver_state == fresh_state != before
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+
+from wordle_assistant_functions import get_lexicon_table, get_top_word_ratings, lexicon_cache
+from shared_index import SharedIndex, publish_shared_index, share_word_list
+
+@pytest.fixture
+def words(official_words):
+    lexicon_cache.clear() # the tables installed here mustn't leak into other tests
+    yield official_words[:400]
+    lexicon_cache.clear()
+
+def test_attached_index_serves_the_same_rankings(words, tmp_path):
+    expected = get_top_word_ratings(np.arange(len(words)), words)
+    ratings = np.array(get_lexicon_table(words)["ratings"])
+    lexicon_cache.clear()
+
+    publish_shared_index(words, str(tmp_path))
+    shared_index = SharedIndex(str(tmp_path))
+    word_list = shared_index.install()
+
+    assert list(word_list) == words
+    assert isinstance(get_lexicon_table(word_list)["ratings"], np.memmap)
+    assert np.array_equal(get_lexicon_table(word_list)["ratings"], ratings)
+    assert get_top_word_ratings(np.arange(len(words)), word_list) == expected
+    assert shared_index.install(words[:-1]) is None # not the indexed word list
+
+def test_corrupt_array_fails_verification(words, tmp_path):
+    manifest = publish_shared_index(words, str(tmp_path))
+    ratings = np.load(tmp_path / manifest["directory"] / "ratings.npy", mmap_mode = "r+")
+    ratings[3] += 1
+    ratings.flush()
+    del ratings
+
+    shared_index = SharedIndex(str(tmp_path))
+    with pytest.raises(ValueError, match = "'ratings' doesn't match"):
+        shared_index.install()
+
+def test_old_format_is_republished(words, tmp_path):
+    publish_shared_index(words, str(tmp_path))
+    with open(tmp_path / "manifest.json", "r", encoding = "utf-8") as f:
+        manifest = json.load(f)
+    manifest["format_version"] = 1
+    with open(tmp_path / "manifest.json", "w", encoding = "utf-8") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError, match = "format version"):
+        SharedIndex(str(tmp_path))
+
+    shared_index = share_word_list(words, str(tmp_path))
+    assert shared_index.manifest["format_version"] != 1
+    assert list(shared_index.lexicon) == words
@@ -0,0 +1,54 @@
+import random
+
+import numpy as np
+import pytest
+
+from solve_table import build_solve_table, load_solve_table
+from wordle_assistant_functions import get_solver_settings, get_words_fingerprint, solve_puzzle
+
+OPENERS = ["crane", "mamma"]
+
+@pytest.fixture(scope = "module")
+def word_list(official_words):
+    words = random.Random(0).sample(official_words, 250)
+    return words + [opener for opener in OPENERS if opener not in words]
+
+@pytest.mark.parametrize("max_guesses", [6, 3])
+def test_lookups_match_solve_puzzle(word_list, tmp_path, max_guesses):
+    build_solve_table(word_list, path = str(tmp_path), openers = OPENERS, max_guesses = max_guesses, processes = 1, progress = False)
+    table = load_solve_table(str(tmp_path))
+    lexicon_version = get_words_fingerprint(word_list).hex()
+
+    for opener in OPENERS:
+        num_guesses, solved = table.get_outcomes(opener)
+        for column, target in enumerate(word_list):
+            expected = solve_puzzle(word_list, opener, target, max_guesses = max_guesses)
+            solution = table.get_solution(opener, target, lexicon_version, max_guesses = max_guesses)
+            for field in ("guessed_words", "num_guesses", "target_guessed"):
+                assert solution[field] == expected[field], (opener, target, field)
+            assert (num_guesses[column], solved[column]) == (expected["num_guesses"], expected["target_guessed"])
+
+def test_only_serves_its_own_settings(word_list, tmp_path):
+    build_solve_table(word_list, path = str(tmp_path), openers = OPENERS[:1], processes = 1, progress = False)
+    table = load_solve_table(str(tmp_path))
+    lexicon_version = get_words_fingerprint(word_list).hex()
+
+    assert table.settings == get_solver_settings()
+    assert table.get_solution("crane", word_list[0], lexicon_version) is not None
+    assert table.get_solution("crane", word_list[0], lexicon_version, settings = "e0-snone-pnone") is None
+    assert table.get_solution(OPENERS[1], word_list[0], lexicon_version) is None # not solved
+    assert table.get_solution("crane", word_list[0], "other lexicon") is None
+
+def test_resumes_after_interruption(word_list, tmp_path):
+    build_solve_table(word_list, path = str(tmp_path), openers = OPENERS, processes = 1, progress = False)
+    expected = load_solve_table(str(tmp_path)).opener_summary()
+
+    # as if the build stopped while writing the last opener's nodes: not marked finished, with its nodes on disk
+    roots = np.load(str(tmp_path / "roots.npy"), mmap_mode = "r+")
+    roots[-1] = -1
+    roots.flush()
+    del roots
+    assert len(load_solve_table(str(tmp_path)).opener_summary()) == 1
+
+    build_solve_table(word_list, path = str(tmp_path), openers = OPENERS, processes = 1, progress = False)
+    assert load_solve_table(str(tmp_path)).opener_summary() == expected
@@ -2,8 +2,15 @@ import numpy as np # for stats
 import random # for randomly generating target and start words
 import operator # for sorting letter frequency distribution
 import time # for #dramaticeffect
+import os # for the optional on-disk solution cache
+import sys # for cache size estimates
+import hashlib # for fingerprints of word lists and candidate sets
+import textwrap # for batched output
+from statistics import NormalDist # for confidence intervals of sampled scores
 import pandas as pd
 import streamlit as st
+from solver_cache import LRUCache, SolveCache # for the caches shared by every session
+from lexicon import Lexicon # for word lists shared by every session
 
 english_alphabet = "abcdefghijklmnopqrstuvwxyz"
 
@@ -80,9 +87,10 @@ def get_letter_counts(word_list: list, letters: str = english_alphabet, sort: st
 
 def best_guess_words(word_list: list, show_letters: bool = False):
     """
-    Given a passed list of English words of a consistent length, calculates the most statistically optimal first guess words, alongside a rating for each word. 
+    Given a passed list of English words of a consistent length, rates every word as a first guess and returns them all, best first.
     
     Rating = sum(frequency of each unique letter in that word) / sum (all unique letter frequencies in word_list) * 100, rounded to 2 decimals.
+    For other ways of ranking first guesses (entropy, minimax, simulated number of guesses), see opener_search.py.
 
     ------
     Parameters:
@@ -90,58 +98,104 @@ def best_guess_words(word_list: list, show_letters: bool = False):
     `word_list`: list
         list of words (str) of consistent length
     `show_letters`: bool
-        if True, also # prints set of most optimal letters to guess
+        if True, also returns the letter frequencies used for the ratings
 
     ------
     Returns:
     ------
     `word_ratings`: list
-        list of tuples. Format is [(word, rating)], where rating is calculated according to above formula
+        list of tuples. Format is [(word, rating)], where rating is calculated according to above formula. Words with equal ratings stay in word list order
     `sorted_counts`: list of tuples
-        list of tuples. Format is ("letter", frequency). Sorted according to `sort` value; ["descending" or "ascending"] if passed
+        list of tuples. Format is ("letter", frequency), most frequent first. Only returned if `show_letters` == True
     """
-        
-    english_alphabet = "abcdefghijklmnopqrstuvwxyz"
 
-    sorted_counts = get_letter_counts(english_alphabet, word_list, sort = "descending")
+    sorted_counts = get_letter_counts(word_list = word_list, letters = english_alphabet, sort = "descending", unique = True)
 
-    max_len_possible = len(word_list[0])
+    word_ratings = get_word_rating(words_to_rate = word_list, word_list = word_list, normalized = False)
 
-    ### Get words with the highest letter diversity
-    while max_len_possible:
+    if show_letters == True:
+        return word_ratings, sorted_counts
+    else:
+        return word_ratings
 
-        best_letters = set()
-        best_words = []
+def count_vows_cons(word: str, y_vow = True):
+    """
+    Given a passed word, calculate the number of non-unique vowels and consonants in the word (duplicates counted more than once).
+    
+    ------
+    Parameters:
+    ------
+    `word`: str
+        a single passed word (str)
+    `y_vow`: bool
+        if True, "y" is considered a vowel. If False, "y" considered a consonant. Default is True
 
-        for letter, freq in sorted_counts:
-            best_letters.add(letter)
-            if len(best_letters) == max_len_possible:
-                break
+    ------
+    Returns:
+    ------
+    `counts`: dict
+        dictionary, where format is {letter type : count}
+    """
 
-        ### Get all words that have one of each of the 5 top most frequent letters
-        for word in word_list:
-            word_set = set()
+    word = word.lower() # for consistency
 
-            for letter in word:
-                word_set.add(letter)
+    if y_vow == True:
+        vows = "aeiouy"
+        cons = "bcdfghjklmnpqrstvwxz"
+    elif y_vow == False:
+        vows = "aeiou"
+        cons = "bcdfghjklmnpqrstvwxyz"
+
+    counts = {}
+    counts["vows"] = 0
+    counts["cons"] = 0
+    for letter in word:
+        if letter in vows:
+            counts["vows"] += 1
+        if letter in cons:
+            counts["cons"] += 1
 
-            if best_letters.issubset(word_set):
-                best_words.append(word)
+    return counts
 
-        if len(best_words) > 0:
-            break
-        else:
-            max_len_possible -= 1 # only try the top 4 letters, then 3, then 2, ...
-        
-        if max_len_possible == 0:
-            break
+def get_word_rating(words_to_rate: list, word_list: list, normalized: bool = True, ascending: bool = False):
+    """
+    Given a word and a word list, calculates rating each word as a measure of its impact to the next possible guesses in Wordle, ordered according to `reverse` parameter.
+    
+    ------
+    Parameters:
+    ------
+    `words_to_rate`: list
+        list of strings to be rated
+    `word_list`: list
+        list of all possible words (str) of consistent length, to which each word in `words_to_rate` will be compared
+    `normalized`: bool
+        if True, normalizes all ratings on a scale of 0-100, with 100 being the rating for the most optimal word, and 0 for the least optimal word
+    `ascending`: bool
+        if True, returns list ordered ascending. If False, returns list in descending order
+
+    ------
+    Returns:
+    ------
+    `word_ratings`: list
+        list of tuples. Format is [(word, rating)], where rating is calculated according to above formula
+    `sorted_counts`: list of tuples
+        list of tuples. Format is ("letter", frequency). Sorted according to `sort` value; ["descending" or "ascending"] if passed
+    """
+
+    if ascending == True:
+        # sorted_counts = get_letter_counts(english_alphabet, word_list, sort = "ascending")
+        sorted_counts = get_letter_counts(word_list = word_list, letters = english_alphabet, sort = "ascending", unique = True)
+    else:
+        # sorted_counts = get_letter_counts(english_alphabet, word_list, sort = "descending")
+        sorted_counts = get_letter_counts(word_list = word_list, letters = english_alphabet, sort = "descending", unique = True)
 
     all_letters_count = 0
     for letter, freq in sorted_counts:
         all_letters_count += freq
 
-    word_ratings = []
-    for word in best_words:
+    unnormalized_ratings = []
+    for word in words_to_rate:
+        word = word.lower()
         ratings_dict = {}
         for letter in word:
             for freq_letter, freq in sorted_counts:
@@ -151,167 +205,1565 @@ def best_guess_words(word_list: list, show_letters: bool = False):
         total_rating = 0
         for letter, rating in ratings_dict.items():
             total_rating += rating
+
+        unnormalized_ratings.append((word, round(total_rating / all_letters_count * 100, 2)))
+    
+    word_ratings = sorted(unnormalized_ratings, key = operator.itemgetter(1), reverse = True)
+    # # print (word_ratings)
+
+    if normalized == True:
+        if len(word_ratings) > 1:
+            new_tests = []
+
+            for tup in word_ratings:
+                try:
+                    normd = round(((tup[1] - word_ratings[-1][1]) / (word_ratings[0][1] - word_ratings[-1][1])) * 100, 2)
+                    new_tests.append((tup[0], normd))
+                except:
+                    ZeroDivisionError
+                    new_tests.append((tup[0], 0.0))    
+                
+            return new_tests
+        else:
+            return [(word_ratings[0][0], float(100))]
         
-        word_ratings.append((word, round(total_rating / all_letters_count * 100, 2)))
+    elif normalized == False:
+
+        return word_ratings
+    
+### Gets most common words of all words of the dataset
+
+def get_word_distribution(word_list: list, sort: str = "descending"):
+    """
+    Given a passed str of words and a list of words, produces a frequency distribution of all words
+    
+    ------
+    Parameters:
+    ------
+    `word_list`: list
+        list of words (str) from which word frequencies will be counted
+    `sort`: str
+        if either "descending" or "ascending" are passed, returned list of tuples will be sorted accoringly, else returned dictionary will be unsorted
+
+    ------
+    Returns:
+    ------
+    `words_counts_dict`: dict
+        dictionary of {word : count} pairs for each word in passed `word_list`
+    `sorted_counts_dicts`: list of tuples
+        list of tuples. Format is ("word", frequency). Ordered according to `sort` values
+    """
+
+    words_counts_dict = {}
+
+    for word in word_list: 
+        if word in words_counts_dict:
+            words_counts_dict[word] += 1
+        else:
+            words_counts_dict[word] = 1
+
+    if sort == "ascending":
+        sorted_counts_dict = (sorted(words_counts_dict.items(), key = operator.itemgetter(1), reverse = False))
+        return sorted_counts_dict
+
+    if sort == "descending":
+        sorted_counts_dict = sorted(words_counts_dict.items(), key = operator.itemgetter(1), reverse = True)
+        return sorted_counts_dict
+
+
+### Feedback, candidate fingerprints and the shared state-transition cache
+
+def get_feedback(guess: str, target: str, duplicates: bool = False):
+    """
+    Computes the feedback a guess gets against a target, following the same rules as the constraints built in `wordle_wizard`:
+    a letter in the correct position is "perfect", a letter elsewhere in the target is in an "incorrect position", else it is not in the target.
+
+    ------
+    Parameters:
+    ------
+    `guess`: str
+        guessed word
+    `target`: str
+        target word -- must be the same length as `guess`
+    `duplicates`: bool
+        if True, follows the official Wordle rules for repeated letters instead: a letter is only in an "incorrect position" as many times
+        as the target has it left over after the perfect matches, earliest positions first. Eg: 'eerie' against 'crane' -> 00102 rather than 11102
+
+    ------
+    Returns:
+    ------
+    `pattern`: int
+        feedback encoded in base 3, first letter most significant: 2 = correct position, 1 = incorrect position, 0 = not in target.
+        Eg: 'crane' against 'abode' -> 00102 (base 3) = 11
+    """
+
+    if duplicates == True:
+        leftover = {} # target letters not matched perfectly, available for "incorrect position"
+        for i in range(len(guess)):
+            if guess[i] != target[i]:
+                leftover[target[i]] = leftover.get(target[i], 0) + 1
+
+        pattern = 0
+        for i in range(len(guess)):
+            pattern *= 3
+            if guess[i] == target[i]:
+                pattern += 2
+            elif leftover.get(guess[i], 0) > 0:
+                pattern += 1
+                leftover[guess[i]] -= 1
+
+        return pattern
+
+    pattern = 0
+    for i in range(len(guess)):
+        pattern *= 3
+        if guess[i] == target[i]:
+            pattern += 2
+        elif guess[i] in target:
+            pattern += 1
+
+    return pattern
+
+def encode_words(words):
+    """
+    (words, word length) uint8 array of letter codes (0 for 'a' ... 25 for 'z'), for `get_feedback_matrix`.
+    """
+
+    words = list(words)
+    if len(words) == 0:
+        return np.zeros((0, 0), dtype = np.uint8)
+
+    codes = np.frombuffer("".join(words).encode("ascii"), dtype = np.uint8)
+    if len(codes) != len(words) * len(words[0]):
+        raise ValueError("All words must have the same length.")
+
+    return codes.reshape(len(words), len(words[0])) - ord("a")
+
+def get_feedback_matrix(guesses, targets, duplicates: bool = False, memory_budget: int = 64 * 1024 ** 2):
+    """
+    Computes the feedback of every guess against every target (see `get_feedback`) in NumPy, a block of guesses at a time.
+
+    ------
+    Parameters:
+    ------
+    `guesses`: list or np.ndarray
+        guessed words, or their letter codes (see `encode_words`)
+    `targets`: list or np.ndarray
+        target words, or their letter codes -- same word length as `guesses`
+    `duplicates`: bool
+        if True, follows the official Wordle rules for repeated letters (see `get_feedback`)
+    `memory_budget`: int
+        approximate bytes of working memory per block of guesses; the block size is chosen to fit it
+
+    ------
+    Returns:
+    ------
+    `patterns`: np.ndarray
+        (guesses, targets) array of feedback patterns, identical to `get_feedback(guess, target, duplicates)` for each pair.
+        uint8 for words of up to 5 letters, else uint16 (or uint32 past 10 letters)
+    """
+
+    guess_codes = guesses if isinstance(guesses, np.ndarray) else encode_words(guesses)
+    target_codes = targets if isinstance(targets, np.ndarray) else encode_words(targets)
+    num_guesses, word_length = guess_codes.shape
+    num_targets = len(target_codes)
+
+    dtype = np.uint8 if 3 ** word_length <= 256 else np.uint16 if 3 ** word_length <= 65536 else np.uint32
+    patterns = np.zeros((num_guesses, num_targets), dtype = dtype)
+    if num_guesses == 0 or num_targets == 0:
+        return patterns
+
+    # letters present in each target, as a 26-bit mask
+    target_masks = np.bitwise_or.reduce(np.left_shift(np.uint32(1), target_codes.astype(np.uint32)), axis = 1)
+
+    block_size = max(1, memory_budget // (get_feedback_bytes_per_pair(word_length, duplicates) * num_targets))
+
+    for start in range(0, num_guesses, block_size):
+        block = guess_codes[start:start + block_size]
+        perfect = block[:, None, :] == target_codes[None, :, :] # (block, targets, positions)
+        block_patterns = np.zeros((len(block), num_targets), dtype = np.uint32)
+
+        for i in range(word_length):
+            letter = block[:, i]
+            if duplicates == True:
+                # target copies of the letter left over after perfect matches...
+                leftover = ((target_codes[None, :, :] == letter[:, None, None]) & ~perfect).sum(axis = 2, dtype = np.int16)
+                # ...minus the ones already claimed by earlier, imperfect guesses of the same letter
+                claimed = np.zeros((len(block), num_targets), dtype = np.int16)
+                for k in range(i):
+                    claimed += (block[:, k] == letter)[:, None] & ~perfect[:, :, k]
+                incorrect_position = claimed < leftover
+            else:
+                incorrect_position = (target_masks[None, :] & np.left_shift(np.uint32(1), letter.astype(np.uint32))[:, None]) != 0
+
+            block_patterns *= 3
+            block_patterns += np.where(perfect[:, :, i], 2, incorrect_position).astype(np.uint32)
+
+        patterns[start:start + block_size] = block_patterns
+
+    return patterns
+
+def get_feedback_bytes_per_pair(word_length: int, duplicates: bool = False):
+    """
+    Peak working memory of `get_feedback_matrix` per (guess, target) pair of a block, in bytes, not counting the returned matrix.
+    """
+
+    # the per-position match arrays (bool, one per letter, plus as many again for the leftover counts of `duplicates`), the uint32 patterns,
+    # and at each position: the int64 digits `np.where` returns, their uint32 copy and the uint32 letter mask (or the int16 counts)
+    return word_length * (3 if duplicates == True else 2) + 4 + 8 + 4 + 4
+
+def get_words_fingerprint(words):
+    """
+    Compact fingerprint (16 bytes) of a sequence of words. Two sequences with the same words in the same order have the same fingerprint.
+
+    Candidate sets are always kept in word list order, so this also identifies a candidate set for a given word list.
+    A `Lexicon` keeps its fingerprint up to date as words are added, so it isn't recomputed.
+    """
+
+    if isinstance(words, Lexicon):
+        return words.fingerprint()
+
+    return hashlib.blake2b("\n".join(words).encode("utf-8"), digest_size = 16).digest()
+
+# word list fingerprint -> per-word data that only depends on the word list (see `get_lexicon_table`)
+lexicon_cache = LRUCache(max_entries = 8, max_bytes = 64 * 1024 ** 2)
+
+def get_tie_break_ranks(word_list: list):
+    """
+    Ranks of the 10 most frequent first letters and of the 10 most frequent last letters of `word_list`, used to break ties between
+    equally rated guesses. Returns ({letter : rank}, {letter : rank}), rank 0 being the most frequent.
+    """
+
+    # only using top ten most frequent prefixes suffixes to bias. After that it the impact is especially negligible
+    test_starts = get_gram_freq(word_list = word_list, letters_length = 1, position = "start", search = None)[:10]
+    test_ends = get_gram_freq(word_list = word_list, letters_length = 1, position = "end", search = None)[:10]
+
+    start_ranks = {gram : rank for rank, (gram, count) in enumerate(test_starts)}
+    end_ranks = {gram : rank for rank, (gram, count) in enumerate(test_ends)}
+
+    return start_ranks, end_ranks
+
+def get_lexicon_table(word_list: list, lexicon_key: bytes = None):
+    """
+    Per-word data that only depends on the word list, computed once per word list and cached in `lexicon_cache` -- or, for a
+    `SessionLexicon` with extra words, derived from its shared lexicon's table and kept with the session (see `get_overlay_table`).
+
+    ------
+    Returns:
+    ------
+    `table`: dict
+        "word_index": {word : position in `word_list`}
+        "ratings": array of each word's rating, as `get_word_rating(word_list, word_list, normalized = False)` rates it
+        "start_rank", "end_rank": arrays of each word's tie-break key -- the ranks of its first and last letters (see `get_tie_break_ranks`).
+        Words without both a frequent first and a frequent last letter get (10, 10), after every word that has both
+        "codes": letter codes of every word (see `encode_words`), or None if some words aren't made of the same number of letters a-z
+    """
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    table = lexicon_cache.get(lexicon_key)
+    if table is not None:
+        return table
+
+    #### A session's words on top of a shared lexicon: kept with the session, not in `lexicon_cache`, so sessions never evict the shared
+    #### tables, and derived from the shared table when possible (see `get_overlay_table`)
+    session = isinstance(word_list, Lexicon) and word_list.base is not word_list
+    if session == True:
+        if lexicon_key == word_list.base.fingerprint(): # no extra words
+            return get_lexicon_table(word_list.base, lexicon_key)
+        table = word_list.derived.get(lexicon_key)
+        if table is None:
+            table = get_overlay_table(word_list, lexicon_key)
+        if table is not None:
+            word_list.derived.clear()
+            word_list.derived[lexicon_key] = table
+            return table
+
+    ratings = dict(get_word_rating(words_to_rate = word_list, word_list = word_list, normalized = False))
+    start_ranks, end_ranks = get_tie_break_ranks(word_list)
+    no_rank = max(len(start_ranks), len(end_ranks))
+
+    table = {
+        "word_index": word_list.word_index if isinstance(word_list, Lexicon) else {word : i for i, word in enumerate(word_list)},
+        "ratings": np.array([ratings[word] for word in word_list], dtype = np.float64),
+        "start_rank": np.full(len(word_list), no_rank, dtype = np.int16),
+        "end_rank": np.full(len(word_list), no_rank, dtype = np.int16),
+    }
+    for i, word in enumerate(word_list):
+        if word[:1] in start_ranks and word[-1:] in end_ranks:
+            table["start_rank"][i] = start_ranks[word[:1]]
+            table["end_rank"][i] = end_ranks[word[-1:]]
+
+    try:
+        table["codes"] = encode_words(word_list)
+        if table["codes"].size > 0 and table["codes"].max() >= 26:
+            table["codes"] = None
+    except (ValueError, UnicodeEncodeError):
+        table["codes"] = None
+
+    if session == True:
+        word_list.derived.clear()
+        word_list.derived[lexicon_key] = table
+    else:
+        lexicon_cache.put(lexicon_key, table, size = sys.getsizeof(table["word_index"]) + 100 * len(word_list))
+
+    return table
+
+def get_letter_stats(codes: np.ndarray, unique_ids: np.ndarray):
+    """
+    Letter counts behind the ratings and tie-break ranks of a word list, from its letter codes (see `encode_words`): "letter_counts", the
+    number of distinct words (rows `unique_ids`) containing each letter, as `get_letter_counts` counts them; "start_counts" and
+    "end_counts", how many words start and end with each letter; and "start_first" and "end_first", the first row doing so (for ties).
+    Each is an array over the 26 letters.
+    """
+
+    stats = {"letter_counts": np.zeros(26, dtype = np.int64)}
+    for position in range(codes.shape[1]): # each letter of a word counts once
+        first_time = np.ones(len(unique_ids), dtype = bool)
+        for earlier in range(position):
+            first_time &= codes[unique_ids, earlier] != codes[unique_ids, position]
+        stats["letter_counts"] += np.bincount(codes[unique_ids, position][first_time], minlength = 26)
+
+    for name, letters in (("start", codes[:, 0]), ("end", codes[:, -1])):
+        stats[f"{name}_counts"] = np.bincount(letters, minlength = 26).astype(np.int64)
+        stats[f"{name}_first"] = np.full(26, len(codes), dtype = np.int64)
+        np.minimum.at(stats[f"{name}_first"], letters, np.arange(len(codes)))
+
+    return stats
+
+def get_overlay_table(word_list: list, lexicon_key: bytes = None):
+    """
+    The table of `get_lexicon_table` for a `SessionLexicon`, derived from its shared lexicon's table: the extra words' rows are appended
+    and the ratings and tie-break ranks, which depend on every word's letters, are recomputed from letter counts (see `get_letter_stats`)
+    rather than by rating every word again. Returns None if some words can't be encoded, for `get_lexicon_table` to build it in full.
+    """
+
+    base_table = get_lexicon_table(word_list.base)
+    if base_table["codes"] is None:
+        return None
+    try:
+        extra_codes = encode_words(word_list.extra_words)
+    except (ValueError, UnicodeEncodeError):
+        return None
+    if extra_codes.shape[1] != base_table["codes"].shape[1] or extra_codes.min() < 0 or extra_codes.max() >= 26:
+        return None
+
+    if "letter_stats" not in base_table: # shared by every session on this lexicon
+        base_table["letter_stats"] = get_letter_stats(np.asarray(base_table["codes"]), np.unique(np.fromiter(word_list.base.word_index.values(), dtype = np.int64)))
+    base_stats = base_table["letter_stats"]
+
+    codes = np.concatenate((base_table["codes"], extra_codes))
+    num_base = len(base_table["codes"])
+    extra_stats = get_letter_stats(extra_codes, np.arange(len(extra_codes))) # extra words are never in the shared lexicon
+    stats = {name : base_stats[name] + extra_stats[name] for name in ("letter_counts", "start_counts", "end_counts")}
+    for name in ("start_first", "end_first"):
+        stats[name] = np.where(base_stats[name] < num_base, base_stats[name], num_base + extra_stats[name])
+
+    #### Ratings: the letter counts of each word's distinct letters, over every letter counted, like `get_word_rating`
+    sums = np.zeros(len(codes), dtype = np.int64)
+    for position in range(codes.shape[1]):
+        first_time = np.ones(len(codes), dtype = bool)
+        for earlier in range(position):
+            first_time &= codes[:, earlier] != codes[:, position]
+        sums += np.where(first_time, stats["letter_counts"][codes[:, position]], 0)
+    all_letters_count = int(stats["letter_counts"].sum())
+    ratings = np.array([round(total_rating / all_letters_count * 100, 2) for total_rating in sums.tolist()], dtype = np.float64)
+
+    #### Tie-break ranks: the 10 most frequent first and last letters, most frequent first and earliest first among equals, like `get_tie_break_ranks`
+    ranks = {}
+    for name in ("start", "end"):
+        letters = np.flatnonzero(stats[f"{name}_counts"])
+        letters = letters[np.lexsort((stats[f"{name}_first"][letters], -stats[f"{name}_counts"][letters]))][:10]
+        ranks[name] = np.full(26, -1, dtype = np.int16)
+        ranks[name][letters] = np.arange(len(letters))
+    no_rank = max(int((ranks["start"] >= 0).sum()), int((ranks["end"] >= 0).sum()))
+
+    start_rank, end_rank = ranks["start"][codes[:, 0]], ranks["end"][codes[:, -1]]
+    ranked = (start_rank >= 0) & (end_rank >= 0)
+
+    return {
+        "word_index": word_list.word_index,
+        "ratings": ratings,
+        "start_rank": np.where(ranked, start_rank, no_rank).astype(np.int16),
+        "end_rank": np.where(ranked, end_rank, no_rank).astype(np.int16),
+        "codes": codes,
+    }
+
+def get_top_word_ratings(candidate_ids: np.ndarray, word_list: list, k: int = None, lexicon_key: bytes = None):
+    """
+    Rates the candidates and returns the best guess and the top `k` ratings, without sorting every candidate.
+
+    The best guess is the highest rated word, with ties broken in favour of words whose first and last letters are both among the most
+    frequent ones of `word_list` (lowest first-letter rank, then lowest last-letter rank, see `get_tie_break_ranks`), then word list order --
+    one lexicographic sort of the precomputed keys of the highest rated words. The top `k` are selected with `np.argpartition`,
+    so the cost is O(n) rather than O(n log n).
+
+    ------
+    Parameters:
+    ------
+    `candidate_ids`: np.ndarray
+        positions in `word_list` of the remaining possible words, ascending
+    `word_list`: list
+        list of all valid words, used for the letter frequencies behind the ratings
+    `k`: int
+        number of ratings returned. Defaults to `shown_ratings`
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+
+    ------
+    Returns:
+    ------
+    `next_guess`: str
+        chosen next guess, or None if there are no candidates
+    `word_ratings`: list
+        list of tuples. Format is [(word, rating)] for the top `k` candidates, in the same order as `get_word_rating` sorts them
+    """
+
+    if len(candidate_ids) == 0:
+        return None, []
+    if k is None:
+        k = shown_ratings
+
+    table = get_lexicon_table(word_list, lexicon_key)
+    ids = np.asarray(candidate_ids, dtype = np.int64)
+    ratings = table["ratings"][ids]
+
+    #### Tie-break among the highest rated words
+    best = np.flatnonzero(ratings == ratings.max())
+    best = best[np.lexsort((best, table["end_rank"][ids[best]], table["start_rank"][ids[best]]))]
+    next_guess = word_list[ids[best[0]]]
+
+    #### Top k, highest rating first and word list order among equal ratings (like the stable sort of `get_word_rating`)
+    if len(ratings) > k:
+        threshold = np.partition(ratings, len(ratings) - k)[len(ratings) - k] # k-th highest rating
+        above = np.flatnonzero(ratings > threshold)
+        top = np.concatenate((above, np.flatnonzero(ratings == threshold)[:k - len(above)]))
+    else:
+        top = np.arange(len(ratings))
+    top = top[np.lexsort((top, -ratings[top]))]
+
+    word_ratings = [(word_list[ids[i]], float(ratings[i])) for i in top] # words are only looked up for what is shown
+
+    return next_guess, word_ratings
+
+def choose_next_guess(candidate_ids: np.ndarray, word_list: list, phase_timings: list = None, guess_num: int = None, k: int = None, lexicon_key: bytes = None):
+    """
+    Picks the most statistically optimal next guess among the remaining candidates, like `wordle_wizard` does:
+    the highest rated word (see `get_word_rating`), with ties broken in favour of the most frequent first and last letters of `word_list`.
+
+    ------
+    Parameters:
+    ------
+    `candidate_ids`: np.ndarray
+        positions in `word_list` of the remaining possible words, ascending (see `bitset_to_ids`)
+    `word_list`: list
+        list of all valid words, used for the letter frequencies behind the ratings
+    `phase_timings`: list
+        if passed, a "rating" phase record is appended to it (see `record_phase`)
+    `guess_num`: int
+        number of the guess being processed, for the phase records
+    `k`: int
+        number of ratings returned. Defaults to `shown_ratings`
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+
+    ------
+    Returns:
+    ------
+    `next_guess`: str
+        chosen next guess, or None if there are no candidates
+    `word_ratings`: list
+        list of tuples. Format is [(word, rating)] for the top `k` candidates, best first
+    """
+
+    if len(candidate_ids) == 0:
+        return None, []
+    if len(candidate_ids) == 1:
+        return word_list[candidate_ids[0]], [(word_list[candidate_ids[0]], float(100))]
+
+    if phase_timings is not None:
+        phase_start = time.perf_counter()
+
+    next_guess, word_ratings = get_top_word_ratings(candidate_ids, word_list, k = k, lexicon_key = lexicon_key)
+
+    if phase_timings is not None: # one lookup pass over the candidates (ratings and tie-break keys are precomputed per word list)
+        phase_start = record_phase(phase_timings, guess_num, "rating", phase_start, words_scanned = len(candidate_ids), candidates = len(word_ratings))
+
+    #### Few candidates left: the exact endgame guess, where the rated one is worse
+    if 2 < len(candidate_ids) <= endgame_threshold:
+        next_guess = choose_endgame_guess(candidate_ids, word_list, next_guess, lexicon_key = lexicon_key)
+
+        if phase_timings is not None:
+            record_phase(phase_timings, guess_num, "endgame", phase_start, words_scanned = len(word_list), candidates = len(candidate_ids))
+
+    return next_guess, word_ratings
+
+### Exact endgame
+
+# with this many candidates or fewer (but more than 2), `choose_next_guess` searches every guess exhaustively (see `choose_endgame_guess`). 0 turns it off
+endgame_threshold = 20
+
+# (word list fingerprint, candidate bitset) -> (fewest total guesses, guess position), shared by every session
+endgame_cache = LRUCache(max_entries = 100_000, max_bytes = 16 * 1024 ** 2)
+
+def _endgame_groups(guess_id: int, ids: np.ndarray, codes: np.ndarray):
+    # candidates left by each feedback of the guess, except the guess itself
+    patterns = get_feedback_matrix(codes[[guess_id]], codes[ids])[0]
+    solved = 3 ** codes.shape[1] - 1
+
+    return [ids[patterns == pattern] for pattern in np.unique(patterns) if pattern != solved]
+
+def _endgame_guess_total(guess_id: int, ids: np.ndarray, codes: np.ndarray, lexicon_key: bytes, bound: float = float("inf")):
+    """
+    Total guesses (summed over the candidates `ids`) of playing `guess_id` then the best guesses: exact if below `bound`, else at least `bound`.
+    """
+
+    groups = _endgame_groups(guess_id, ids, codes)
+    if any(len(group) == len(ids) for group in groups): # tells nothing apart
+        return float("inf")
+
+    # every group takes at least one guess per candidate and one more for all but one -- exactly that for groups of 1 or 2
+    total = len(ids) + sum(2 * len(group) - 1 for group in groups)
+    for group in sorted(groups, key = len, reverse = True):
+        if total >= bound or len(group) <= 2:
+            break
+        total += solve_endgame(group, codes, lexicon_key, bound = bound - total + 2 * len(group) - 1)[0] - (2 * len(group) - 1)
+
+    return total
+
+def solve_endgame(ids: np.ndarray, codes: np.ndarray, lexicon_key: bytes, bound: float = float("inf")):
+    """
+    Fewest total guesses (summed over the candidates `ids`, each counted until it's guessed) over every possible sequence of guesses,
+    with any word of the word list as a guess, and the guess that achieves it. Branch-and-bound, memoized in the shared `endgame_cache`.
+
+    ------
+    Parameters:
+    ------
+    `ids`: np.ndarray
+        positions in the word list of the remaining possible words
+    `codes`: np.ndarray
+        letter codes of the word list (see `encode_words`)
+    `lexicon_key`: bytes
+        fingerprint of the word list
+    `bound`: float
+        the search stops once it's clear the total isn't below `bound`
+
+    ------
+    Returns:
+    ------
+    `total`: float
+        fewest total guesses if below `bound`, else a lower bound that's at least `bound`
+    `guess_id`: int
+        position of the best guess, or None if the total isn't below `bound`
+    """
+
+    if len(ids) <= 2:
+        return (2 * len(ids) - 1, int(ids[0])) if 2 * len(ids) - 1 < bound else (2 * len(ids) - 1, None)
+
+    cache_key = (lexicon_key, ids_to_bitset(ids))
+    known = endgame_cache.get(cache_key)
+    if known is not None:
+        return known if known[0] < bound else (known[0], None)
+
+    #### Lower bound of every guess at once (exact when no group has more than 2 candidates), most promising first
+    patterns = np.sort(get_feedback_matrix(codes, codes[ids]).astype(np.int64), axis = 1)
+    starts = np.ones(patterns.shape, dtype = bool)
+    starts[:, 1:] = patterns[:, 1:] != patterns[:, :-1]
+    num_groups = starts.sum(axis = 1)
+    is_candidate = patterns[:, -1] == 3 ** codes.shape[1] - 1 # all-perfect sorts last
+    # each group of candidates other than the guess: 2 * size - 1 guesses at least
+    lower_bounds = len(ids) + 2 * (len(ids) - is_candidate) - (num_groups - is_candidate)
+    lower_bounds = np.where((num_groups == 1) & ~is_candidate, np.inf, lower_bounds) # tells nothing apart
+    order = np.lexsort((~is_candidate, lower_bounds))
+
+    best, best_id = bound, None
+    for guess_id in order:
+        if lower_bounds[guess_id] >= best:
+            break
+        total = _endgame_guess_total(int(guess_id), ids, codes, lexicon_key, bound = best)
+        if total < best:
+            best, best_id = total, int(guess_id)
+
+    if best_id is not None:
+        endgame_cache.put(cache_key, (best, best_id), size = 128)
+
+    return best, best_id
+
+def choose_endgame_guess(candidate_ids: np.ndarray, word_list: list, rating_guess: str = None, lexicon_key: bytes = None):
+    """
+    Exact endgame: the guess that solves the candidates in the fewest guesses on average (see `solve_endgame`). `rating_guess`,
+    if passed, is kept whenever it's just as good, so the solver only deviates from the rating where the rating loses guesses.
+    """
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    table = get_lexicon_table(word_list, lexicon_key)
+    ids = np.asarray(candidate_ids, dtype = np.int64)
+    if table["codes"] is None or len(ids) <= 2: # words the batch kernel can't encode
+        return rating_guess if rating_guess is not None else word_list[ids[0]]
+
+    best, best_id = solve_endgame(ids, table["codes"], lexicon_key)
+    if rating_guess is not None and _endgame_guess_total(table["word_index"][rating_guess], ids, table["codes"], lexicon_key, bound = best + 0.5) <= best:
+        return rating_guess
+
+    return word_list[best_id]
+
+### Deadline-bounded ("anytime") guess search
+
+# strategies `choose_next_guess_anytime` can use. "rating" is `choose_next_guess` itself
+anytime_strategies = ("rating", "entropy")
+
+def get_partition_entropies(guess_codes: np.ndarray, candidate_codes: np.ndarray):
+    """
+    Entropy (bits) of the feedback partition each guess splits the candidates into (see `get_feedback_matrix`) -- the information
+    the guess is expected to give. Higher is better. Both arguments are letter codes (see `encode_words`).
+    """
+
+    patterns = get_feedback_matrix(guess_codes, candidate_codes).astype(np.int64)
+    num_patterns = 3 ** guess_codes.shape[1]
+
+    # one bincount for the whole block: row r's patterns are shifted to their own range of bins
+    counts = np.bincount((patterns + num_patterns * np.arange(len(patterns))[:, None]).ravel(), minlength = num_patterns * len(patterns))
+    probabilities = counts.reshape(len(patterns), num_patterns) / patterns.shape[1]
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        return -np.where(probabilities > 0, probabilities * np.log2(probabilities), 0.0).sum(axis = 1)
+
+def choose_next_guess_anytime(candidate_ids: np.ndarray, word_list: list, deadline_ms: float, strategy: str = "entropy",
+                              guess_pool: str = "candidates", batch_size: int = 64, lexicon_key: bytes = None):
+    """
+    Picks the next guess within a time budget. The cheap rating pick (see `choose_next_guess`) is made first, so there is always an answer;
+    then the guesses of the pool are scored with `strategy`, a block at a time in priority order (remaining candidates first, best rated first),
+    until they're all scored or the deadline passes. The best guess found so far is returned either way.
+
+    ------
+    Parameters:
+    ------
+    `candidate_ids`: np.ndarray
+        positions in `word_list` of the remaining possible words, ascending (see `bitset_to_ids`)
+    `word_list`: list
+        list of all valid words
+    `deadline_ms`: float
+        time budget in milliseconds, from the call
+    `strategy`: str
+        one of `anytime_strategies`. "entropy" maximizes the information of the guess's feedback (see `get_partition_entropies`)
+    `guess_pool`: str
+        "candidates" to only consider the remaining possible words, or "all" to also consider every other word of `word_list` (after them)
+    `batch_size`: int
+        most guesses scored between deadline checks. Fewer for large candidate sets, so a block takes a few ms at most
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+
+    ------
+    Returns:
+    ------
+    `result`: dict
+        "next_guess", the shown "word_ratings" (as `choose_next_guess` returns them), the "strategy" that picked the guess ("rating" if
+        no scored guess was found in time), its "score", whether the search "finished", and how many of "pool_size" guesses were "evaluated"
+    """
+
+    deadline = time.perf_counter() + deadline_ms / 1000
+
+    if strategy not in anytime_strategies:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from {anytime_strategies}.")
+    if guess_pool not in ("candidates", "all"):
+        raise ValueError(f"Unknown guess pool '{guess_pool}'. Use 'candidates' or 'all'.")
+
+    next_guess, word_ratings = choose_next_guess(candidate_ids, word_list, lexicon_key = lexicon_key)
+    result = {"next_guess": next_guess, "word_ratings": word_ratings, "strategy": "rating", "score": None, "finished": True, "evaluated": 0, "pool_size": 0}
+    if strategy == "rating" or len(candidate_ids) <= 2: # with 2 candidates or fewer, guessing one of them is always best
+        return result
+
+    table = get_lexicon_table(word_list, lexicon_key)
+    if table["codes"] is None: # words the batch kernel can't encode -- the search can't run
+        result["finished"] = False
+        return result
+
+    #### Priority order: the candidates (one of them might be the answer), then the other words, each best rated first
+    ids = np.asarray(candidate_ids, dtype = np.int64)
+    order = ids[np.argsort(-table["ratings"][ids], kind = "stable")]
+    if guess_pool == "all":
+        others = np.setdiff1d(np.arange(len(word_list)), ids, assume_unique = True)
+        order = np.concatenate((order, others[np.argsort(-table["ratings"][others], kind = "stable")]))
+    result["pool_size"] = len(order)
+
+    candidate_codes = table["codes"][ids]
+    batch_size = max(1, min(batch_size, 65536 // len(ids))) # ~65k (guess, candidate) pairs per block
+    best_score, best_id = None, None
+    for block_start in range(0, len(order), batch_size):
+        if time.perf_counter() >= deadline:
+            result["finished"] = False
+            break
+
+        block = order[block_start:block_start + batch_size]
+        scores = get_partition_entropies(table["codes"][block], candidate_codes)
+        i = int(np.argmax(scores)) # first of the block's best, i.e. the highest priority
+        if best_score is None or scores[i] > best_score + 1e-12: # ties keep the earlier (higher priority) guess
+            best_score, best_id = float(scores[i]), int(block[i])
+        result["evaluated"] += len(block)
+
+    if best_id is not None:
+        result.update({"next_guess": word_list[best_id], "strategy": strategy, "score": round(best_score, 6)})
+
+    return result
+
+### Approximate (sampled) entropy scoring
+
+def sample_candidates(candidate_ids: np.ndarray, word_list: list, sample_size: int, seed: int = 0, lexicon_key: bytes = None):
+    """
+    Stratified random sample of the candidates, with strata by first letter and sizes proportional to the strata (at least one word
+    from each). The same seed always gives the same sample.
+
+    ------
+    Returns:
+    ------
+    `sample`: np.ndarray
+        positions in `word_list` of the sampled candidates
+    `weights`: np.ndarray
+        number of candidates each sampled word stands for (stratum size / stratum sample size)
+    `strata`: np.ndarray
+        stratum of each sampled word
+    """
+
+    ids = np.asarray(candidate_ids, dtype = np.int64)
+    first_letters = get_lexicon_table(word_list, lexicon_key)["codes"][ids, 0]
+    rng = np.random.default_rng(seed)
+
+    sample, weights, strata = [], [], []
+    for letter in np.unique(first_letters):
+        members = ids[first_letters == letter]
+        size = min(len(members), max(1, round(sample_size * len(members) / len(ids))))
+        sample.append(rng.choice(members, size = size, replace = False))
+        weights.append(np.full(size, len(members) / size))
+        strata.append(np.full(size, letter))
+
+    return np.concatenate(sample), np.concatenate(weights), np.concatenate(strata)
+
+def score_guesses_sampled(guess_ids: np.ndarray, candidate_ids: np.ndarray, word_list: list, sample_size: int = 256, seed: int = 0,
+                          confidence: float = 0.95, rescore: bool = True, lexicon_key: bytes = None):
+    """
+    Approximate entropy scoring (see `get_partition_entropies`) for large guess pools: every guess is scored against a stratified sample
+    of the candidates (see `sample_candidates`), with a confidence interval, and only the close contenders -- guesses whose interval reaches
+    the best lower bound -- are re-scored exactly against every candidate.
+
+    ------
+    Parameters:
+    ------
+    `guess_ids`: np.ndarray
+        positions in `word_list` of the guesses to score, in priority order (ties go to the earlier guess)
+    `candidate_ids`: np.ndarray
+        positions in `word_list` of the remaining possible words
+    `word_list`: list
+        list of all valid words
+    `sample_size`: int
+        approximate number of candidates sampled. With no more candidates than this, everything is scored exactly
+    `seed`: int
+        seed of the sample, so results are reproducible
+    `confidence`: float
+        confidence level of the intervals
+    `rescore`: bool
+        if False, the contenders aren't re-scored and the best estimate wins
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+
+    ------
+    Returns:
+    ------
+    `result`: dict
+        "next_guess" and its "score" (exact if re-scored), the "estimate", "lower" and "upper" arrays (one entry per guess), the positions
+        of the "contenders" re-scored exactly, the number of candidates "sampled", and whether every guess was scored "exact"ly
+    """
+
+    table = get_lexicon_table(word_list, lexicon_key)
+    if table["codes"] is None:
+        raise ValueError("The word list has words the batch feedback kernel can't encode (see `encode_words`).")
+    guess_ids = np.asarray(guess_ids, dtype = np.int64)
+    candidate_ids = np.asarray(candidate_ids, dtype = np.int64)
+
+    if len(candidate_ids) <= sample_size:
+        scores = get_partition_entropies(table["codes"][guess_ids], table["codes"][candidate_ids])
+        best = int(np.argmax(scores))
+        return {"next_guess": word_list[guess_ids[best]], "score": float(scores[best]), "estimate": scores, "lower": scores, "upper": scores,
+                "contenders": guess_ids, "sampled": len(candidate_ids), "exact": True}
+
+    sample, weights, strata = sample_candidates(candidate_ids, word_list, sample_size, seed = seed, lexicon_key = lexicon_key)
+    num_candidates = len(candidate_ids)
+    num_patterns = 3 ** table["codes"].shape[1]
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    estimate = np.empty(len(guess_ids))
+    spread = np.empty(len(guess_ids))
+    block_size = max(1, 65536 // len(sample))
+    for start in range(0, len(guess_ids), block_size):
+        block = guess_ids[start:start + block_size]
+        patterns = get_feedback_matrix(table["codes"][block], table["codes"][sample]).astype(np.int64)
+
+        #### Weighted bucket probabilities, then the plug-in entropy with the Miller-Madow bias correction
+        offsets = patterns + num_patterns * np.arange(len(block))[:, None]
+        counts = np.bincount(offsets.ravel(), weights = np.broadcast_to(weights, patterns.shape).ravel(), minlength = num_patterns * len(block))
+        probabilities = counts.reshape(len(block), num_patterns) / num_candidates
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            plug_in = -np.where(probabilities > 0, probabilities * np.log2(probabilities), 0.0).sum(axis = 1)
+        observed_buckets = (probabilities > 0).sum(axis = 1)
+        bias_correction = (observed_buckets - 1) / (2 * len(sample) * np.log(2))
+        estimate[start:start + len(block)] = plug_in + bias_correction
+
+        #### Stratified variance of the mean surprisal (delta method), with the finite population correction
+        surprisal = -np.log2(probabilities.ravel()[offsets]) # (block, sample)
+        variance = np.zeros(len(block))
+        for stratum in np.unique(strata):
+            members = strata == stratum
+            stratum_size = weights[members][0] * members.sum()
+            if members.sum() > 1:
+                variance += (stratum_size / num_candidates) ** 2 * (1 - members.sum() / stratum_size) * surprisal[:, members].var(axis = 1, ddof = 1) / members.sum()
+        # the correction is only first order, so it's counted as uncertainty too
+        spread[start:start + len(block)] = z * np.sqrt(variance) + bias_correction
+
+    lower, upper = estimate - spread, estimate + spread
+
+    #### Exact re-scoring of the close contenders only
+    contenders = np.flatnonzero(upper >= lower.max()) if rescore else np.array([int(np.argmax(estimate))])
+    if rescore:
+        exact = get_partition_entropies(table["codes"][guess_ids[contenders]], table["codes"][candidate_ids])
+        best = int(contenders[np.argmax(exact)])
+        score = float(exact.max())
+    else:
+        best = int(contenders[0])
+        score = float(estimate[best])
+
+    return {"next_guess": word_list[guess_ids[best]], "score": score, "estimate": estimate, "lower": lower, "upper": upper,
+            "contenders": guess_ids[contenders], "sampled": len(sample), "exact": False}
+
+### Word sets as bitsets: bit i is set if the word at position i of the word list is in the set
+
+def bitset_to_ids(bits: int):
+    """
+    Positions of all set bits of `bits` (a Python int used as a bitset), as an ascending array.
+    """
+
+    data = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype = np.uint8)
+
+    return np.flatnonzero(np.unpackbits(data, bitorder = "little"))
+
+def ids_to_bitset(ids):
+    """
+    Bitset (a Python int) with the bits at all positions in `ids` set.
+    """
+
+    ids = np.fromiter(ids, dtype = np.int64) if not isinstance(ids, np.ndarray) else ids
+    if len(ids) == 0:
+        return 0
+
+    flags = np.zeros(int(ids.max()) + 1, dtype = bool)
+    flags[ids] = True
+
+    return int.from_bytes(np.packbits(flags, bitorder = "little").tobytes(), "little")
+
+def all_words_bitset(word_list: list):
+    """
+    Bitset of every word of `word_list` -- the candidates before the first guess.
+    """
+
+    return (1 << len(word_list)) - 1
+
+# (candidate set, guess) -> feedback partition and next guesses, shared by every session in the process.
+# Tune with `transition_cache.resize(max_entries = ..., max_bytes = ...)`, check effectiveness with `transition_cache.stats()`
+transition_cache = LRUCache(max_entries = 50_000, max_bytes = 64 * 1024 ** 2)
+
+# number of ratings kept per next guess -- the most the app ever shows
+shown_ratings = 40
+
+def _transition_size(transition: dict):
+    # approximate bytes held by a transition. Shown words are shared with the word list, so only containers are counted
+    size = sys.getsizeof(transition["buckets"]) + sys.getsizeof(transition["key"][1])
+    for bits, remaining in transition["buckets"].values():
+        size += sys.getsizeof(bits) + 64
+    for next_guess, word_ratings in transition["next_guesses"].values():
+        size += sys.getsizeof(word_ratings) + len(word_ratings) * 88 + 64
+
+    return size
+
+# optional precomputed feedback of one word list (see `use_pattern_index`): {"lexicon_key", "patterns", "positional_index"}
+loaded_pattern_index = None
+
+def use_pattern_index(word_list: list, patterns: np.ndarray = None, positional_index: np.ndarray = None, lexicon_key: bytes = None):
+    """
+    Makes `get_transition` read the feedback of guesses against the words of `word_list` from precomputed (eg memory-mapped) arrays instead
+    of computing it: the rows of `patterns`, a pattern matrix without `duplicates` (see pattern_matrix.py), for guesses in the word list, and
+    `positional_index` for any other guess of the same length (see `get_positional_feedback`). Either can be None. Arrays of another shape
+    are ignored. Pass None for both to stop using them.
+    """
+
+    global loaded_pattern_index
+
+    num_words = len(word_list)
+    if patterns is not None and patterns.shape != (num_words, num_words):
+        patterns = None
+    if positional_index is not None and (positional_index.shape[1] != num_words or positional_index.shape[0] % 26 != 0):
+        positional_index = None
+    if patterns is None and positional_index is None:
+        loaded_pattern_index = None
+        return
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    loaded_pattern_index = {"lexicon_key": lexicon_key, "patterns": patterns, "positional_index": positional_index}
+
+def get_positional_feedback(guess: str, positional_index: np.ndarray, ids: np.ndarray):
+    """
+    Feedback of `guess` against the words `ids` (see `get_feedback`, without `duplicates`), from a positional index: a (positions x 26, words)
+    boolean array whose row `position * 26 + letter` marks the words with that letter at that position.
+    """
+
+    num_positions = positional_index.shape[0] // 26
+    patterns = np.zeros(len(ids), dtype = np.uint32)
+    for position, letter in enumerate(guess):
+        code = ord(letter) - ord("a")
+        here = positional_index[position * 26 + code, ids]
+        anywhere = positional_index[np.arange(num_positions) * 26 + code][:, ids].any(axis = 0)
+        patterns = patterns * 3 + np.where(here, 2, np.where(anywhere, 1, 0)).astype(np.uint32)
+
+    return patterns
+
+def get_transition(candidates: int, guess: str, word_list: list, lexicon_key: bytes = None):
+    """
+    Splits the candidates into buckets by the feedback `guess` would get against each of them (see `get_feedback`), memoized in the shared `transition_cache`.
+
+    ------
+    Parameters:
+    ------
+    `candidates`: int
+        bitset of the remaining possible words before `guess` (see `bitset_to_ids`)
+    `guess`: str
+        word guessed
+    `word_list`: list
+        list of all valid words
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+
+    ------
+    Returns:
+    ------
+    `transition`: dict
+        {"key": cache key, "buckets": {pattern : (bitset, number of words)}, "next_guesses": {pattern : (next_guess, word_ratings)},
+        "settings": the solver settings the next guesses were picked under (see `get_solver_settings`)}.
+        Next guesses are only filled in as buckets are reached (see `get_next_step`)
+    `words_scanned`: int
+        number of candidates visited -- 0 if the partition was already cached
+    """
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    cache_key = (lexicon_key, candidates, guess) # a bitset identifies the candidate set by itself
+    transition = transition_cache.get(cache_key)
+    if transition is not None:
+        return transition, 0
+
+    ids = bitset_to_ids(candidates)
+    table = get_lexicon_table(word_list, lexicon_key)
+    codes = table["codes"]
+    encodable = guess.isascii() and guess.isalpha() and guess.islower()
+    index = loaded_pattern_index if loaded_pattern_index is not None and loaded_pattern_index["lexicon_key"] == lexicon_key else {}
+    if index.get("patterns") is not None and guess in table["word_index"]: # one row of the precomputed matrix
+        patterns = index["patterns"][table["word_index"][guess]][ids]
+    elif index.get("positional_index") is not None and encodable and len(guess) * 26 == index["positional_index"].shape[0]:
+        patterns = get_positional_feedback(guess, index["positional_index"], ids)
+    elif codes is not None and len(guess) == codes.shape[1] and encodable:
+        patterns = get_feedback_matrix([guess], codes[ids])[0]
+    else: # words the batch kernel can't encode
+        patterns = np.fromiter((get_feedback(guess, word_list[i]) for i in ids), dtype = np.int64, count = len(ids))
+
+    transition = {"key": cache_key, "buckets": {}, "next_guesses": {}, "settings": get_solver_settings()}
+    for word_pattern in np.unique(patterns):
+        bucket_ids = ids[patterns == word_pattern]
+        transition["buckets"][int(word_pattern)] = (ids_to_bitset(bucket_ids), len(bucket_ids))
+
+    transition_cache.put(cache_key, transition, size = _transition_size(transition))
+
+    return transition, len(ids)
+
+# optional precomputed second guesses for popular openers -- see `use_second_guess_table` and second_guesses.py
+loaded_second_guess_table = None
+
+def use_second_guess_table(table):
+    """
+    Makes `get_next_step` (and so both solvers) take the second guess after a popular opener from a precomputed table
+    (see `second_guesses.load_second_guess_table`) instead of rating the candidates live. Pass None to stop using it.
+    """
+
+    global loaded_second_guess_table
+    loaded_second_guess_table = table
+
+def get_next_step(candidates: int, guess: str, pattern: int, word_list: list, lexicon_key: bytes = None,
+                  phase_timings: list = None, guess_num: int = None):
+    """
+    Narrows down the candidates after a guess and picks the next guess, reusing work from any session that reached the same state.
+
+    The candidates are split into buckets by the feedback `guess` would get against each of them (see `get_feedback`). The bucket matching
+    `pattern` holds exactly the candidates consistent with everything learned so far. Partitions and next guesses are memoized in the shared
+    `transition_cache`, keyed by (word list fingerprint, candidate bitset, guess). Second guesses come from the second guess table, if one is loaded.
+
+    ------
+    Parameters:
+    ------
+    `candidates`: int
+        bitset of the remaining possible words before `guess` (see `bitset_to_ids`)
+    `guess`: str
+        word just guessed
+    `pattern`: int
+        feedback the guess got against the target (see `get_feedback`)
+    `word_list`: list
+        list of all valid words
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+    `phase_timings`: list
+        if passed, "filtering" and "rating" phase records are appended to it (see `record_phase`)
+    `guess_num`: int
+        number of the guess being processed, for the phase records
+
+    ------
+    Returns:
+    ------
+    `next_candidates`: int
+        bitset of the remaining possible words after `guess`
+    `remaining`: int
+        number of remaining possible words after `guess`
+    `next_guess`: str
+        chosen next guess, or None if no candidates remain
+    `word_ratings`: list
+        list of tuples. Format is [(word, rating)] for the top `shown_ratings` candidates, best first
+    """
+
+    if phase_timings is not None:
+        phase_start = time.perf_counter()
+
+    transition, words_scanned = get_transition(candidates, guess, word_list, lexicon_key)
+    lexicon_key = transition["key"][0]
+
+    next_candidates, remaining = transition["buckets"].get(pattern, (0, 0))
+
+    if phase_timings is not None:
+        record_phase(phase_timings, guess_num, "filtering", phase_start, words_scanned = words_scanned, candidates = remaining)
+
+    settings = get_solver_settings()
+    if transition["settings"] != settings: # next guesses picked under other settings -- the buckets still hold
+        transition["next_guesses"], transition["settings"] = {}, settings
+
+    if pattern not in transition["next_guesses"]:
+        second_guess = None
+        if loaded_second_guess_table is not None and candidates == all_words_bitset(word_list): # all words were candidates, so `guess` is the opener
+            second_guess = loaded_second_guess_table.get_second_guess(lexicon_key.hex(), guess, pattern)
+
+        if second_guess is not None:
+            next_guess, second_remaining, word_ratings = second_guess
+        else:
+            next_guess, word_ratings = choose_next_guess(bitset_to_ids(next_candidates), word_list, phase_timings = phase_timings, guess_num = guess_num,
+                                                         lexicon_key = lexicon_key)
+        transition["next_guesses"][pattern] = (next_guess, word_ratings)
+        transition_cache.put(transition["key"], transition, size = _transition_size(transition))
+
+    next_guess, word_ratings = transition["next_guesses"][pattern]
+
+    return next_candidates, remaining, next_guess, word_ratings
+
+
+### Depth-2 lookahead
+
+# strategies `solve_puzzle` (and so `wordle_wizard`) can play. "rating" is `choose_next_guess`, "lookahead" is `choose_next_guess_lookahead`
+# and "policy" is the loaded policy (see `use_policy`)
+solve_strategies = ("rating", "lookahead", "policy")
+
+# (word list fingerprint, candidate bitset, guess pool) -> expected guesses left, and (..., top_n) -> lookahead pick, shared by every session
+lookahead_cache = LRUCache(max_entries = 200_000, max_bytes = 32 * 1024 ** 2)
+
+# expected guesses to finish from a set of candidates, at the leaves of the lookahead: 1 for a single word, then about this many more
+# per doubling of the candidates (roughly what the solver needs on the official list)
+LEAF_GUESSES_PER_DOUBLING = 0.56
+
+def _leaf_guesses(sizes: np.ndarray):
+    sizes = np.asarray(sizes, dtype = float)
+    with np.errstate(divide = "ignore"):
+        return np.where(sizes > 0, 1 + LEAF_GUESSES_PER_DOUBLING * np.log2(sizes), 0.0)
+
+def get_one_step_costs(pool_ids: np.ndarray, bucket_ids: np.ndarray, codes: np.ndarray):
+    """
+    Expected number of guesses to finish, for each guess of `pool_ids` played on the candidates `bucket_ids`: the guess itself, plus
+    the leaf estimate (see `_leaf_guesses`) of each group of candidates its feedback leaves -- except the candidate it guesses outright.
+    """
+
+    patterns = np.sort(get_feedback_matrix(codes[pool_ids], codes[bucket_ids]).astype(np.int64), axis = 1)
+
+    #### Group sizes per row, from the runs of equal patterns in each sorted row
+    starts = np.ones(patterns.shape, dtype = bool)
+    starts[:, 1:] = patterns[:, 1:] != patterns[:, :-1]
+    flat_starts = np.flatnonzero(starts.ravel())
+    sizes = np.diff(np.append(flat_starts, patterns.size))
+    totals = np.bincount(flat_starts // patterns.shape[1], weights = sizes * _leaf_guesses(sizes), minlength = len(pool_ids))
+
+    solved_outright = np.isin(pool_ids, bucket_ids)
+
+    return 1 + (totals - solved_outright) / len(bucket_ids)
+
+def _guesses_left(bucket_ids: np.ndarray, pool_ids: np.ndarray, codes: np.ndarray, guess_pool: str, lexicon_key: bytes):
+    """
+    Expected number of guesses to finish from the candidates `bucket_ids` with the best next guess (see `get_one_step_costs`), memoized.
+    """
+
+    if len(bucket_ids) <= 2: # guess one, then the other
+        return (2 * len(bucket_ids) - 1) / len(bucket_ids)
+
+    cache_key = (lexicon_key, ids_to_bitset(bucket_ids), guess_pool)
+    guesses_left = lookahead_cache.get(cache_key)
+    if guesses_left is None:
+        guesses_left = float(get_one_step_costs(pool_ids if guess_pool == "all" else bucket_ids, bucket_ids, codes).min())
+        lookahead_cache.put(cache_key, guesses_left, size = 64)
+
+    return guesses_left
+
+def choose_next_guess_lookahead(candidate_ids: np.ndarray, word_list: list, top_n: int = 10, guess_pool: str = "all", lexicon_key: bytes = None):
+    """
+    Picks the next guess looking two guesses ahead, where `choose_next_guess` only rates the candidates themselves.
+
+    Every guess of the pool is first scored one step ahead (see `get_one_step_costs`). The `top_n` best are then scored two steps ahead:
+    for each group of candidates a guess's feedback can leave, the best follow-up guess is found and scored one step ahead in turn, and
+    the guess with the lowest expected number of guesses wins. Groups are scored largest first, and a guess is dropped as soon as a lower
+    bound of its score (the groups left counted at their fewest possible guesses) can't beat the best so far. Group scores and picks are
+    memoized in the shared `lookahead_cache`.
+
+    ------
+    Parameters:
+    ------
+    `candidate_ids`: np.ndarray
+        positions in `word_list` of the remaining possible words, ascending (see `bitset_to_ids`)
+    `word_list`: list
+        list of all valid words
+    `top_n`: int
+        number of guesses scored two steps ahead
+    `guess_pool`: str
+        "all" to consider every word of `word_list` as a guess, or "candidates" to only consider the remaining possible words
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+
+    ------
+    Returns:
+    ------
+    `result`: dict
+        "next_guess", its "expected_guesses" (to finish, including itself), and how many guesses were scored two steps ahead ("evaluated")
+        and dropped early ("pruned")
+    """
+
+    if guess_pool not in ("candidates", "all"):
+        raise ValueError(f"Unknown guess pool '{guess_pool}'. Use 'candidates' or 'all'.")
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    ids = np.asarray(candidate_ids, dtype = np.int64)
+    if len(ids) <= 2: # guessing one of them is always best
+        next_guess, word_ratings = choose_next_guess(ids, word_list, lexicon_key = lexicon_key)
+        return {"next_guess": next_guess, "expected_guesses": (2 * len(ids) - 1) / max(len(ids), 1), "evaluated": 0, "pruned": 0}
+
+    cache_key = (lexicon_key, ids_to_bitset(ids), guess_pool, top_n)
+    result = lookahead_cache.get(cache_key)
+    if result is not None:
+        return dict(result)
+
+    table = get_lexicon_table(word_list, lexicon_key)
+    if table["codes"] is None:
+        raise ValueError("The word list has words the batch feedback kernel can't encode (see `encode_words`).")
+    codes = table["codes"]
+    pool_ids = np.arange(len(word_list)) if guess_pool == "all" else ids
+
+    #### First ply: a shortlist by one-step score, candidates first among equal scores
+    one_step = get_one_step_costs(pool_ids, ids, codes)
+    shortlist = pool_ids[np.lexsort((~np.isin(pool_ids, ids), one_step))[:top_n]]
+
+    #### Second ply, with pruning
+    best_score, best_id = None, None
+    result = {"evaluated": 0, "pruned": 0}
+    for guess_id in shortlist:
+        patterns = get_feedback_matrix(codes[[guess_id]], codes[ids])[0]
+        groups = [ids[patterns == pattern] for pattern in np.unique(patterns)]
+        groups = [group for group in groups if not (len(group) == 1 and group[0] == guess_id)] # solved by the guess itself
+        groups.sort(key = len, reverse = True)
+
+        # fewest guesses each group could take: one of its words guessed first, every other one second
+        bound = 1 + sum(2 * len(group) - 1 for group in groups) / len(ids)
+        score = 1.0
+        for group in groups:
+            if best_score is not None and bound >= best_score:
+                break
+            guesses_left = _guesses_left(group, pool_ids, codes, guess_pool, lexicon_key)
+            score += len(group) / len(ids) * guesses_left
+            bound += (len(group) * guesses_left - (2 * len(group) - 1)) / len(ids)
+        else:
+            result["evaluated"] += 1
+            if best_score is None or score < best_score - 1e-12: # ties keep the earlier guess of the shortlist
+                best_score, best_id = score, int(guess_id)
+            continue
+        result["pruned"] += 1
+
+    result.update({"next_guess": word_list[best_id], "expected_guesses": round(best_score, 6)})
+    lookahead_cache.put(cache_key, result, size = 256)
+
+    return dict(result)
+
+# optional precomputed optimal policy -- see `use_policy` and policy.py
+loaded_policy = None
+
+def use_policy(policy):
+    """
+    Makes the "policy" strategy play a policy solved offline (see `policy.load_policy`). Pass None to stop using it.
+    """
+
+    global loaded_policy
+    loaded_policy = policy
+
+def get_solver_settings(second_guesses: bool = True):
+    """
+    Tag of the settings that change which guesses the solver picks, but not which words remain possible: `endgame_threshold` and the
+    loaded second guess table and policy (see `use_second_guess_table` and `use_policy`). Cached guesses and solutions are keyed by it,
+    so changing any of these settings never serves guesses picked under the old ones.
+
+    With `second_guesses` == False, the loaded second guess table is left out: the settings second guesses rated live depend on
+    (see `second_guesses.get_second_guesses`).
+    """
+
+    second_guess_version = loaded_second_guess_table.version if loaded_second_guess_table is not None and second_guesses == True else "none"
+    policy_version = loaded_policy.version if loaded_policy is not None else "none"
+
+    return f"e{endgame_threshold}-s{second_guess_version}-p{policy_version}"
+
+def get_strategy_guess(candidates: int, rating_guess: str, word_list: list, strategy: str = "rating", lexicon_key: bytes = None):
+    """
+    Next guess `strategy` (one of `solve_strategies`) plays on the `candidates` bitset. `rating_guess` is the "rating" strategy's pick (see `get_next_step`).
+    The "policy" strategy plays `rating_guess` wherever the loaded policy doesn't reach (or if none is loaded).
+    """
+
+    if strategy not in solve_strategies:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from {solve_strategies}.")
+    if strategy == "rating" or rating_guess is None:
+        return rating_guess
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+    if strategy == "policy":
+        policy_guess = loaded_policy.get_guess(lexicon_key.hex(), candidates) if loaded_policy is not None else None
+        return policy_guess or rating_guess
+
+    return choose_next_guess_lookahead(bitset_to_ids(candidates), word_list, lexicon_key = lexicon_key)["next_guess"]
+
+
+### Constraints for incremental (per-session) solving
+
+def new_constraints():
+    """
+    Empty accumulated constraints, in the format updated by `update_constraints`.
+    """
+
+    return {"perfect": {}, "wrong_pos": {}, "incorrect_positions": [], "dont_guess_again": []}
+
+def update_constraints(constraints: dict, guess: str, target: str):
+    """
+    Adds what `guess` tells about `target` to the accumulated constraints (updated in place), the same way `wordle_wizard` builds them.
+
+    ------
+    Parameters:
+    ------
+    `constraints`: dict
+        accumulated constraints from earlier guesses (see `new_constraints`)
+    `guess`: str
+        guessed word
+    `target`: str
+        target word -- must be the same length as `guess`
+
+    ------
+    Returns:
+    ------
+    `perfect_letters`: list
+        list of tuples of all letters in correct positions so far. Eg: [('e', 2), ('a', 3)]
+    `incorrect_positions`: list
+        list of tuples of all letters known to be in incorrect positions so far, ordered by position
+    `dont_guess_again`: list
+        sorted list of all letters known not to be in the target
+    """
+
+    perfect_dict = constraints["perfect"]
+    wrong_pos_dict = constraints["wrong_pos"]
+
+    for i in range(len(guess)):
+        if guess[i] not in perfect_dict:
+            perfect_dict[guess[i]] = []
+        if guess[i] not in wrong_pos_dict:
+            wrong_pos_dict[guess[i]] = []
+
+        ### EVALUATE CURRENT GUESS
+        if guess[i] == target[i] and i not in perfect_dict[guess[i]]: # letter == correct and position == correct
+            perfect_dict[guess[i]] = sorted(perfect_dict[guess[i]] + [i])
+
+        if (guess[i] != target[i] and guess[i] in target) and i not in wrong_pos_dict[guess[i]]: # letter == correct and position != correct
+            wrong_pos_dict[guess[i]] = sorted(wrong_pos_dict[guess[i]] + [i])
+
+        if guess[i] not in target and guess[i] not in constraints["dont_guess_again"]: # if letter is not relevant at all
+            constraints["dont_guess_again"] = sorted(constraints["dont_guess_again"] + [guess[i]])
+
+    perfect_letters = []
+    for letter, positions in perfect_dict.items():
+        for pos in positions:
+            perfect_letters.append((letter, pos))
+
+    incorrect_positions = constraints["incorrect_positions"]
+    for letter, positions in wrong_pos_dict.items():
+        for pos in positions:
+            if (letter, pos) not in incorrect_positions:
+                incorrect_positions.append((letter, pos))
+
+    # sorting lists of tuples just to make them look nice in the # st.writeout
+    constraints["incorrect_positions"] = sorted(incorrect_positions, key = operator.itemgetter(1), reverse = False)
+    perfect_letters = sorted(perfect_letters, key = operator.itemgetter(1), reverse = False)
+
+    return perfect_letters, list(constraints["incorrect_positions"]), list(constraints["dont_guess_again"])
+
+def new_session_state(word_list: list, target: str, lexicon_key: bytes = None, excluded: int = 0):
+    """
+    Solver state for a new session of `wordle_wizard_cheat`, before any guess. Every word in `word_list` is still a candidate,
+    except those in the `excluded` bitset (e.g. answers of earlier days, see answer_history.py).
+
+    The state is a small dict of plain values, meant to be kept in `st.session_state`:
+    the candidates as a bitset over word list positions, the accumulated constraints and one record per processed guess
+    (including the suggestions shown for it).
+    """
+
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    return {
+        "lexicon_key": lexicon_key.hex(),
+        "target": target,
+        "excluded": excluded,
+        "guesses": [],
+        "candidates": all_words_bitset(word_list) & ~excluded,
+        "constraints": new_constraints(),
+        "steps": [],
+    }
+
+def session_state_matches(solver_state: dict, guesses: list, target: str, lexicon_key: bytes, excluded: int = 0):
+    """
+    True if `solver_state` can be resumed for these guesses: same word list, target and excluded words, and its processed guesses start `guesses`.
+    """
 
-    word_ratings = sorted(word_ratings, key = operator.itemgetter(1), reverse = True)
+    return (len(solver_state) > 0
+            and solver_state["lexicon_key"] == lexicon_key.hex()
+            and solver_state["target"] == target
+            and solver_state.get("excluded", 0) == excluded
+            and list(guesses[:len(solver_state["guesses"])]) == solver_state["guesses"])
 
-    if show_letters == True:
-        return word_ratings, sorted_counts
-    else:
-        return word_ratings
-    
-def count_vows_cons(word: str, y_vow = True):
+def apply_session_guess(solver_state: dict, guess: str, word_list: list, phase_timings: list = None):
     """
-    Given a passed word, calculate the number of non-unique vowels and consonants in the word (duplicates counted more than once).
-    
+    Processes one more guess for a session: updates the constraints and candidates in `solver_state` (in place) and records the step.
+    Only the current candidates are visited, so the cost doesn't grow with the number of earlier guesses.
+
     ------
     Parameters:
     ------
-    `word`: str
-        a single passed word (str)
-    `y_vow`: bool
-        if True, "y" is considered a vowel. If False, "y" considered a consonant. Default is True
+    `solver_state`: dict
+        per-session solver state (see `new_session_state`)
+    `guess`: str
+        next guessed word
+    `word_list`: list
+        list of all valid words -- the same one the state was created with
+    `phase_timings`: list
+        if passed, phase records are appended to it (see `record_phase`)
 
     ------
     Returns:
     ------
-    `counts`: dict
-        dictionary, where format is {letter type : count}
+    `step`: dict
+        record of this guess: constraints so far, number of remaining candidates, top ratings and the next guess the solver would play
     """
 
-    word = word.lower() # for consistency
+    guess_num = len(solver_state["guesses"]) + 1
+    target = solver_state["target"]
 
-    if y_vow == True:
-        vows = "aeiouy"
-        cons = "bcdfghjklmnpqrstvwxz"
-    elif y_vow == False:
-        vows = "aeiou"
-        cons = "bcdfghjklmnpqrstvwxyz"
+    if phase_timings is not None:
+        phase_start = time.perf_counter()
 
-    counts = {}
-    counts["vows"] = 0
-    counts["cons"] = 0
-    for letter in word:
-        if letter in vows:
-            counts["vows"] += 1
-        if letter in cons:
-            counts["cons"] += 1
+    perfect_letters, incorrect_positions, dont_guess_again = update_constraints(solver_state["constraints"], guess, target)
 
-    return counts
+    if phase_timings is not None:
+        record_phase(phase_timings, guess_num, "constraints", phase_start, words_scanned = 0,
+                     candidates = solver_state["steps"][-1]["remaining"] if solver_state["steps"] else len(word_list))
 
-def get_word_rating(words_to_rate: list, word_list: list, normalized: bool = True, ascending: bool = False):
+    next_candidates, remaining, next_guess, word_ratings = get_next_step(solver_state["candidates"], guess, get_feedback(guess, target), word_list,
+                                                                         bytes.fromhex(solver_state["lexicon_key"]),
+                                                                         phase_timings = phase_timings, guess_num = guess_num)
+
+    solver_state["candidates"] = next_candidates
+    solver_state["guesses"].append(guess)
+
+    step = {
+        "guess": guess,
+        "perfect_letters": perfect_letters,
+        "incorrect_positions": incorrect_positions,
+        "dont_guess_again": dont_guess_again,
+        "remaining": remaining,
+        "word_ratings": word_ratings,
+        "next_guess": next_guess,
+    }
+    solver_state["steps"].append(step)
+
+    return step
+
+
+### Full solutions for the Universal Solver
+
+def solve_puzzle(word_list: list, guess: str, target: str, max_guesses: int = 6, strategy: str = "rating", lexicon_key: bytes = None,
+                 phase_timings: list = None):
     """
-    Given a word and a word list, calculates rating each word as a measure of its impact to the next possible guesses in Wordle, ordered according to `reverse` parameter.
-    
+    Solves a puzzle from a starting word, playing the solver's own next guess each time, and returns the full solution.
+    Nothing is shown -- `wordle_wizard` renders the result.
+
     ------
     Parameters:
     ------
-    `words_to_rate`: list
-        list of strings to be rated
     `word_list`: list
-        list of all possible words (str) of consistent length, to which each word in `words_to_rate` will be compared
-    `normalized`: bool
-        if True, normalizes all ratings on a scale of 0-100, with 100 being the rating for the most optimal word, and 0 for the least optimal word
-    `ascending`: bool
-        if True, returns list ordered ascending. If False, returns list in descending order
+        list of valid words to be considered
+    `guess`: str
+        starting word
+    `target`: str
+        target word
+    `max_guesses`: int
+        the maximum number of attempts allowed to solve the Wordle
+    `strategy`: str
+        how next guesses are chosen, one of `solve_strategies` (see `get_strategy_guess`)
+    `lexicon_key`: bytes
+        fingerprint of `word_list`. Computed if not passed
+    `phase_timings`: list
+        if passed, phase records are appended to it (see `record_phase`)
 
     ------
     Returns:
     ------
-    `word_ratings`: list
-        list of tuples. Format is [(word, rating)], where rating is calculated according to above formula
-    `sorted_counts`: list of tuples
-        list of tuples. Format is ("letter", frequency). Sorted according to `sort` value; ["descending" or "ascending"] if passed
+    `solution`: dict
+        JSON-serializable dict with the guessed words (including the unplayed next guess if the puzzle wasn't solved in time),
+        one step record per evaluated guess (see `apply_session_guess`), the number of guesses and whether the target was guessed
     """
 
-    if ascending == True:
-        # sorted_counts = get_letter_counts(english_alphabet, word_list, sort = "ascending")
-        sorted_counts = get_letter_counts(word_list = word_list, letters = english_alphabet, sort = "ascending", unique = True)
-    else:
-        # sorted_counts = get_letter_counts(english_alphabet, word_list, sort = "descending")
-        sorted_counts = get_letter_counts(word_list = word_list, letters = english_alphabet, sort = "descending", unique = True)
+    if strategy not in solve_strategies:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from {solve_strategies}.")
 
-    all_letters_count = 0
-    for letter, freq in sorted_counts:
-        all_letters_count += freq
+    solver_state = new_session_state(word_list, target, lexicon_key)
 
-    unnormalized_ratings = []
-    for word in words_to_rate:
-        word = word.lower()
-        ratings_dict = {}
-        for letter in word:
-            for freq_letter, freq in sorted_counts:
-                if letter == freq_letter:
-                    ratings_dict[letter] = freq
-        
-        total_rating = 0
-        for letter, rating in ratings_dict.items():
-            total_rating += rating
+    guessed_words = []
+    guess_num = 0
+    target_guessed = False
 
-        unnormalized_ratings.append((word, round(total_rating / all_letters_count * 100, 2)))
-    
-    word_ratings = sorted(unnormalized_ratings, key = operator.itemgetter(1), reverse = True)
-    # # print (word_ratings)
+    while guess:
+        guess_num += 1
+        guessed_words.append(guess)
 
-    if normalized == True:
-        if len(word_ratings) > 1:
-            new_tests = []
+        if guess == target:
+            target_guessed = True
+            break
 
-            for tup in word_ratings:
-                try:
-                    normd = round(((tup[1] - word_ratings[-1][1]) / (word_ratings[0][1] - word_ratings[-1][1])) * 100, 2)
-                    new_tests.append((tup[0], normd))
-                except:
-                    ZeroDivisionError
-                    new_tests.append((tup[0], 0.0))    
-                
-            return new_tests
-        else:
-            return [(word_ratings[0][0], float(100))]
-        
-    elif normalized == False:
+        step = apply_session_guess(solver_state, guess, word_list, phase_timings = phase_timings)
+        if strategy != "rating":
+            step["next_guess"] = get_strategy_guess(solver_state["candidates"], step["next_guess"], word_list, strategy,
+                                                   lexicon_key = bytes.fromhex(solver_state["lexicon_key"]))
+        guess = step["next_guess"]
 
-        return word_ratings
-    
-### Gets most common words of all words of the dataset
+        if guess_num == max_guesses: # if at max guesses allowed
+            guessed_words.append(guess)
+            break
 
-def get_word_distribution(word_list: list, sort: str = "descending"):
+        if guess == target:
+            guess_num += 1
+            guessed_words.append(guess)
+            target_guessed = True
+            break
+
+    return {
+        "first_guess": guessed_words[0],
+        "target": target,
+        "max_guesses": max_guesses,
+        "strategy": strategy,
+        "guessed_words": guessed_words,
+        "steps": solver_state["steps"],
+        "num_guesses": guess_num,
+        "target_guessed": target_guessed,
+    }
+
+def _restore_solution(solution: dict):
+    # solutions loaded from disk have lists where the solver builds tuples -- restore them so they render identically
+    for step in solution["steps"]:
+        for field in ("perfect_letters", "incorrect_positions", "word_ratings"):
+            step[field] = [tuple(item) for item in step[field]]
+
+    return solution
+
+# optional precomputed table of solutions for every (start, target) pair -- see `use_solve_table` and solve_table.py
+loaded_solve_table = None
+
+def use_solve_table(table):
+    """
+    Makes `wordle_wizard` look up solutions in a precomputed table (see `solve_table.load_solve_table`). The table only has the guessed
+    words: verbose runs rebuild the steps shown from them (see `replay_solution`). Pass None to stop using it.
     """
-    Given a passed str of words and a list of words, produces a frequency distribution of all words
-    
-    ------
-    Parameters:
-    ------
-    `word_list`: list
-        list of words (str) from which word frequencies will be counted
-    `sort`: str
-        if either "descending" or "ascending" are passed, returned list of tuples will be sorted accoringly, else returned dictionary will be unsorted
 
-    ------
-    Returns:
-    ------
-    `words_counts_dict`: dict
-        dictionary of {word : count} pairs for each word in passed `word_list`
-    `sorted_counts_dicts`: list of tuples
-        list of tuples. Format is ("word", frequency). Ordered according to `sort` values
+    global loaded_solve_table
+    loaded_solve_table = table
+
+def replay_solution(solution: dict, word_list: list, lexicon_key: bytes = None):
     """
+    Adds the step records (see `apply_session_guess`) to a solution that only has its guessed words, eg one from the solve table.
 
-    words_counts_dict = {}
+    The candidates after each guess come from the shared `transition_cache` and the ratings shown are looked up, but no next guess is
+    searched for (no endgame, lookahead or policy): each step's "next_guess" is the word the solution played next. Returns `solution`.
+    """
 
-    for word in word_list: 
-        if word in words_counts_dict:
-            words_counts_dict[word] += 1
+    if lexicon_key is None:
+        lexicon_key = get_words_fingerprint(word_list)
+
+    guessed_words, target = solution["guessed_words"], solution["target"]
+    solver_state = new_session_state(word_list, target, lexicon_key)
+
+    for guess_num, guess in enumerate(guessed_words[:-1]):
+        if guess == target:
+            break
+
+        perfect_letters, incorrect_positions, dont_guess_again = update_constraints(solver_state["constraints"], guess, target)
+        transition, words_scanned = get_transition(solver_state["candidates"], guess, word_list, lexicon_key)
+        pattern = get_feedback(guess, target)
+        next_candidates, remaining = transition["buckets"].get(pattern, (0, 0))
+
+        if transition["settings"] == get_solver_settings() and pattern in transition["next_guesses"]: # shown before, by a solve that reached the same state
+            word_ratings = transition["next_guesses"][pattern][1]
+        elif remaining == 1:
+            word_ratings = [(word_list[bitset_to_ids(next_candidates)[0]], float(100))]
         else:
-            words_counts_dict[word] = 1
+            word_ratings = get_top_word_ratings(bitset_to_ids(next_candidates), word_list, lexicon_key = lexicon_key)[1]
 
-    if sort == "ascending":
-        sorted_counts_dict = (sorted(words_counts_dict.items(), key = operator.itemgetter(1), reverse = False))
-        return sorted_counts_dict
+        solver_state["candidates"] = next_candidates
+        solver_state["guesses"].append(guess)
+        solver_state["steps"].append({
+            "guess": guess,
+            "perfect_letters": perfect_letters,
+            "incorrect_positions": incorrect_positions,
+            "dont_guess_again": dont_guess_again,
+            "remaining": remaining,
+            "word_ratings": word_ratings,
+            "next_guess": guessed_words[guess_num + 1],
+        })
 
-    if sort == "descending":
-        sorted_counts_dict = sorted(words_counts_dict.items(), key = operator.itemgetter(1), reverse = True)
-        return sorted_counts_dict
+    solution["steps"] = solver_state["steps"]
+
+    return solution
+
+# (start, target, lexicon version, strategy, max guesses, solver settings) -> solution, shared by every session in the process.
+# Set the WORDLE_SOLVE_CACHE_DIR environment variable to also keep solutions on disk, across restarts
+solve_cache = SolveCache(max_entries = 5_000, max_bytes = 32 * 1024 ** 2, disk_dir = os.environ.get("WORDLE_SOLVE_CACHE_DIR"), decode = _restore_solution)
 
 ############################################################################################################################################################
 ############################################################################################################################################################
@@ -320,18 +1772,60 @@ def get_word_distribution(word_list: list, sort: str = "descending"):
 
 ## lines 305 - 835
 
+def record_phase(phase_timings: list, guess_num: int, phase: str, phase_start: float, words_scanned: int, candidates: int):
+    """
+    Appends one phase's profile to `phase_timings` and returns a new start time for the next phase. Used by the `profile` option of the solvers.
+
+    Parameters:
+    ------
+    `phase_timings`: list
+        running list of phase records (dicts) for the current solve
+    `guess_num`: int
+        number of the guess being processed
+    `phase`: str
+        name of the phase -- "constraints", "filtering", "rating" (which includes the tie-break) or "endgame" (see `choose_endgame_guess`)
+    `phase_start`: float
+        `time.perf_counter()` value at the start of the phase
+    `words_scanned`: int
+        number of words visited during the phase
+    `candidates`: int
+        number of candidate words remaining at the end of the phase
+
+    Returns:
+    ------
+    `phase_end`: float
+        `time.perf_counter()` value at the end of the phase
+    """
+
+    phase_end = time.perf_counter()
+    phase_timings.append({"guess_num": guess_num, "phase": phase, "seconds": phase_end - phase_start,
+                          "words_scanned": words_scanned, "candidates": candidates})
+
+    return phase_end
+
+def flush_output(lines: list):
+    """
+    Shows the buffered `lines` as a single markdown element -- one message to the browser instead of one per line -- and empties the buffer.
+    Each line is dedented on its own, as `st.write` would, and lines are separated like consecutive `st.write` calls.
+    """
+
+    if lines:
+        st.markdown("\n\n".join(textwrap.dedent(line).strip("\n") for line in lines))
+        lines.clear()
+
 def wordle_wizard(word_list: list, max_guesses: int = None, 
                   guess: str = None, target: str = None,
                   random_guess: bool = False, random_target: bool = False, 
                   verbose: bool = False, drama: float = None, 
-                  return_stats: bool = False, record: bool = False):
+                  return_stats: bool = False, record: bool = False, profile: bool = False,
+                  strategy: str = "rating"):
     """
     Mimicking the popular web game, this function matches a current word to a target word automatically, in the most statistically optimal way possible.
 
     Parameters:
     ------
     `word_list`: list
-        list of valid words to be considered
+        list of valid words to be considered. A `Lexicon` or `SessionLexicon` (see lexicon.py) avoids rehashing it on every call
     `guess`: str
         a string -- must be the same length as `target_word`
     `target`: str
@@ -350,11 +1844,16 @@ def wordle_wizard(word_list: list, max_guesses: int = None,
         if True, # st.writes nothing and returns a dictionary of various statistics about the function's performance trying to solve the puzzle
     `record`: bool
         if True, creates a .txt file with the same information # st.writeed according to the indicated verbosity
+    `profile`: bool
+        if True, records wall time, words scanned and candidates remaining for each phase ("constraints", "filtering", "rating") of each guess, returned under `stats_dict['phase_timings']`. Adds no work when False
+    `strategy`: str
+        how next guesses are chosen, one of `solve_strategies`: "rating" (see `choose_next_guess`), "lookahead" (see `choose_next_guess_lookahead`)
+        or "policy" (see `use_policy`)
 
     Returns:
     ------
-    `# stats_dict`: dict
-        dictionary containing various statistics about the function's performance trying to solve the puzzle
+    `stats_dict`: dict
+        only if `return_stats` or `profile` is True. Dictionary containing various statistics about the function's performance trying to solve the puzzle
     """
 
     guess = guess.lower()
@@ -405,357 +1904,156 @@ def wordle_wizard(word_list: list, max_guesses: int = None,
 
     # luck_guess_1 = round(1 - ((1 / len(word_list)) * guess_entropies[0] / 100), 2) * 100
 
-    english_alphabet = "abcdefghijklmnopqrstuvwxyz"
-
-    # word_list_sorted_counts = get_letter_counts(english_alphabet, word_list, sort = "descending")
-    word_list_sorted_counts = get_letter_counts(word_list = word_list, letters = english_alphabet, sort = "descending", unique = True)
+    #### Solve the puzzle -- solutions are deterministic, so they are shared by every session through `solve_cache`
+    lexicon_key = get_words_fingerprint(word_list)
+    # drops any solutions computed for an older word list. Sessions' extra words (see `SessionLexicon`) don't count as a new word list
+    solve_cache.set_lexicon_version(get_words_fingerprint(word_list.base if isinstance(word_list, Lexicon) else word_list).hex())
 
-    
-    wordlen = len(guess)
-    letter_positions = set(i for i in range(0, wordlen))
+    if max_guesses == None: # if no value is passed, default is len(guess)
+        max_guesses = len(guess)
 
-    guess_set = set()
-    perfect_dict = {}
-    wrong_pos_dict = {}
-    wrong_pos_set = set()
-    dont_guess_again = set()
+    phase_timings = [] # only filled if `profile` == True
+    cache_key = (guess, target, lexicon_key.hex(), strategy, max_guesses, get_solver_settings())
 
-    guessed_words = [] # running set of guessed words
-    guess_num = 0 # baseline for variable
-    dont_guess_words = set()
-    incorrect_positions = []
-    reduction_per_guess = []
+    solution = None if profile else solve_cache.get(cache_key) # profiling always measures a fresh solve
+    if solution is None and profile == False and loaded_solve_table is not None:
+        solution = loaded_solve_table.get_solution(guess, target, lexicon_key.hex(), strategy, max_guesses, settings = get_solver_settings())
+        if solution is not None and verbose == True: # a precomputed table only has the guessed words
+            solution = replay_solution(solution, word_list, lexicon_key)
+            solve_cache.put(cache_key, solution)
+    if solution is None:
+        solution = solve_puzzle(word_list, guess, target, max_guesses = max_guesses, strategy = strategy, lexicon_key = lexicon_key,
+                                phase_timings = phase_timings if profile else None)
+        solve_cache.put(cache_key, solution)
 
-    if max_guesses == None: # if no value is passed, default is len(guess)
-        max_guesses = wordlen
-    else: # else it is the value passed
-        max_guesses = max_guesses
+    guessed_words = solution["guessed_words"]
+    steps = solution["steps"]
 
-    perfect_letts_per_guess = []
-    wrong_pos_per_guess = []
-    wrong_letts_per_guess = []
+    #### Show the solution, one guess at a time
+    guess_num = 0
+    output = [] # lines shown for the current guess, sent together (see `flush_output`)
 
     while guess: # while there is any guess -- there are conditions to break it at the bottom
 
         guess_num += 1
+        guess = guessed_words[guess_num - 1]
 
-        guessed_words.append(guess)
-
+        flush_output(output)
         if drama:
             time.sleep(drama)
 
         # guess_num += 1 # each time the guess is processed
         if return_stats == False:
             if guess_num == 1:
-                st.write("-----------------------------\n")
+                output.append("-----------------------------\n")
 
         if guess == target:
-            # stats_dict['target_guessed'] = True
             if return_stats == False:
                 if guess_num == 1:
                     # st.write(f"Congratulations! The Wordle has been solved in {guess_num} guess, that's amazingly lucky!")
-                    st.write(f"The starting word and target word are the same. Try entering two different words to see how the puzzle can be solved.")
+                    output.append(f"The starting word and target word are the same. Try entering two different words to see how the puzzle can be solved.")
                     # st.write(f"The target word was {target}")
-            
-                    perfect_letts_per_guess.append(5)
-                    wrong_pos_per_guess.append(0)
-                    wrong_letts_per_guess.append(0)
             break
             
         if return_stats == False:
-            st.write(f"**Guess {guess_num}: '{guess}'**")
-
-        guess_set = set()
-        wrong_pos_set = set()
-
-        #### Step 2 -- ALL PERFECT
-        for i in letter_positions: # number of letters in each word (current word and target word)
-            guess_set.add(guess[i])
-
-            if guess[i] not in perfect_dict:
-                perfect_dict[guess[i]] = set()
-            if guess[i] not in wrong_pos_dict:
-                wrong_pos_dict[guess[i]] = set()
-
-            ### EVALUATE CURRENT GUESS
-            if guess[i] == target[i]: # letter == correct and position == correct
-                perfect_dict[guess[i]].add(i)
-
-            if (guess[i] != target[i] and  guess[i] in target): # letter == correct and position != correct
-                wrong_pos_dict[guess[i]].add(i)
-                wrong_pos_set.add(guess[i])
-
-            if guess[i] not in target: # if letter is not relevant at all
-                dont_guess_again.add(guess[i])
-
-        #### Step 3 -- ALL PERFECT
-        next_letters = set()
-        for letter, positions in perfect_dict.items():
-            if len(positions) > 0:
-                next_letters.add(letter)
-
-        for letter, positions in wrong_pos_dict.items():
-            if len(positions) > 0:
-                next_letters.add(letter)
-
-        #### List of tuples of correct letter positions in new valid words. Eg: [('e', 2), ('a', 3)]
-        perfect_letters = []
-        for letter, positions in perfect_dict.items():
-            for pos in positions:
-                if len(positions) > 0:
-                    perfect_letters.append((letter, pos))
-
-        #### all words that have correct letters in same spots
-        words_matching_correct_all = []
-        for word in word_list:
-            word_set = set()
-            for letter, pos in perfect_letters:
-                if pos < len(word):
-                    if word[pos] == letter:
-                        words_matching_correct_all.append(word)
-
-        #### excluding words with letters in known incorrect positions
-        for letter, positions in wrong_pos_dict.items():
-            for pos in positions:
-                if len(positions) > 0:
-                    if (letter, pos) not in incorrect_positions:
-                        incorrect_positions.append((letter, pos))
-
-        # sorting lists of tuples just to make them look nice in the # st.writeout
-        incorrect_positions = sorted(incorrect_positions, key = operator.itemgetter(1), reverse = False)
-        perfect_letters = sorted(perfect_letters, key = operator.itemgetter(1), reverse = False)
-
-        #### all words that have correct letters in incorrect spots -- so they can be excluded efficiently
-        
-        # st.write(incorrect_positions)
-        
-        for word in word_list:
-            word_set = set()
-            for letter, pos in incorrect_positions:
-                if pos < len(word):
-                    if word[pos] == letter:
-                        dont_guess_words.add(word)
-        for word in word_list:
-            word_set = set()
-            for letter, pos in incorrect_positions:
-                if pos < len(word):
-                    if word[pos] == letter:
-                        dont_guess_words.add(word)
-
-        for bad_letter in dont_guess_again:
-            for word in word_list:
-                if (bad_letter in word and word not in dont_guess_words):
-                    dont_guess_words.add(word)
+            output.append(f"**Guess {guess_num}: '{guess}'**")
 
         if return_stats == False:
             if verbose == True:
-                st.write(f"Letters in correct positions:\n\t{perfect_letters}\n")
-                st.write(f"Letters in incorrect positions:\n\t{incorrect_positions}\n")
-                # st.write (f"Letters to guess again:\n\t{sorted(list(next_letters), reverse = False)}\n")
-                st.write(f"Letters to not guess again:\n\t{sorted(list(dont_guess_again), reverse = False)}\n") # works
-
-        # Returns True
-        # st.write(A.issubset(B)) # "if everything in A is in B", returns Bool
-
-        perfect_letts_per_guess.append(len(perfect_letters))
-        wrong_pos_per_guess.append(len(incorrect_positions))
-        wrong_letts_per_guess.append(len(dont_guess_again))
-
-        potential_next_guesses = set()
-        middle_set = set()
-
-        if len(perfect_letters) == 0 and len(incorrect_positions) == 0: # if there are NEITHER perfect letters, NOR incorrect positions, ....
-            for word in word_list:
-                if word not in dont_guess_words:
-                    if word not in guessed_words:
-                        potential_next_guesses.add(word)
-                                        
-            # st.write(f"GUESS {guess_num} : TEST 1-1")
-
-        if len(perfect_letters) == 0 and len(incorrect_positions) != 0: # if there are no perfect letters whatsoever, but there ARE incorrect positions ....
-            for word in word_list:
-                for incor_letter, incor_pos in incorrect_positions:
-                    if incor_pos < len(word):
-                        if word[incor_pos] != incor_letter:
-                            if word not in dont_guess_words: # just in case
-                                word_set = set()
-                                for letter in word:
-                                    word_set.add(letter)
-    
-                                    if next_letters.issubset(word_set):
-                                        if word not in guessed_words:
-                                            if len(dont_guess_again) > 0:
-                                                for bad_letter in dont_guess_again:
-                                                    if bad_letter not in word:
-                                                        # potential_next_guesses.append(word)
-                                                        potential_next_guesses.add(word)
-                                            else:
-                                                potential_next_guesses.add(word)
-            
-            # st.write(f"GUESS {guess_num} : TEST 2-1")
+                step = steps[guess_num - 1]
+                remaining = step["remaining"]
+                word_ratings = step["word_ratings"]
 
-        else:
-            for word in word_list:
-                if word not in dont_guess_words: # just in case
-                    word_set = set()
-                    for letter in word:
-                        word_set.add(letter)
-                        if next_letters.issubset(word_set):
-                            if word not in guessed_words:
-                                # # st.write ("TEST 3-2")
-
-                                if len(dont_guess_again) > 0:
-                                    for bad_letter in dont_guess_again:
-                                        if bad_letter not in word:
-                                            middle_set.add(word)
-                                else:
-                                    middle_set.add(word)
-            for word in middle_set:
-                dummy_list = []
-                for good_lett, good_pos in perfect_letters:
-                    if word[good_pos] == good_lett:
-                        dummy_list.append(1)
-                        if len(dummy_list) == len(perfect_letters):
-                            potential_next_guesses.add(word)
-            for word in middle_set:
-                dummy_list = []
-                for bad_lett, bad_pos in incorrect_positions:
-                    if bad_pos < len(word):
-                        if word[bad_pos] == bad_lett:
-                            dummy_list.append(1)
-                            if len(dummy_list) > 0:
-                                potential_next_guesses.remove(word)
-                                        
-            # st.write(f"GUESS {guess_num} : TEST 3-1")
+                output.append(f"Letters in correct positions:\n\t{step['perfect_letters']}\n")
+                output.append(f"Letters in incorrect positions:\n\t{step['incorrect_positions']}\n")
+                # st.write (f"Letters to guess again:\n\t{sorted(list(next_letters), reverse = False)}\n")
+                output.append(f"Letters to not guess again:\n\t{step['dont_guess_again']}\n") # works
 
+                # st.write(f"At this point:")
+                output.append(f"\t{len(word_list) - remaining}, {round((len(word_list) - remaining) / len(word_list) * 100, 2)}% of total words have been eliminated, and")
+                output.append(f"\t{remaining}, {round(remaining / len(word_list) * 100, 2)}% of total words remain possible.\n")
+                
+        #### Guessing next word
         if return_stats == False:
             if verbose == True:
-                if len(potential_next_guesses) > 1:
-                    # st.write(f"At this point:")
-                    st.write(f"\t{len(word_list) - len(potential_next_guesses)}, {round((len(word_list) - len(potential_next_guesses)) / len(word_list) * 100, 2)}% of total words have been eliminated, and")
-                    st.write(f"\t{len(potential_next_guesses)}, {round(len(potential_next_guesses) / len(word_list) * 100, 2)}% of total words remain possible.\n")
+                if remaining == 1:
+                    output.append(f"All potential next guesses:\n\t{word_ratings}\n")
+                    output.append(f"Words guessed so far:\n\t{guessed_words[:guess_num]}.\n")
                 
+                    output.append(f"The only remaining possible word is:\n\t'{word_ratings[0][0]}'\n")
+                elif remaining <= 40:
+                    output.append(f"All potential next guesses:\n\t{word_ratings}\n")
+                    output.append(f"Words guessed so far:\n\t{guessed_words[:guess_num]}.\n")
                 else:
-                    # st.write(f"At this point:")
-                    st.write(f"\t{len(word_list) - len(potential_next_guesses)}, {round((len(word_list) - len(potential_next_guesses)) / len(word_list) * 100, 2)}% of total words have been eliminated, and")
-                    st.write(f"\t{len(potential_next_guesses)}, {round(len(potential_next_guesses) / len(word_list) * 100, 2)}% of total words remain possible.\n")
-        
-        reduction_per_guess.append(len(potential_next_guesses))
-                
-        #### Guessing next word
-        if len(potential_next_guesses) == 1:
+                    output.append(f"The top 40 potential next guesses are:\n\t{word_ratings[:40]}\n")
+                    output.append(f"Words guessed so far:\n\t{guessed_words[:guess_num]}.\n")
 
-            if return_stats == False:
-                if verbose == True:
-                    st.write(f"All potential next guesses:\n\t{get_word_rating(words_to_rate = list(potential_next_guesses), word_list = word_list)}\n")
-                    st.write(f"Words guessed so far:\n\t{guessed_words}.\n")
-                
-                    st.write(f"The only remaining possible word is:\n\t'{list(potential_next_guesses)[0]}'\n")
-                
-            guess = list(potential_next_guesses)[0]
-            # guess_entropies.append(get_word_rating([guess], word_list, normalized = False, ascending = False)[0][1])
-
-        else:
-
-            best_next_guesses = list(potential_next_guesses)                
-            # # st.write (best_next_guesses)
-            word_ratings = get_word_rating(best_next_guesses, word_list, normalized = False, ascending = False) # "internal" ratings
-            
-            # Get max rating of all words
-            max_rating = -np.inf
-            for word, rating in word_ratings:
-                if rating > max_rating:
-                    max_rating = rating
-
-            # add best rated words (all equally best rating in next guess list) to set
-            best_of_the_best_1 = []
-            for word, rating in word_ratings:
-                if rating == max_rating:
-                    best_of_the_best_1.append(word)
-
-            # only using top ten most frequent prefixes suffixes to bias. After that it the impact is especially negligible
-            test_starts = get_gram_freq(word_list = word_list, letters_length = 1, position = "start", search = None)[:10]
-            test_ends = get_gram_freq(word_list = word_list, letters_length = 1, position = "end", search = None)[:10]
-
-            # list of the best words that also have the most frequent starting and ending letters (suffixes and prefixes didn't have an impact)
-            best_of_the_best_2 = []
-            for start_gram, start_count in test_starts:
-                for end_gram, end_count in test_ends:
-                    for word in best_of_the_best_1:
-                        if word[:1] == start_gram and word[-1:] == end_gram:
-                            best_of_the_best_2.append(word)
-
-            if len(best_of_the_best_2) > 0:
-                guess = best_of_the_best_2[0]
-            else:
-                guess = best_of_the_best_1[0] # they're all equally the best of the best possible guesses so just pick the first
-            
-            # guess_entropies.append(get_word_rating([guess], word_list, normalized = False, ascending = False)[0][1])
-
-            if return_stats == False:
-                if verbose == True:
-                    if len(word_ratings) <= 40:
-                        st.write(f"All potential next guesses:\n\t{word_ratings}\n")
-                        st.write(f"Words guessed so far:\n\t{guessed_words}.\n")
-                    else:
-                        st.write(f"The top 40 potential next guesses are:\n\t{word_ratings[:40]}\n")
-                        st.write(f"Words guessed so far:\n\t{guessed_words}.\n")
-
-            # guess_entropies.append(get_word_rating([guess], word_list, normalized = False, ascending = False)[0][1])
+        guess = guessed_words[guess_num] # next guess (if the puzzle wasn't solved in time, the one there was no attempt left for)
 
         #### Guess has now been made -- what to do next
         if guess_num == max_guesses: # if at max guesses allowed
-            guessed_words.append(guess)
-            # stats_dict['target_guessed'] = False
             if return_stats == False:
                 if verbose == True:
-                    st.write("-----------------------------\n")
-                    st.write(f"Unfortunately, the Wordle could not be solved in {max_guesses} guesses.\n")
-                    st.write(f"The target word was '{target}'.\n")
-                    st.write("-----------------------------\n")
+                    output.append("-----------------------------\n")
+                    output.append(f"Unfortunately, the Wordle could not be solved in {max_guesses} guesses.\n")
+                    output.append(f"The target word was '{target}'.\n")
+                    output.append("-----------------------------\n")
                 else:
-                    st.write(f"\nUnfortunately, Wordle Wizard couldn't solve the puzzle in {max_guesses} guesses. Could you?")
-                    st.write(f"The target word was '{target}'.\n")
+                    output.append(f"\nUnfortunately, Wordle Wizard couldn't solve the puzzle in {max_guesses} guesses. Could you?")
+                    output.append(f"The target word was '{target}'.\n")
             break
         else: # if not at max guesses yet allowed
-            # # stats_dict['target_guessed'] = False
             if return_stats == False:
                 if verbose == True:
-                    st.write(f"Next guess:\n\t'{guess}'")
-                    st.write("\n-----------------------------\n")
+                    output.append(f"Next guess:\n\t'{guess}'")
+                    output.append("\n-----------------------------\n")
 
         if guess == target:
             guess_num += 1
-            guessed_words.append(guess)
-            # stats_dict['target_guessed'] = True
 
             if return_stats == False:
-                st.write(f"**Guess {guess_num}: '{guess}'**\n")
-                st.write(f"Wordle Wizard has solved the puzzle in {guess_num} guesses!")
+                output.append(f"**Guess {guess_num}: '{guess}'**\n")
+                output.append(f"Wordle Wizard has solved the puzzle in {guess_num} guesses!")
 
                 if max_guesses - guess_num == 1:
-                    st.write(f"There was only {max_guesses - guess_num} guess remaining.")
+                    output.append(f"There was only {max_guesses - guess_num} guess remaining.")
                 else:
-                    st.write(f"There were still {max_guesses - guess_num} guesses remaining.")
+                    output.append(f"There were still {max_guesses - guess_num} guesses remaining.")
 
             if return_stats == False:   
                 # # stats_dict['target_guessed'] = True                 
-                st.write(f"\nThe target word was **'{target}'**.")
-                st.write("\n-----------------------------")
+                output.append(f"\nThe target word was **'{target}'**.")
+                output.append("\n-----------------------------")
             break
-        
+
+    flush_output(output)
+
+    if return_stats == True or profile == True:
+        stats_dict = {}
+        stats_dict['first_guess'] = guessed_words[0]
+        stats_dict['target_word'] = target
+        stats_dict['guessed_words'] = guessed_words
+        stats_dict['num_guesses'] = solution["num_guesses"]
+        stats_dict['target_guessed'] = solution["target_guessed"]
+        stats_dict['remaining_per_guess'] = [step["remaining"] for step in steps] if steps is not None else None
+        if profile == True:
+            stats_dict['phase_timings'] = phase_timings
+
+        return stats_dict
+
 def wordle_wizard_cheat(guesses: list, word_list: list, max_guesses: int = None, 
                   target: str = None,
                   random_guess: bool = False, random_target: bool = False, 
                   verbose: bool = False, drama: float = None, 
-                  return_stats: bool = False, record: bool = False):
+                  return_stats: bool = False, record: bool = False, profile: bool = False,
+                  solver_state: dict = None, exclude_words: list = None):
     """
     Mimicking the popular web game, this function matches a current word to a target word automatically, in the most statistically optimal way possible.
 
     Parameters:
     ------
     `word_list`: list
-        list of valid words to be considered
+        list of valid words to be considered. A `Lexicon` or `SessionLexicon` (see lexicon.py) avoids rehashing it on every call
     `guess`: str
         a string -- must be the same length as `target_word`
     `target`: str
@@ -774,11 +2072,19 @@ def wordle_wizard_cheat(guesses: list, word_list: list, max_guesses: int = None,
         if True, # st.writes nothing and returns a dictionary of various statistics about the function's performance trying to solve the puzzle
     `record`: bool
         if True, creates a .txt file with the same information # st.writeed according to the indicated verbosity
+    `profile`: bool
+        if True, records wall time, words scanned and candidates remaining for each phase ("constraints", "filtering", "rating") of each guess, returned under `stats_dict['phase_timings']`. Adds no work when False
+    `solver_state`: dict
+        per-session solver state (e.g. a dict kept in `st.session_state`), updated in place. If it holds the results of an earlier call
+        for the same target whose guesses start `guesses`, only the new guesses are evaluated. Reset automatically otherwise
+    `exclude_words`: list
+        words that can't be the target, e.g. the answers of earlier days (see `answer_history.AnswerHistory.used_before`). They're never
+        suggested and never counted as remaining. `target` itself is never excluded
 
     Returns:
     ------
-    `# stats_dict`: dict
-        dictionary containing various statistics about the function's performance trying to solve the puzzle
+    `stats_dict`: dict
+        only if `return_stats` or `profile` is True. Dictionary containing various statistics about the function's performance trying to solve the puzzle
     """
 
     # guess = guess.lower()
@@ -813,25 +2119,25 @@ def wordle_wizard_cheat(guesses: list, word_list: list, max_guesses: int = None,
 
     # luck_guess_1 = round(1 - ((1 / len(word_list)) * guess_entropies[0] / 100), 2) * 100
 
-    english_alphabet = "abcdefghijklmnopqrstuvwxyz"
-
-    # word_list_sorted_counts = get_letter_counts(english_alphabet, word_list, sort = "descending")
-    word_list_sorted_counts = get_letter_counts(word_list = word_list, letters = english_alphabet, sort = "descending", unique = True)
-
     wordlen = len(guesses[0])
-    letter_positions = set(i for i in range(0, wordlen))
-
-    guess_set = set()
-    perfect_dict = {}
-    wrong_pos_dict = {}
-    wrong_pos_set = set()
-    dont_guess_again = set()
 
     guessed_words = [] # running set of guessed words
     guess_num = 0 # baseline for variable
-    dont_guess_words = set()
-    incorrect_positions = []
     reduction_per_guess = []
+    phase_timings = [] # only filled if `profile` == True
+    target_guessed = False
+
+    # per-session solver state -- only guesses that weren't already processed by an earlier call are computed below
+    if solver_state is None:
+        solver_state = {}
+    lexicon_key = get_words_fingerprint(word_list)
+    excluded = 0
+    if exclude_words:
+        word_index = get_lexicon_table(word_list, lexicon_key)["word_index"]
+        excluded = ids_to_bitset([word_index[word] for word in set(exclude_words) if word in word_index and word != target])
+    if not session_state_matches(solver_state, guesses, target, lexicon_key, excluded):
+        solver_state.clear()
+        solver_state.update(new_session_state(word_list, target, lexicon_key, excluded))
 
     if max_guesses == None: # if no value is passed, default is len(guess)
         max_guesses = wordlen
@@ -842,6 +2148,8 @@ def wordle_wizard_cheat(guesses: list, word_list: list, max_guesses: int = None,
     wrong_pos_per_guess = []
     wrong_letts_per_guess = []
 
+    output = [] # lines shown for the current guess, sent together (see `flush_output`)
+
     # while guess: # while there is any guess -- there are conditions to break it at the bottom
 
     for guess_num, guess in enumerate(guesses):
@@ -850,20 +2158,21 @@ def wordle_wizard_cheat(guesses: list, word_list: list, max_guesses: int = None,
 
         guessed_words.append(guess)
 
+        flush_output(output)
         if drama:
             time.sleep(drama)
 
         # guess_num += 1 # each time the guess is processed
         if return_stats == False:
             if guess_num == 1:
-                st.write("-----------------------------\n")
+                output.append("-----------------------------\n")
 
         if guess == target:
-            # stats_dict['target_guessed'] = True
+            target_guessed = True
             if return_stats == False:
                 if guess_num == 1:
                     # st.write(f"Congratulations! The Wordle has been solved in {guess_num} guess, that's amazingly lucky!")
-                    st.write(f"The starting word and target word are the same. Try entering two different words to see how the puzzle can be solved.")
+                    output.append(f"The starting word and target word are the same. Try entering two different words to see how the puzzle can be solved.")
                     # st.write(f"The target word was {target}")
                 
                 
@@ -873,249 +2182,64 @@ def wordle_wizard_cheat(guesses: list, word_list: list, max_guesses: int = None,
             break
             
         if return_stats == False:
-            st.write(f"**Guess {guess_num}: '{guess}'**")
-
-        guess_set = set()
-        wrong_pos_set = set()
-
-        #### Step 2 -- ALL PERFECT
-        for i in letter_positions: # number of letters in each word (current word and target word)
-            guess_set.add(guess[i])
-
-            if guess[i] not in perfect_dict:
-                perfect_dict[guess[i]] = set()
-            if guess[i] not in wrong_pos_dict:
-                wrong_pos_dict[guess[i]] = set()
-
-            ### EVALUATE CURRENT GUESS
-            if guess[i] == target[i]: # letter == correct and position == correct
-                perfect_dict[guess[i]].add(i)
-
-            if (guess[i] != target[i] and  guess[i] in target): # letter == correct and position != correct
-                wrong_pos_dict[guess[i]].add(i)
-                wrong_pos_set.add(guess[i])
-
-            if guess[i] not in target: # if letter is not relevant at all
-                dont_guess_again.add(guess[i])
-
-        #### Step 3 -- ALL PERFECT
-        next_letters = set()
-        for letter, positions in perfect_dict.items():
-            if len(positions) > 0:
-                next_letters.add(letter)
-
-        for letter, positions in wrong_pos_dict.items():
-            if len(positions) > 0:
-                next_letters.add(letter)
-
-        #### List of tuples of correct letter positions in new valid words. Eg: [('e', 2), ('a', 3)]
-        perfect_letters = []
-        for letter, positions in perfect_dict.items():
-            for pos in positions:
-                if len(positions) > 0:
-                    perfect_letters.append((letter, pos))
-
-        #### all words that have correct letters in same spots
-        words_matching_correct_all = []
-        for word in word_list:
-            word_set = set()
-            for letter, pos in perfect_letters:
-                if pos < len(word):
-                    if word[pos] == letter:
-                        words_matching_correct_all.append(word)
-
-        #### excluding words with letters in known incorrect positions
-        for letter, positions in wrong_pos_dict.items():
-            for pos in positions:
-                if len(positions) > 0:
-                    if (letter, pos) not in incorrect_positions:
-                        incorrect_positions.append((letter, pos))
-
-        # sorting lists of tuples just to make them look nice in the # st.writeout
-        incorrect_positions = sorted(incorrect_positions, key = operator.itemgetter(1), reverse = False)
-        perfect_letters = sorted(perfect_letters, key = operator.itemgetter(1), reverse = False)
-
-        #### all words that have correct letters in incorrect spots -- so they can be excluded efficiently
-        
-        # st.write(incorrect_positions)
-        
-        for word in word_list:
-            word_set = set()
-            for letter, pos in incorrect_positions:
-                if pos < len(word):
-                    if word[pos] == letter:
-                        dont_guess_words.add(word)
-        for word in word_list:
-            word_set = set()
-            for letter, pos in incorrect_positions:
-                if pos < len(word):
-                    if word[pos] == letter:
-                        dont_guess_words.add(word)
-
-        for bad_letter in dont_guess_again:
-            for word in word_list:
-                if (bad_letter in word and word not in dont_guess_words):
-                    dont_guess_words.add(word)
+            output.append(f"**Guess {guess_num}: '{guess}'**")
+
+        #### Evaluate the guess, unless an earlier call already did for this session
+        if guess_num > len(solver_state["steps"]):
+            step = apply_session_guess(solver_state, guess, word_list, phase_timings = phase_timings if profile else None)
+        else:
+            step = solver_state["steps"][guess_num - 1]
+
+        perfect_letters = step["perfect_letters"]
+        incorrect_positions = step["incorrect_positions"]
+        dont_guess_again = step["dont_guess_again"]
+        word_ratings = step["word_ratings"]
+        remaining = step["remaining"]
 
         if return_stats == False:
             if verbose == True:
-                st.write(f"Letters in correct positions:\n\t{perfect_letters}\n")
-                st.write(f"Letters in incorrect positions:\n\t{incorrect_positions}\n")
+                output.append(f"Letters in correct positions:\n\t{perfect_letters}\n")
+                output.append(f"Letters in incorrect positions:\n\t{incorrect_positions}\n")
                 # st.write (f"Letters to guess again:\n\t{sorted(list(next_letters), reverse = False)}\n")
-                st.write(f"Letters to not guess again:\n\t{sorted(list(dont_guess_again), reverse = False)}\n") # works
-
-        # Returns True
-        # st.write(A.issubset(B)) # "if everything in A is in B", returns Bool
+                output.append(f"Letters to not guess again:\n\t{dont_guess_again}\n") # works
 
         perfect_letts_per_guess.append(len(perfect_letters))
         wrong_pos_per_guess.append(len(incorrect_positions))
         wrong_letts_per_guess.append(len(dont_guess_again))
 
-        potential_next_guesses = set()
-        middle_set = set()
-
-        if len(perfect_letters) == 0 and len(incorrect_positions) == 0: # if there are NEITHER perfect letters, NOR incorrect positions, ....
-            for word in word_list:
-                if word not in dont_guess_words:
-                    if word not in guessed_words:
-                        potential_next_guesses.add(word)
-                                        
-            # st.write(f"GUESS {guess_num} : TEST 1-1")
-
-        if len(perfect_letters) == 0 and len(incorrect_positions) != 0: # if there are no perfect letters whatsoever, but there ARE incorrect positions ....
-            for word in word_list:
-                for incor_letter, incor_pos in incorrect_positions:
-                    if incor_pos < len(word):
-                        if word[incor_pos] != incor_letter:
-                            if word not in dont_guess_words: # just in case
-                                word_set = set()
-                                for letter in word:
-                                    word_set.add(letter)
-    
-                                    if next_letters.issubset(word_set):
-                                        if word not in guessed_words:
-                                            if len(dont_guess_again) > 0:
-                                                for bad_letter in dont_guess_again:
-                                                    if bad_letter not in word:
-                                                        # potential_next_guesses.append(word)
-                                                        potential_next_guesses.add(word)
-                                            else:
-                                                potential_next_guesses.add(word)
-            
-            # st.write(f"GUESS {guess_num} : TEST 2-1")
-
-        else:
-            for word in word_list:
-                if word not in dont_guess_words: # just in case
-                    word_set = set()
-                    for letter in word:
-                        word_set.add(letter)
-                        if next_letters.issubset(word_set):
-                            if word not in guessed_words:
-                                # # st.write ("TEST 3-2")
-
-                                if len(dont_guess_again) > 0:
-                                    for bad_letter in dont_guess_again:
-                                        if bad_letter not in word:
-                                            middle_set.add(word)
-                                else:
-                                    middle_set.add(word)
-            for word in middle_set:
-                dummy_list = []
-                for good_lett, good_pos in perfect_letters:
-                    if word[good_pos] == good_lett:
-                        dummy_list.append(1)
-                        if len(dummy_list) == len(perfect_letters):
-                            potential_next_guesses.add(word)
-            for word in middle_set:
-                dummy_list = []
-                for bad_lett, bad_pos in incorrect_positions:
-                    if bad_pos < len(word):
-                        if word[bad_pos] == bad_lett:
-                            dummy_list.append(1)
-                            if len(dummy_list) > 0:
-                                potential_next_guesses.remove(word)
-                                        
-            # st.write(f"GUESS {guess_num} : TEST 3-1")
-
         if return_stats == False:
             if verbose == True:
-                if len(potential_next_guesses) > 1:
-                    # st.write(f"At this point:")
-                    st.write(f"\t{len(word_list) - len(potential_next_guesses)}, {round((len(word_list) - len(potential_next_guesses)) / len(word_list) * 100, 2)}% of total words have been eliminated, and")
-                    st.write(f"\t{len(potential_next_guesses)}, {round(len(potential_next_guesses) / len(word_list) * 100, 2)}% of total words remain possible.\n")
-                
-                else:
-                    # st.write(f"At this point:")
-                    st.write(f"\t{len(word_list) - len(potential_next_guesses)}, {round((len(word_list) - len(potential_next_guesses)) / len(word_list) * 100, 2)}% of total words have been eliminated, and")
-                    st.write(f"\t{len(potential_next_guesses)}, {round(len(potential_next_guesses) / len(word_list) * 100, 2)}% of total words remain possible.\n")
+                # st.write(f"At this point:")
+                output.append(f"\t{len(word_list) - remaining}, {round((len(word_list) - remaining) / len(word_list) * 100, 2)}% of total words have been eliminated, and")
+                output.append(f"\t{remaining}, {round(remaining / len(word_list) * 100, 2)}% of total words remain possible.\n")
         
-        reduction_per_guess.append(len(potential_next_guesses))
+        reduction_per_guess.append(remaining)
                 
         #### Guessing next word
-        if len(potential_next_guesses) == 1:
+        if remaining == 1:
 
             if return_stats == False:
                 if verbose == True:
-                    st.write(f"All potential next guesses:\n\t{get_word_rating(words_to_rate = list(potential_next_guesses), word_list = word_list)}\n")
-                    st.write(f"Words guessed so far:\n\t{guessed_words}.\n")
-                    st.write(f"The only remaining possible word is:\n\t'{list(potential_next_guesses)[0]}'")
+                    output.append(f"All potential next guesses:\n\t{word_ratings}\n")
+                    output.append(f"Words guessed so far:\n\t{guessed_words}.\n")
+                    output.append(f"The only remaining possible word is:\n\t'{word_ratings[0][0]}'")
                 
-            # guess = list(potential_next_guesses)[0]
             if guess_num < len(guesses):
                 guess = guesses[guess_num]
-            # guess_entropies.append(get_word_rating([guess], word_list, normalized = False, ascending = False)[0][1])
 
         else:
 
-            best_next_guesses = list(potential_next_guesses)                
-            # # st.write (best_next_guesses)
-            word_ratings = get_word_rating(best_next_guesses, word_list, normalized = False, ascending = False) # "internal" ratings
-            
-            # Get max rating of all words
-            max_rating = -np.inf
-            for word, rating in word_ratings:
-                if rating > max_rating:
-                    max_rating = rating
-
-            # add best rated words (all equally best rating in next guess list) to set
-            best_of_the_best_1 = []
-            for word, rating in word_ratings:
-                if rating == max_rating:
-                    best_of_the_best_1.append(word)
-
-            # only using top ten most frequent prefixes suffixes to bias. After that it the impact is especially negligible
-            test_starts = get_gram_freq(word_list = word_list, letters_length = 1, position = "start", search = None)[:10]
-            test_ends = get_gram_freq(word_list = word_list, letters_length = 1, position = "end", search = None)[:10]
-
-            # list of the best words that also have the most frequent starting and ending letters (suffixes and prefixes didn't have an impact)
-            best_of_the_best_2 = []
-            for start_gram, start_count in test_starts:
-                for end_gram, end_count in test_ends:
-                    for word in best_of_the_best_1:
-                        if word[:1] == start_gram and word[-1:] == end_gram:
-                            best_of_the_best_2.append(word)
-
-            # if len(best_of_the_best_2) > 0:
-            #     guess = best_of_the_best_2[0]
-            # else:
-            #     guess = best_of_the_best_1[0] # they're all equally the best of the best possible guesses so just pick the first
-
             if guess_num < len(guesses):
                 guess = guesses[guess_num]
-            
-            # guess_entropies.append(get_word_rating([guess], word_list, normalized = False, ascending = False)[0][1])
 
             if return_stats == False:
                 if verbose == True:
-                    if len(word_ratings) <= 40:
-                        st.write(f"All potential next guesses:\n\t{word_ratings}\n")
-                        st.write(f"Words guessed so far:\n\t{guessed_words}.\n")
+                    if remaining <= 40:
+                        output.append(f"All potential next guesses:\n\t{word_ratings}\n")
+                        output.append(f"Words guessed so far:\n\t{guessed_words}.\n")
                     else:
-                        st.write(f"The top 40 potential next guesses are:\n\t{word_ratings[:40]}\n")
-                        st.write(f"Words guessed so far:\n\t{guessed_words}.\n")
-
-            # guess_entropies.append(get_word_rating([guess], word_list, normalized = False, ascending = False)[0][1])
+                        output.append(f"The top 40 potential next guesses are:\n\t{word_ratings[:40]}\n")
+                        output.append(f"Words guessed so far:\n\t{guessed_words}.\n")
 
         #### Guess has now been made -- what to do next
         if guess_num == max_guesses: # if at max guesses allowed
@@ -1123,44 +2247,48 @@ def wordle_wizard_cheat(guesses: list, word_list: list, max_guesses: int = None,
             # stats_dict['target_guessed'] = False
             if return_stats == False:
                 if verbose == True:
-                    st.write("-----------------------------\n")
-                    st.write(f"\nUnfortunately, the puzzle was not solved in {max_guesses} guesses. Better luck next time!")
-                    st.write(f"The target word was '{target}'.\n")
-                    st.write("-----------------------------\n")
+                    output.append("-----------------------------\n")
+                    output.append(f"\nUnfortunately, the puzzle was not solved in {max_guesses} guesses. Better luck next time!")
+                    output.append(f"The target word was '{target}'.\n")
+                    output.append("-----------------------------\n")
                 else:
-                    st.write(f"\nUnfortunately, the puzzle was not solved in {max_guesses} guesses. Better luck next time!")
-                    st.write(f"The target word was '{target}'.\n")
+                    output.append(f"\nUnfortunately, the puzzle was not solved in {max_guesses} guesses. Better luck next time!")
+                    output.append(f"The target word was '{target}'.\n")
             break
         else: # if not at max guesses yet allowed
             # # stats_dict['target_guessed'] = False
             if return_stats == False:
                 if verbose == True:
-                    if len(potential_next_guesses) > 1:
-                        st.write(f"Recommended next guess:\n\t'{word_ratings[0][0]}'")
+                    if remaining > 1:
+                        # the solver's own pick, which the exact endgame may have made over the top rated word
+                        next_guess = step["next_guess"] if step["next_guess"] is not None else word_ratings[0][0]
+                        output.append(f"Recommended next guess:\n\t'{next_guess}'")
                         
                         # st.write(f"Next guess:\n\t'{guess}'")
-                    st.write("\n-----------------------------\n")
+                    output.append("\n-----------------------------\n")
 
         if guess == target:
             guess_num += 1
             guessed_words.append(guess)
-            # stats_dict['target_guessed'] = True
+            target_guessed = True
 
             if return_stats == False:
-                st.write(f"**Guess {guess_num}: '{guess}'**\n")
-                st.write(f"You solved the puzzle in {guess_num} guesses!")
+                output.append(f"**Guess {guess_num}: '{guess}'**\n")
+                output.append(f"You solved the puzzle in {guess_num} guesses!")
 
                 if max_guesses - guess_num == 1:
-                    st.write(f"There was only {max_guesses - guess_num} guess remaining.")
+                    output.append(f"There was only {max_guesses - guess_num} guess remaining.")
                 else:
-                    st.write(f"There were still {max_guesses - guess_num} guesses remaining.")
+                    output.append(f"There were still {max_guesses - guess_num} guesses remaining.")
 
             if return_stats == False:   
                 # # stats_dict['target_guessed'] = True                 
-                st.write(f"\nThe target word was **'{target}'**.")
-                st.write("\n-----------------------------")
+                output.append(f"\nThe target word was **'{target}'**.")
+                output.append("\n-----------------------------")
             break
 
+    flush_output(output)
+
     # #### STATS STUFF    
     # mid_guesses_vows = 0
     # mid_guesses_cons = 0
@@ -1221,6 +2349,19 @@ def wordle_wizard_cheat(guesses: list, word_list: list, max_guesses: int = None,
     #     # stats_dict['valid_success'] = False
 
     # stats_dict['num_guesses'] = float(guess_num)
+
+    if return_stats == True or profile == True:
+        stats_dict = {}
+        stats_dict['first_guess'] = guessed_words[0]
+        stats_dict['target_word'] = target
+        stats_dict['guessed_words'] = guessed_words
+        stats_dict['num_guesses'] = guess_num
+        stats_dict['target_guessed'] = target_guessed
+        stats_dict['remaining_per_guess'] = reduction_per_guess
+        if profile == True:
+            stats_dict['phase_timings'] = phase_timings
+
+        return stats_dict
     
 ############################################################################################################################################################
 ############################################################################################################################################################